@@ -0,0 +1,320 @@
+"""
+Offset index and lazily materialized Samples for architecture JSONL datasets.
+
+Building a task used to parse every JSONL record and stat every referenced
+diagram, and kept all records in memory. The index records, per item, its id,
+the byte offset of its line and whether it is usable (no diagram, or the
+diagram file exists) as a bitmap. Diagram existence is checked by listing each
+diagram directory once. The index is cached on disk and reused while the JSONL
+file and the diagram directories are unchanged (same mtime and size).
+
+LazyArchitectureDataset reads and parses a record only when its Sample is
+first accessed, so slicing (inspect's --limit) and id selection touch only the
+records they keep. The JSONL file itself is the store of full records:
+DatasetIndex.record looks one up by item id, so Samples need only carry the
+fields used for prompting and scoring.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Union, overload
+
+from inspect_ai.dataset import Dataset, MemoryDataset, Sample
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+INDEX_CACHE_DIR = Path(__file__).parent.parent.parent / ".dataset_cache"
+
+
+def _mtime_ns(path: Path) -> int:
+    """Modification time of path in ns, or -1 if it doesn't exist."""
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return -1
+
+
+@dataclass
+class DatasetIndex:
+    """Per-item ids, line offsets and a usable-item bitmap for one JSONL file."""
+
+    path: Path
+    base_dir: Path
+    mtime_ns: int
+    size: int
+    ids: List[str]
+    offsets: array  # Byte offset of each item's line ("q")
+    usable: bytearray  # Bit i set if item i has no diagram or its diagram exists
+    missing_diagrams: Dict[str, str]  # Item id -> referenced diagram path that doesn't exist
+    diagram_dirs: Dict[str, int]  # Diagram directory -> mtime_ns when indexed
+    _positions: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        self._positions = {item_id: i for i, item_id in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def is_usable(self, position: int) -> bool:
+        return bool(self.usable[position >> 3] & (1 << (position & 7)))
+
+    def position(self, item_id: str) -> int | None:
+        """Line position of an item id, or None if the file has no such item."""
+        return self._positions.get(item_id)
+
+    def is_current(self) -> bool:
+        """Check the JSONL file and diagram directories are unchanged since indexing."""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return False
+        if stat.st_mtime_ns != self.mtime_ns or stat.st_size != self.size:
+            return False
+        return all(
+            _mtime_ns(self.base_dir / directory) == mtime
+            for directory, mtime in self.diagram_dirs.items()
+        )
+
+    def read_records(self, positions: Iterable[int]) -> Iterator[tuple[int, Dict[str, Any]]]:
+        """Parse the records at the given positions, reading the file once in offset order."""
+        with open(self.path, "rb") as f:
+            for position in sorted(set(positions)):
+                f.seek(self.offsets[position])
+                data = json.loads(f.readline())
+                if data.get("id", f"line-{position + 1}") != self.ids[position]:
+                    raise RuntimeError(
+                        f"{self.path} changed after it was indexed; reload the task to re-index it"
+                    )
+                yield position, data
+
+    def record(self, item_id: str) -> Dict[str, Any] | None:
+        """Parse the full record of one item, or None if the file has no such item."""
+        position = self.position(item_id)
+        if position is None:
+            return None
+        return next(self.read_records([position]))[1]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "version": INDEX_VERSION,
+            "path": str(self.path),
+            "mtime_ns": self.mtime_ns,
+            "size": self.size,
+            "ids": self.ids,
+            "offsets": self.offsets.tolist(),
+            "usable": self.usable.hex(),
+            "missing_diagrams": self.missing_diagrams,
+            "diagram_dirs": self.diagram_dirs,
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any], base_dir: Path) -> "DatasetIndex":
+        return cls(
+            path=Path(data["path"]),
+            base_dir=base_dir,
+            mtime_ns=data["mtime_ns"],
+            size=data["size"],
+            ids=data["ids"],
+            offsets=array("q", data["offsets"]),
+            usable=bytearray.fromhex(data["usable"]),
+            missing_diagrams=data["missing_diagrams"],
+            diagram_dirs=data["diagram_dirs"],
+        )
+
+
+def build_index(path: Path, base_dir: Path) -> DatasetIndex:
+    """Scan a JSONL dataset once, recording offsets and which items' diagrams exist."""
+    stat = path.stat()
+    ids: List[str] = []
+    offsets = array("q")
+    diagrams: Dict[int, str] = {}
+
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                data = json.loads(line)
+                position = len(ids)
+                ids.append(data.get("id", f"line-{position + 1}"))
+                offsets.append(offset)
+                if data.get("diagram_path"):
+                    diagrams[position] = data["diagram_path"]
+            offset += len(line)
+
+    # List each diagram directory once instead of stat-ing every image
+    listings: Dict[str, set[str]] = {}
+    for diagram_path in diagrams.values():
+        directory = os.path.dirname(diagram_path)
+        if directory not in listings:
+            try:
+                listings[directory] = set(os.listdir(base_dir / directory))
+            except OSError:
+                listings[directory] = set()
+
+    usable = bytearray(b"\xff" * ((len(ids) + 7) // 8))
+    missing: Dict[str, str] = {}
+    for position, diagram_path in diagrams.items():
+        directory, name = os.path.split(diagram_path)
+        if name not in listings[directory]:
+            usable[position >> 3] &= ~(1 << (position & 7)) & 0xFF
+            missing[ids[position]] = diagram_path
+
+    return DatasetIndex(
+        path=path,
+        base_dir=base_dir,
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        ids=ids,
+        offsets=offsets,
+        usable=usable,
+        missing_diagrams=missing,
+        diagram_dirs={directory: _mtime_ns(base_dir / directory) for directory in listings},
+    )
+
+
+_INDEXES: Dict[Path, DatasetIndex] = {}
+
+
+def get_index(path: Path, base_dir: Path, cache_dir: Path | None = INDEX_CACHE_DIR) -> DatasetIndex:
+    """
+    Return the index for a JSONL dataset, rebuilding it only when the file or
+    its diagram directories have changed.
+
+    Indexes are kept in memory for the process and, unless cache_dir is None,
+    on disk across runs.
+    """
+    path = path.resolve()
+    index = _INDEXES.get(path)
+    if index is not None and index.is_current():
+        return index
+
+    path_hash = hashlib.sha1(str(path).encode()).hexdigest()[:12]
+    cache_file = cache_dir / f"{path.stem}.{path_hash}.index.json" if cache_dir else None
+    index = None
+    if cache_file is not None and cache_file.exists():
+        try:
+            data = json.loads(cache_file.read_text())
+            if data.get("version") == INDEX_VERSION and data.get("path") == str(path):
+                index = DatasetIndex.from_json(data, base_dir)
+        except (OSError, ValueError, KeyError):
+            index = None
+        if index is not None and not index.is_current():
+            index = None
+
+    if index is None:
+        index = build_index(path, base_dir)
+        if cache_file is not None:
+            try:
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                cache_file.write_text(json.dumps(index.to_json()))
+            except OSError as e:
+                logger.debug(f"Could not write dataset index cache {cache_file}: {e}")
+
+    _INDEXES[path] = index
+    return index
+
+
+class LazyArchitectureDataset(Dataset):
+    """A Dataset over selected index positions whose Samples are parsed on first access."""
+
+    def __init__(
+        self,
+        index: DatasetIndex,
+        positions: List[int],
+        to_sample: Callable[[Dict[str, Any]], Sample],
+        name: str | None = None,
+        location: str | None = None,
+        shuffled: bool = False,
+        cache: Dict[int, Sample] | None = None,
+    ):
+        self._index = index
+        self._positions = positions
+        self._to_sample = to_sample
+        self._name = name
+        self._location = location
+        self._shuffled = shuffled
+        # Shared with slices and filtered copies, so each record is parsed once
+        self._cache: Dict[int, Sample] = cache if cache is not None else {}
+
+    def _derive(self, positions: List[int], name: str | None = None) -> "LazyArchitectureDataset":
+        return LazyArchitectureDataset(
+            self._index,
+            positions,
+            self._to_sample,
+            name=name or self._name,
+            location=self._location,
+            shuffled=self._shuffled,
+            cache=self._cache,
+        )
+
+    def _materialize(self, positions: Iterable[int]) -> None:
+        pending = [p for p in positions if p not in self._cache]
+        for position, data in self._index.read_records(pending):
+            self._cache[position] = self._to_sample(data)
+
+    @property
+    def name(self) -> str | None:
+        return self._name
+
+    @property
+    def location(self) -> str | None:
+        return self._location
+
+    @property
+    def shuffled(self) -> bool:
+        return self._shuffled
+
+    @property
+    def materialized(self) -> int:
+        """Number of records parsed so far (shared across slices of this dataset)."""
+        return len(self._cache)
+
+    @overload
+    def __getitem__(self, index: int) -> Sample: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Dataset: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Sample, Dataset]:
+        if isinstance(index, slice):
+            return self._derive(self._positions[index])
+        position = self._positions[index]
+        self._materialize([position])
+        return self._cache[position]
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __iter__(self) -> Iterator[Sample]:
+        self._materialize(self._positions)
+        return (self._cache[p] for p in self._positions)
+
+    def sort(self, reverse: bool = False, key: Callable[[Sample], Any] | None = None) -> None:
+        self._materialize(self._positions)
+        if key is None:
+            from inspect_ai.dataset._dataset import sample_input_len
+
+            key = sample_input_len
+        self._positions.sort(key=lambda p: key(self._cache[p]), reverse=reverse)
+
+    def filter(self, predicate: Callable[[Sample], bool], name: str | None = None) -> Dataset:
+        self._materialize(self._positions)
+        return self._derive([p for p in self._positions if predicate(self._cache[p])], name)
+
+    def shuffle(self, seed: int | None = None) -> None:
+        if seed is not None:
+            random.Random(seed).shuffle(self._positions)
+        else:
+            random.shuffle(self._positions)
+        self._shuffled = True
+
+    def shuffle_choices(self, seed: int | None = None) -> None:
+        # Samples are shared with the cache, so shuffling their choices in place applies here
+        MemoryDataset(list(self)).shuffle_choices(seed)
@@ -3,16 +3,197 @@ Validators for structured diagram output formats.
 
 Provides validation for Mermaid, PlantUML, and JSON architecture descriptions.
 Used by the LLM judge scorer to add structural validation to architecture scoring.
+Formats that can be parsed into nodes and edges produce a DiagramGraph, which is
+kept on the ValidationResult for component checks and later scoring stages.
 """
 
 import json
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import jsonschema
 
+# Support both relative imports (when run as package) and absolute imports (when loaded by inspect-ai)
+try:
+    from .json_extraction import extract_architecture_json
+    from ..schema_registry import format_error, load_schema, validate as validate_schema
+    from ..aws_services import canonical_service, service_index
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent))
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from json_extraction import extract_architecture_json
+    from evals.schema_registry import format_error, load_schema, validate as validate_schema
+    from evals.aws_services import canonical_service, service_index
+
+if TYPE_CHECKING:
+    from .response_analysis import ResponseAnalysis
+
+
+# =============================================================================
+# Diagram Graph IR
+# =============================================================================
+
+
+class DiagramParseError(ValueError):
+    """Raised when diagram source can't be parsed into a graph."""
+
+
+@dataclass
+class DiagramNode:
+    """A component in a parsed diagram."""
+
+    id: str
+    label: str | None = None
+    kind: str | None = None  # Shape or element keyword, e.g. "[(" or "database"
+    group: str | None = None  # Innermost enclosing subgraph/package id
+
+
+@dataclass
+class DiagramEdge:
+    """A connection between two components."""
+
+    source: str
+    target: str
+    label: str | None = None
+    arrow: str | None = None
+
+
+def _name_words(text: str) -> list[str]:
+    """Split a component name into lowercase words at separators, case changes and digits."""
+    return [w.lower() for w in re.findall(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+", text)]
+
+
+@dataclass
+class DiagramGraph:
+    """Nodes, edges and groups parsed from a diagram, independent of its source format."""
+
+    format: str
+    direction: str | None = None
+    nodes: dict[str, DiagramNode] = field(default_factory=dict)
+    edges: list[DiagramEdge] = field(default_factory=list)
+    groups: dict[str, str] = field(default_factory=dict)  # Group id -> title
+    _terms: set[str] | None = field(default=None, repr=False, compare=False)
+    _services: set[str] | None = field(default=None, repr=False, compare=False)
+
+    def add_node(
+        self,
+        node_id: str,
+        label: str | None = None,
+        kind: str | None = None,
+        group: str | None = None,
+    ) -> DiagramNode:
+        """Return the node with this id, creating it or filling in missing details."""
+        node = self.nodes.get(node_id)
+        if node is None:
+            node = self.nodes[node_id] = DiagramNode(node_id, label, kind, group)
+        else:
+            node.label = node.label or label
+            node.kind = node.kind or kind
+        self._terms = None
+        self._services = None
+        return node
+
+    def add_edge(
+        self, source: str, target: str, label: str | None = None, arrow: str | None = None
+    ) -> None:
+        self.edges.append(DiagramEdge(source, target, label, arrow))
+
+    def _component_names(self) -> list[str]:
+        names = [n.id for n in self.nodes.values()]
+        names += [n.label for n in self.nodes.values() if n.label]
+        names += [n.kind for n in self.nodes.values() if n.kind]
+        names += list(self.groups) + list(self.groups.values())
+        return names
+
+    def _component_services(self) -> set[str]:
+        """Canonical AWS service ids mentioned by any node or group name (see evals.aws_services)."""
+        services = self._services
+        if services is None:
+            index = service_index()
+            services = set()
+            for name in self._component_names():
+                services.update(index.find(name))
+                services.update(index.find(" ".join(_name_words(name))))
+            self._services = services
+        return services
+
+    def _component_terms(self) -> set[str]:
+        """Word n-grams of every node id, label and kind, and every group id and title.
+
+        Each n-gram is stored spaced and compacted, so "Auto Scaling" matches a
+        node called AutoScaling and "Route53" matches a "Route 53" label.
+        """
+        terms = self._terms
+        if terms is None:
+            terms = set()
+            for name in self._component_names():
+                words = _name_words(name)
+                for size in range(1, len(words) + 1):
+                    for start in range(len(words) - size + 1):
+                        gram = words[start : start + size]
+                        terms.add(" ".join(gram))
+                        terms.add("".join(gram))
+            self._terms = terms
+        return terms
+
+    def has_component(self, name: str) -> bool:
+        """Check whether a node id/label/kind or a group id/title names this component.
+
+        AWS services also match by any of their aliases, so an expected
+        "Elastic Load Balancer" is found in a node labelled "ALB".
+        """
+        words = _name_words(name)
+        if not words:
+            return True
+        terms = self._component_terms()
+        if " ".join(words) in terms or "".join(words) in terms:
+            return True
+        service_id = canonical_service(name)
+        return service_id is not None and service_id in self._component_services()
+
+    def metrics(self) -> dict[str, Any]:
+        """
+        Summarise the graph's shape in linear time.
+
+        Returns:
+            Dict with node/edge/group counts, max fan-out and fan-in (distinct
+            neighbours), orphan node ids (no edges) and tiers: the number of
+            layers on the longest path through the acyclic part of the graph.
+        """
+        links = {(e.source, e.target) for e in self.edges if e.source != e.target}
+        fan_out = {node_id: 0 for node_id in self.nodes}
+        fan_in = dict(fan_out)
+        successors: dict[str, list[str]] = {node_id: [] for node_id in self.nodes}
+        for source, target in links:
+            fan_out[source] += 1
+            fan_in[target] += 1
+            successors[source].append(target)
+        connected = {node_id for link in self.edges for node_id in (link.source, link.target)}
+
+        # Longest path layering (Kahn's algorithm); nodes on cycles get no tier
+        pending = dict(fan_in)
+        tier = {node_id: 0 for node_id, count in pending.items() if count == 0}
+        queue = list(tier)
+        for node_id in queue:
+            for target in successors[node_id]:
+                tier[target] = max(tier.get(target, 0), tier[node_id] + 1)
+                pending[target] -= 1
+                if pending[target] == 0:
+                    queue.append(target)
+
+        return {
+            "nodes": len(self.nodes),
+            "edges": len(self.edges),
+            "groups": len(self.groups),
+            "max_fan_out": max(fan_out.values(), default=0),
+            "max_fan_in": max(fan_in.values(), default=0),
+            "orphans": [node_id for node_id in self.nodes if node_id not in connected],
+            "tiers": max(tier.values(), default=-1) + 1,
+        }
+
 
 @dataclass
 class ValidationResult:
@@ -22,6 +203,17 @@ class ValidationResult:
     format_detected: str | None  # "mermaid", "plantuml", "json", or None
     error_message: str | None = None
     extracted_content: str | None = None
+    graph: DiagramGraph | None = None  # Parsed diagram, when the format has a parser
+
+
+def _as_analysis(text: "str | ResponseAnalysis") -> "ResponseAnalysis":
+    """Wrap a raw response so its derived views are computed once per validation."""
+    # Imported lazily: response_analysis builds on the helpers in this module
+    try:
+        from .response_analysis import ResponseAnalysis
+    except ImportError:
+        from response_analysis import ResponseAnalysis
+    return ResponseAnalysis.of(text)
 
 
 # =============================================================================
@@ -112,7 +304,215 @@ MERMAID_DIAGRAM_TYPES = [
 MERMAID_DIRECTIONS = ["TD", "TB", "BT", "LR", "RL"]
 
 
-def validate_mermaid(text: str) -> ValidationResult:
+# Flowchart node shapes as (opening, closing) delimiters, longest opening first
+MERMAID_NODE_SHAPES = [
+    ("(((", ")))"),
+    ("([", "])"),
+    ("[[", "]]"),
+    ("[(", ")]"),
+    ("((", "))"),
+    ("{{", "}}"),
+    ("[/", "]"),
+    ("[\\", "]"),
+    ("[", "]"),
+    ("(", ")"),
+    ("{", "}"),
+    (">", "]"),
+]
+
+# Flowchart statements that style or annotate rather than add nodes/edges
+MERMAID_DIRECTIVES = {"classDef", "class", "style", "linkStyle", "click", "direction", "accTitle", "accDescr"}
+
+# Ids may contain single hyphens (web-server); a second hyphen starts a link (web-server-->db)
+_MERMAID_NODE_ID = re.compile(r"\s*(\w+(?:-\w+)*)")
+_MERMAID_NODE_CLASS = re.compile(r":::\w+")
+_MERMAID_NODE_SEPARATOR = re.compile(r"\s*&")
+# A -- label --> B, A -. label .-> B, A == label ==> B
+_MERMAID_TEXT_LINK = re.compile(r"\s*(<?(?:--|==|-\.))\s+([^|]+?)\s+(-{2,}[>ox]?|={2,}[>ox]?|\.-+[>ox]?)")
+# -->, ---, -.->, ==>, <-->, --o, --x, ~~~ (optionally followed by |label|)
+_MERMAID_LINK = re.compile(r"\s*(<?(?:-{2,}|={2,}|-\.+-|~{3,})(?:>|[ox](?!\w))?)")
+_MERMAID_PIPE_LABEL = re.compile(r"\s*\|([^|]*)\|")
+
+
+def _split_mermaid_statements(line: str) -> list[str]:
+    """Split a line on ';' statement separators outside quoted labels."""
+    statements = []
+    start = 0
+    in_quote = False
+    for i, char in enumerate(line):
+        if char == '"':
+            in_quote = not in_quote
+        elif char == ";" and not in_quote:
+            statements.append(line[start:i])
+            start = i + 1
+    statements.append(line[start:])
+    return [s.strip() for s in statements if s.strip()]
+
+
+def _check_mermaid_brackets(line: str, bracket_stack: list[str]) -> None:
+    """Track bracket balance outside quoted labels; raise on an unexpected close."""
+    in_quote = False
+    for i, char in enumerate(line):
+        if char == '"':
+            in_quote = not in_quote
+        elif in_quote:
+            continue
+        elif char in "[({":
+            bracket_stack.append(char)
+        elif char == ">" and not bracket_stack and i > 0 and (line[i - 1].isalnum() or line[i - 1] == "_"):
+            # Asymmetric node shape: id>label]
+            bracket_stack.append(char)
+        elif char in "])}":
+            if not bracket_stack:
+                raise DiagramParseError(f"Unbalanced bracket: unexpected '{char}'")
+            bracket_stack.pop()
+
+
+def _clean_mermaid_label(label: str | None) -> str | None:
+    if label is None:
+        return None
+    label = re.sub(r"<br\s*/?>", " ", label).strip().strip('"').strip("/\\").strip()
+    return label or None
+
+
+def _parse_mermaid_node(
+    graph: DiagramGraph, statement: str, pos: int, group: str | None
+) -> tuple[str | None, int]:
+    """Parse one node reference (id, optional shape/label, optional :::class)."""
+    match = _MERMAID_NODE_ID.match(statement, pos)
+    if not match:
+        return None, pos
+    node_id = match.group(1)
+    pos = match.end()
+
+    label = kind = None
+    for opening, closing in MERMAID_NODE_SHAPES:
+        if statement.startswith(opening, pos):
+            start = pos + len(opening)
+            if statement.startswith('"', start):
+                end_quote = statement.find('"', start + 1)
+                end_quote = len(statement) if end_quote == -1 else end_quote
+                label = statement[start + 1 : end_quote]
+                end = statement.find(closing, end_quote + 1)
+            else:
+                end = statement.find(closing, start)
+                label = statement[start : end if end != -1 else len(statement)]
+            pos = end + len(closing) if end != -1 else len(statement)
+            kind = opening
+            break
+
+    class_match = _MERMAID_NODE_CLASS.match(statement, pos)
+    if class_match:
+        pos = class_match.end()
+
+    graph.add_node(node_id, _clean_mermaid_label(label), kind, group)
+    return node_id, pos
+
+
+def _parse_mermaid_link(statement: str, pos: int) -> tuple[str, str | None, int] | None:
+    """Parse one link, returning (arrow, label, new position) or None."""
+    match = _MERMAID_TEXT_LINK.match(statement, pos)
+    if match:
+        return match.group(3), _clean_mermaid_label(match.group(2)), match.end()
+    match = _MERMAID_LINK.match(statement, pos)
+    if not match:
+        return None
+    arrow, pos = match.group(1), match.end()
+    label = None
+    pipe = _MERMAID_PIPE_LABEL.match(statement, pos)
+    if pipe:
+        label, pos = _clean_mermaid_label(pipe.group(1)), pipe.end()
+    return arrow, label, pos
+
+
+def _parse_mermaid_chain(graph: DiagramGraph, statement: str, group: str | None) -> None:
+    """Parse `A & B --> C -->|label| D` style statements into nodes and edges."""
+    pos = 0
+    sources: list[str] = []
+    while True:
+        # Node group: one or more nodes joined by &
+        targets = []
+        while True:
+            node_id, pos = _parse_mermaid_node(graph, statement, pos, group)
+            if node_id is None:
+                break
+            targets.append(node_id)
+            separator = _MERMAID_NODE_SEPARATOR.match(statement, pos)
+            if not separator:
+                break
+            pos = separator.end()
+        if not targets:
+            return
+
+        if sources:
+            for source in sources:
+                for target in targets:
+                    graph.add_edge(source, target, link_label, arrow)
+        sources = targets
+
+        link = _parse_mermaid_link(statement, pos)
+        if link is None:
+            return
+        arrow, link_label, pos = link
+
+
+def parse_mermaid_flowchart(code: str) -> DiagramGraph:
+    """
+    Parse a Mermaid flowchart/graph into a DiagramGraph in one pass over its lines.
+
+    Handles node shapes and quoted labels, chained and `&`-grouped links, link
+    labels, subgraphs and `;`-separated statements. Styling directives are
+    skipped.
+
+    Raises:
+        DiagramParseError: On unbalanced brackets outside quoted labels
+    """
+    lines = code.strip().split("\n")
+    header, *first_statements = _split_mermaid_statements(lines[0]) or [""]
+    header_words = header.split()
+    direction = header_words[1].upper() if len(header_words) > 1 else None
+    graph = DiagramGraph(
+        format="mermaid",
+        direction=direction if direction in MERMAID_DIRECTIONS else None,
+    )
+
+    bracket_stack: list[str] = []
+    subgraph_stack: list[str] = []
+    for line in ["; ".join(first_statements), *lines[1:]]:
+        line = line.strip()
+        # Skip comments
+        if not line or line.startswith("%%"):
+            continue
+        _check_mermaid_brackets(line, bracket_stack)
+
+        for statement in _split_mermaid_statements(line):
+            keyword, _, rest = statement.partition(" ")
+            if keyword == "subgraph":
+                rest = rest.strip()
+                match = re.match(r"(\w+)\s*\[(.*)\]$", rest)
+                if match:
+                    group_id, title = match.group(1), match.group(2)
+                else:
+                    group_id = title = rest
+                title = _clean_mermaid_label(title) or group_id
+                group_id = group_id.strip('"') or f"subgraph{len(graph.groups) + 1}"
+                graph.groups[group_id] = title
+                subgraph_stack.append(group_id)
+            elif keyword == "end":
+                if subgraph_stack:
+                    subgraph_stack.pop()
+            elif keyword in MERMAID_DIRECTIVES:
+                continue
+            else:
+                _parse_mermaid_chain(graph, statement, subgraph_stack[-1] if subgraph_stack else None)
+
+    if bracket_stack:
+        raise DiagramParseError(f"Unbalanced brackets: unclosed '{bracket_stack[-1]}'")
+
+    return graph
+
+
+def validate_mermaid(text: "str | ResponseAnalysis") -> ValidationResult:
     """
     Validate Mermaid diagram syntax.
 
@@ -122,14 +522,18 @@ def validate_mermaid(text: str) -> ValidationResult:
     - Edge syntax validity
     - Balanced brackets
 
+    Flowcharts (`flowchart`/`graph`) are parsed into a DiagramGraph, which is
+    returned on the result; other diagram types get the lighter pattern checks.
+
     Returns:
-        ValidationResult with is_valid, error_message, and extracted_content
+        ValidationResult with is_valid, error_message, extracted_content and graph
     """
     # Extract Mermaid code block
-    code = extract_code_block(text, "mermaid")
+    analysis = _as_analysis(text)
+    code = analysis.code_block("mermaid")
     if not code:
         # Try to find Mermaid content without code block
-        code = text
+        code = analysis.text
         # Check if it looks like Mermaid at all
         if not re.search(r"\b(flowchart|graph)\b", code, re.IGNORECASE):
             return ValidationResult(
@@ -159,6 +563,9 @@ def validate_mermaid(text: str) -> ValidationResult:
             extracted_content=code,
         )
 
+    if first_line.lower().startswith(("flowchart", "graph")):
+        return _validate_mermaid_flowchart(code)
+
     # Check for balanced brackets
     brackets = {"[": "]", "(": ")", "{": "}", "[[": "]]", "((": "))"}
     bracket_stack = []
@@ -247,12 +654,260 @@ def validate_mermaid(text: str) -> ValidationResult:
     )
 
 
+def _validate_mermaid_flowchart(code: str) -> ValidationResult:
+    """Validate a flowchart from its parsed graph."""
+    try:
+        graph = parse_mermaid_flowchart(code)
+    except DiagramParseError as e:
+        return ValidationResult(
+            is_valid=False,
+            format_detected="mermaid",
+            error_message=str(e),
+            extracted_content=code,
+        )
+
+    if not graph.edges:
+        return ValidationResult(
+            is_valid=False,
+            format_detected="mermaid",
+            error_message="No edges/connections found. Diagram should show relationships between components.",
+            extracted_content=code,
+            graph=graph,
+        )
+
+    if len(graph.nodes) < 2:
+        return ValidationResult(
+            is_valid=False,
+            format_detected="mermaid",
+            error_message="Diagram should have at least 2 defined nodes.",
+            extracted_content=code,
+            graph=graph,
+        )
+
+    return ValidationResult(
+        is_valid=True,
+        format_detected="mermaid",
+        error_message=None,
+        extracted_content=code,
+        graph=graph,
+    )
+
+
 # =============================================================================
 # PlantUML Validation
 # =============================================================================
 
 
-def validate_plantuml(text: str) -> ValidationResult:
+# Element keywords that declare a component (or, followed by '{', a container)
+PLANTUML_ELEMENTS = {
+    "actor", "agent", "artifact", "boundary", "card", "circle", "cloud", "collections",
+    "component", "control", "database", "entity", "file", "folder", "frame", "hexagon",
+    "interface", "node", "package", "participant", "person", "queue", "rectangle",
+    "stack", "storage", "usecase",
+}
+
+# Class-like declarations whose {...} body holds members, not components
+PLANTUML_CLASSIFIERS = {"class", "abstract", "enum", "annotation"}
+
+# Statements that style or annotate rather than add components/relationships
+PLANTUML_DIRECTIVES = {"skinparam", "hide", "show", "remove", "scale", "caption", "sprite", "autonumber"}
+
+# Multi-line blocks skipped up to their end marker (e.g. note ... end note)
+PLANTUML_BLOCKS = {"note", "hnote", "rnote", "legend", "header", "footer", "title"}
+
+_PLANTUML_ID = r"\w+(?:\.\w+)*"
+# [Label], (Label), :Label:, "Label" or a bare identifier
+_PLANTUML_REF = re.compile(
+    rf"\s*(?:\[([^\]]*)\]|\(([^)]*)\)|:([^:]*):|\"([^\"]*)\"|({_PLANTUML_ID}))"
+)
+_PLANTUML_ALIAS = re.compile(r"\s+as\s+", re.IGNORECASE)
+_PLANTUML_MULTIPLICITY = re.compile(r'\s*"[^"]*"')
+# -->, ..>, ->, <--, -down->, -[#red]->, --|>, o--, *--, #-- ...
+_PLANTUML_ARROW = re.compile(
+    r"\s*((?:<\|?|[o*#x}+^])?"
+    r"[-.]+(?:\[[^\]]*\])?(?:(?:left|right|up|down|le|ri|do|l|r|u|d)(?=[-.\[]))?(?:\[[^\]]*\])?[-.]*"
+    r"(?:\|?>|[o*#x{+^](?![\w\]]))?)",
+    re.IGNORECASE,
+)
+# Stdlib/C4 style element macros: EC2(web, "Web Server", ...) or Rel(web, db, "reads")
+_PLANTUML_MACRO = re.compile(rf"(\w+)\(\s*({_PLANTUML_ID})\s*(?:,\s*(?:\"([^\"]*)\"|({_PLANTUML_ID})))?")
+
+
+def _parse_plantuml_ref(statement: str, pos: int) -> tuple[str, str | None, int] | None:
+    """Parse an element reference with optional alias, returning (id, label, position)."""
+    match = _PLANTUML_REF.match(statement, pos)
+    if not match:
+        return None
+    bracketed = next((g for g in match.groups()[:4] if g is not None), None)
+    node_id = (bracketed if bracketed is not None else match.group(5)).strip()
+    label = None
+    pos = match.end()
+
+    alias = _PLANTUML_ALIAS.match(statement, pos)
+    if alias:
+        target = _PLANTUML_REF.match(statement, alias.end())
+        if target:
+            pos = target.end()
+            if target.group(5):
+                # "Label" as Alias
+                node_id, label = target.group(5), node_id
+            else:
+                # Alias as "Label"
+                label = next(g for g in target.groups()[:4] if g is not None).strip()
+    if not node_id:
+        return None
+    return node_id, label or None, pos
+
+
+def _parse_plantuml_relationship(graph: DiagramGraph, statement: str, group: str | None) -> bool:
+    """Parse `A --> B : label` into an edge; return False if the statement isn't one."""
+    source = _parse_plantuml_ref(statement, 0)
+    if source is None:
+        return False
+    pos = source[2]
+    multiplicity = _PLANTUML_MULTIPLICITY.match(statement, pos)
+    if multiplicity:
+        pos = multiplicity.end()
+    arrow = _PLANTUML_ARROW.match(statement, pos)
+    # A relationship needs a line: '-' or '..' (a lone '.' is not an arrow)
+    if not arrow or ("-" not in arrow.group(1) and ".." not in arrow.group(1)):
+        return False
+    pos = arrow.end()
+    multiplicity = _PLANTUML_MULTIPLICITY.match(statement, pos)
+    if multiplicity and _PLANTUML_REF.match(statement, multiplicity.end()):
+        pos = multiplicity.end()
+    target = _parse_plantuml_ref(statement, pos)
+    if target is None:
+        return False
+
+    rest = statement[target[2] :].strip()
+    if rest and not rest.startswith(":"):
+        return False
+    label = rest[1:].strip().strip('"') or None
+
+    for node_id, node_label, _ in (source, target):
+        graph.add_node(node_id, node_label, group=group)
+    arrow_text = arrow.group(1)
+    if arrow_text.startswith("<") and not arrow_text.endswith(">"):
+        # Reversed arrow (B <-- A): store the edge in its pointing direction
+        source, target = target, source
+    graph.add_edge(source[0], target[0], label, arrow_text)
+    return True
+
+
+def parse_plantuml(content: str) -> DiagramGraph:
+    """
+    Parse the body of a PlantUML diagram (between @startuml/@enduml) into a DiagramGraph.
+
+    One pass over the lines handles element declarations (keyword, [bracket],
+    (paren) and stdlib/C4 macro forms, with aliases), containers opened with
+    '{', and relationships with labels. Comments, notes, legends and styling
+    directives are skipped.
+    """
+    graph = DiagramGraph(format="plantuml")
+    group_stack: list[str | None] = []
+    block_end: re.Pattern | None = None
+    skip_depth = 0
+    in_comment = False
+
+    for raw_line in content.split("\n"):
+        line = raw_line.strip()
+
+        # Block comments /' ... '/
+        if in_comment:
+            if "'/" in line:
+                in_comment = False
+                line = line[line.index("'/") + 2 :].strip()
+            else:
+                continue
+        if line.startswith("/'"):
+            if "'/" not in line[2:]:
+                in_comment = True
+            continue
+        # Skipped blocks: notes, legends, class bodies
+        if block_end is not None:
+            if block_end.match(line):
+                block_end = None
+            continue
+        if skip_depth:
+            skip_depth += line.count("{") - line.count("}")
+            continue
+        if not line or line.startswith(("'", "!", "@")):
+            continue
+
+        keyword = line.split(None, 1)[0].lower().rstrip("{")
+        group = group_stack[-1] if group_stack else None
+
+        if line.startswith("}"):
+            if group_stack:
+                group_stack.pop()
+            continue
+        if keyword in PLANTUML_DIRECTIVES:
+            continue
+        if keyword in PLANTUML_BLOCKS:
+            is_note = keyword.endswith("note")
+            if (is_note and ":" not in line and '"' not in line) or (not is_note and (keyword == "legend" or line.lower() == keyword)):
+                block_end = re.compile(rf"end\s*{keyword[-4:] if is_note else keyword}\b", re.IGNORECASE)
+            continue
+        if line.lower().endswith(" direction"):
+            graph.direction = "LR" if line.lower().startswith("left to right") else "TB"
+            continue
+        if keyword in PLANTUML_CLASSIFIERS:
+            name = _parse_plantuml_ref(line, len(keyword))
+            if name:
+                graph.add_node(name[0], name[1], keyword, group)
+            skip_depth = line.count("{") - line.count("}")
+            continue
+
+        opens_group = line.endswith("{")
+        body = line.rstrip("{").strip()
+        # Drop stereotypes and colours: <<aws>>, #LightBlue
+        body = re.sub(r"(\s*(<<[^>]*>>|#\w+))+$", "", body)
+
+        if keyword in PLANTUML_ELEMENTS:
+            declared = _parse_plantuml_ref(body, len(keyword))
+            if declared is None:
+                continue
+            if opens_group:
+                graph.groups[declared[0]] = declared[1] or declared[0]
+                group_stack.append(declared[0])
+            else:
+                graph.add_node(declared[0], declared[1], keyword, group)
+            continue
+
+        macro = _PLANTUML_MACRO.match(body)
+        if macro:
+            name, first, label, second = macro.groups()
+            if name.lower().startswith(("rel", "birel")) and second:
+                # Rel(from, to, "label")
+                label_match = re.search(r',\s*"([^"]*)"', body[macro.end() :])
+                graph.add_edge(first, second, label_match.group(1) if label_match else None, name)
+                graph.add_node(first, group=group)
+                graph.add_node(second, group=group)
+            elif opens_group:
+                graph.groups[first] = label or first
+                group_stack.append(first)
+            else:
+                graph.add_node(first, label, name, group)
+            continue
+
+        if _parse_plantuml_relationship(graph, body, group):
+            continue
+
+        if opens_group:
+            # Anonymous container such as `together {`
+            group_stack.append(group)
+            continue
+
+        # Bare [Component] / (Use case) declarations
+        declared = _parse_plantuml_ref(body, 0)
+        if declared and body[0] in "[(" and not body[declared[2] :].strip():
+            graph.add_node(declared[0], declared[1], None, group)
+
+    return graph
+
+
+def validate_plantuml(text: "str | ResponseAnalysis") -> ValidationResult:
     """
     Validate PlantUML diagram syntax.
 
@@ -261,14 +916,18 @@ def validate_plantuml(text: str) -> ValidationResult:
     - Basic component/node definitions
     - Relationship syntax
 
+    The diagram body is parsed into a DiagramGraph, which is returned on the result.
+
     Returns:
-        ValidationResult with is_valid, error_message, and extracted_content
+        ValidationResult with is_valid, error_message, extracted_content and graph
     """
     # Extract PlantUML code block
-    code = extract_code_block(text, "plantuml")
+    analysis = _as_analysis(text)
+    text = analysis.text
+    code = analysis.code_block("plantuml")
     if not code:
         # Try to find PlantUML content without code block
-        if "@startuml" in text.lower():
+        if "@startuml" in analysis.lower:
             # Extract between @startuml and @enduml
             match = re.search(r"@startuml(.*?)@enduml", text, re.DOTALL | re.IGNORECASE)
             if match:
@@ -317,55 +976,25 @@ def validate_plantuml(text: str) -> ValidationResult:
 
     # Extract content between delimiters
     content = code[start_pos + len("@startuml") : end_pos].strip()
-    lines = content.split("\n")
-
-    # Check for components or actors
-    component_patterns = [
-        r"^\s*\[.+\]",  # [Component]
-        r"^\s*\(.+\)",  # (Actor)
-        r"^\s*actor\s+",  # actor Name
-        r"^\s*component\s+",  # component Name
-        r"^\s*database\s+",  # database Name
-        r"^\s*node\s+",  # node Name
-        r"^\s*cloud\s+",  # cloud Name
-        r"^\s*package\s+",  # package Name
-        r"^\s*rectangle\s+",  # rectangle Name
-        r"^\s*interface\s+",  # interface Name
-        r"^\s*class\s+",  # class Name
-    ]
 
-    has_components = False
-    for line in lines:
-        if any(re.match(pattern, line, re.IGNORECASE) for pattern in component_patterns):
-            has_components = True
-            break
+    graph = parse_plantuml(content)
 
-    if not has_components:
+    if not graph.nodes and not graph.groups:
         return ValidationResult(
             is_valid=False,
             format_detected="plantuml",
             error_message="No components found. Define components using [Name], (Name), or 'component Name' syntax.",
             extracted_content=code,
+            graph=graph,
         )
 
-    # Check for relationships
-    relationship_patterns = [
-        r"--\>",  # Arrow
-        r"\.\.\>",  # Dotted arrow
-        r"--",  # Line
-        r"\.\.",  # Dotted line
-        r"<--",  # Reverse arrow
-        r"<\.\.",  # Reverse dotted arrow
-    ]
-
-    has_relationships = any(re.search(pattern, content) for pattern in relationship_patterns)
-
-    if not has_relationships:
+    if not graph.edges:
         return ValidationResult(
             is_valid=False,
             format_detected="plantuml",
             error_message="No relationships found. Connect components using --> or -- syntax.",
             extracted_content=code,
+            graph=graph,
         )
 
     return ValidationResult(
@@ -373,6 +1002,7 @@ def validate_plantuml(text: str) -> ValidationResult:
         format_detected="plantuml",
         error_message=None,
         extracted_content=code,
+        graph=graph,
     )
 
 
@@ -380,54 +1010,31 @@ def validate_plantuml(text: str) -> ValidationResult:
 # JSON Architecture Validation
 # =============================================================================
 
-# JSON Schema for architecture descriptions
-ARCHITECTURE_SCHEMA: dict[str, Any] = {
-    "$schema": "http://json-schema.org/draft-07/schema#",
-    "type": "object",
-    "required": ["architecture"],
-    "properties": {
-        "architecture": {
-            "type": "object",
-            "required": ["components"],
-            "properties": {
-                "name": {"type": "string"},
-                "description": {"type": "string"},
-                "components": {
-                    "type": "array",
-                    "minItems": 1,
-                    "items": {
-                        "type": "object",
-                        "required": ["id", "type"],
-                        "properties": {
-                            "id": {"type": "string"},
-                            "type": {"type": "string"},
-                            "name": {"type": "string"},
-                            "aws_service": {"type": "string"},
-                            "description": {"type": "string"},
-                            "properties": {"type": "object"},
-                        },
-                    },
-                },
-                "relationships": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "required": ["from", "to"],
-                        "properties": {
-                            "from": {"type": "string"},
-                            "to": {"type": "string"},
-                            "type": {"type": "string"},
-                            "description": {"type": "string"},
-                        },
-                    },
-                },
-            },
-        },
-    },
-}
+# JSON Schema for architecture descriptions (schemas/architecture.schema.json)
+ARCHITECTURE_SCHEMA: dict[str, Any] = load_schema("architecture")
 
 
-def validate_architecture_json(text: str) -> ValidationResult:
+def architecture_json_graph(data: dict[str, Any]) -> DiagramGraph:
+    """Build a DiagramGraph from a JSON architecture description that passed the schema."""
+    architecture = data["architecture"]
+    graph = DiagramGraph(format="json")
+    for component in architecture["components"]:
+        graph.add_node(
+            component["id"],
+            component.get("name"),
+            component.get("aws_service") or component["type"],
+        )
+    for relationship in architecture.get("relationships", []):
+        source, target = relationship["from"], relationship["to"]
+        graph.add_node(source)
+        graph.add_node(target)
+        graph.add_edge(
+            source, target, relationship.get("description"), relationship.get("type")
+        )
+    return graph
+
+
+def validate_architecture_json(text: "str | ResponseAnalysis") -> ValidationResult:
     """
     Validate JSON architecture description against schema.
 
@@ -438,16 +1045,16 @@ def validate_architecture_json(text: str) -> ValidationResult:
     - Components have id and type
 
     Returns:
-        ValidationResult with is_valid, error_message, and extracted_content
+        ValidationResult with is_valid, error_message, extracted_content and graph
     """
     # Extract JSON code block
-    code = extract_code_block(text, "json")
+    analysis = _as_analysis(text)
+    text = analysis.text
+    code = analysis.code_block("json")
     if not code:
         # Try to find JSON object in text
-        json_match = re.search(r'\{[^{}]*"architecture"[^{}]*\{.*\}[^{}]*\}', text, re.DOTALL)
-        if json_match:
-            code = json_match.group()
-        else:
+        code = extract_architecture_json(text)
+        if not code:
             return ValidationResult(
                 is_valid=False,
                 format_detected="json",
@@ -470,14 +1077,12 @@ def validate_architecture_json(text: str) -> ValidationResult:
 
     # Validate against schema
     try:
-        jsonschema.validate(data, ARCHITECTURE_SCHEMA)
+        validate_schema("architecture", data)
     except jsonschema.ValidationError as e:
-        # Simplify the error message
-        path = " -> ".join(str(p) for p in e.absolute_path) if e.absolute_path else "root"
         return ValidationResult(
             is_valid=False,
             format_detected="json",
-            error_message=f"Schema validation failed at '{path}': {e.message}",
+            error_message=f"Schema validation failed {format_error(e)}",
             extracted_content=code,
         )
 
@@ -491,17 +1096,13 @@ def validate_architecture_json(text: str) -> ValidationResult:
             extracted_content=code,
         )
 
-    # Check for relationships (optional but recommended)
-    relationships = data.get("architecture", {}).get("relationships", [])
-    if not relationships:
-        # Warning but not invalid
-        pass
-
+    # Relationships are optional but recommended (an edgeless graph is still valid)
     return ValidationResult(
         is_valid=True,
         format_detected="json",
         error_message=None,
         extracted_content=code,
+        graph=architecture_json_graph(data),
     )
 
 
@@ -511,19 +1112,20 @@ def validate_architecture_json(text: str) -> ValidationResult:
 
 
 def validate_structured_output(
-    text: str, required_format: str | None = None
+    text: "str | ResponseAnalysis", required_format: str | None = None
 ) -> ValidationResult:
     """
     Validate structured diagram output.
 
     Args:
-        text: The response text to validate
+        text: The response text (or its ResponseAnalysis) to validate
         required_format: Required format ("mermaid", "plantuml", "json") or None to auto-detect
 
     Returns:
         ValidationResult with is_valid, format_detected, error_message, and extracted_content
     """
-    if not text or not text.strip():
+    analysis = _as_analysis(text)
+    if analysis.is_blank:
         return ValidationResult(
             is_valid=False,
             format_detected=None,
@@ -535,7 +1137,7 @@ def validate_structured_output(
     if required_format:
         format_to_validate = required_format.lower()
     else:
-        format_to_validate = detect_format(text)
+        format_to_validate = analysis.detected_format
 
     if not format_to_validate:
         return ValidationResult(
@@ -547,11 +1149,11 @@ def validate_structured_output(
 
     # Validate based on format
     if format_to_validate == "mermaid":
-        return validate_mermaid(text)
+        return validate_mermaid(analysis)
     elif format_to_validate == "plantuml":
-        return validate_plantuml(text)
+        return validate_plantuml(analysis)
     elif format_to_validate == "json":
-        return validate_architecture_json(text)
+        return validate_architecture_json(analysis)
     else:
         return ValidationResult(
             is_valid=False,
@@ -571,18 +1173,37 @@ def check_required_components(
         validation_result: Result from validate_structured_output
         expected_components: List of component IDs/names that should be present
 
+    When the result carries a parsed graph, a component counts as present only if
+    it names a node or group (by id, label or element kind, case-insensitive);
+    otherwise the extracted source is searched for the name. AWS services match
+    by any alias of the same canonical service (see evals.aws_services).
+
     Returns:
         Tuple of (all_present: bool, missing_components: list[str])
     """
     if not validation_result.is_valid or not validation_result.extracted_content:
         return False, expected_components
 
+    graph = validation_result.graph
+    if graph is not None:
+        # Look the component up among the parsed node/group ids and labels
+        missing = [c for c in expected_components if not graph.has_component(c)]
+        return len(missing) == 0, missing
+
     content_lower = validation_result.extracted_content.lower()
+    content_services: set[str] | None = None
     missing = []
 
     for component in expected_components:
-        # Check for component name (case-insensitive)
-        if component.lower() not in content_lower:
-            missing.append(component)
+        # Check for component name (case-insensitive), or any alias of the same AWS service
+        if component.lower() in content_lower:
+            continue
+        service_id = canonical_service(component)
+        if service_id is not None:
+            if content_services is None:
+                content_services = set(service_index().find(validation_result.extracted_content))
+            if service_id in content_services:
+                continue
+        missing.append(component)
 
     return len(missing) == 0, missing
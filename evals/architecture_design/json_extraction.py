@@ -0,0 +1,180 @@
+"""
+Linear-time extraction of JSON objects embedded in free text.
+
+Model and judge responses often carry a JSON object surrounded by prose, and
+the prose itself may contain braces. Regex fallbacks such as
+``\\{[^{}]*"architecture"[^{}]*\\{.*\\}[^{}]*\\}`` backtrack heavily on long,
+brace-heavy text. Here one scan pairs up balanced braces (tracking JSON strings
+inside them), and objects are decoded with ``JSONDecoder.raw_decode`` from
+candidate openings only. A failed decode resumes after its error position and
+a decoded object is never re-entered, so each character is scanned a bounded
+number of times.
+
+Decoding runs on a window of the text that doubles while an error could be an
+artifact of the cut. JSONDecodeError computes the line and column of its
+position by counting from the start of the document, so decoding in place
+would make every failed attempt cost time proportional to its offset.
+"""
+
+import json
+import re
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+_DECODER = json.JSONDecoder()
+_STRUCTURAL = re.compile(r'[{}"\\]')
+# A JSON object opens with a key or closes at once; other braces are skipped undecoded
+_OBJECT_OPENING = re.compile(r'\{\s*["}]')
+_ARRAY_OPENING = re.compile(r"\[")
+_ARRAY_OPENINGS = re.compile(r"[\[\s]*")
+_INITIAL_WINDOW = 64
+# An error this close to the end of a window may come from a cut literal or number
+_WINDOW_MARGIN = 16
+
+
+def balanced_spans(text: str) -> Tuple[List[int], Dict[int, int]]:
+    """
+    Pair up balanced braces in one pass.
+
+    Double-quoted strings are tracked only inside braces, so apostrophes and
+    quotes in surrounding prose don't hide braces.
+
+    Returns:
+        Tuple of (opening positions in order, opening position -> end position
+        just past its matching '}'). Unclosed openings have no end.
+    """
+    starts: List[int] = []
+    ends: Dict[int, int] = {}
+    stack: List[int] = []
+    in_string = False
+    escaped_at = -1
+
+    for match in _STRUCTURAL.finditer(text):
+        pos = match.start()
+        char = text[pos]
+        if pos == escaped_at:
+            continue
+        if in_string:
+            if char == "\\":
+                escaped_at = pos + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = bool(stack)
+        elif char == "{":
+            starts.append(pos)
+            stack.append(pos)
+        elif char == "}" and stack:
+            ends[stack.pop()] = pos + 1
+
+    return starts, ends
+
+
+def _decode_object(text: str, start: int, end: int) -> Tuple[bool, Any, int]:
+    """
+    Decode the JSON value at text[start:end].
+
+    Returns:
+        Tuple of (decoded, value, position): the end of the value when decoded,
+        otherwise the position of the error.
+    """
+    window = _INITIAL_WINDOW
+    while True:
+        stop = min(start + window, end)
+        try:
+            value, length = _DECODER.raw_decode(text[start:stop])
+            return True, value, start + length
+        except json.JSONDecodeError as e:
+            truncated = stop < end and (
+                e.pos >= stop - start - _WINDOW_MARGIN or e.msg.startswith("Unterminated string")
+            )
+            if not truncated:
+                return False, None, start + e.pos
+        window *= 2
+
+
+def iter_json_objects(
+    text: str, spans: Tuple[List[int], Dict[int, int]] | None = None
+) -> Iterator[Tuple[Any, int, int]]:
+    """
+    Yield (value, start, end) for each outermost decodable JSON object in text.
+
+    Objects nested inside a decoded object are not yielded separately; objects
+    nested inside an undecodable brace span are, if they start after the point
+    where decoding the span failed. Pass ``spans`` to reuse a balanced_spans scan.
+    """
+    starts, ends = spans or balanced_spans(text)
+    cursor = 0
+    for start in starts:
+        if start < cursor or start not in ends or not _OBJECT_OPENING.match(text, start):
+            continue
+        try:
+            decoded, value, pos = _decode_object(text, start, ends[start])
+        except RecursionError:
+            # Nested too deeply to decode; skip the whole span
+            cursor = ends[start]
+            continue
+        if not decoded:
+            cursor = max(pos, start + 1)
+            continue
+        yield value, start, pos
+        cursor = pos
+
+
+def find_json_object(text: str, predicate: Callable[[Dict[str, Any]], bool]) -> Dict[str, Any] | None:
+    """Return the first outermost JSON object in text that satisfies predicate."""
+    for value, _, _ in iter_json_objects(text):
+        if isinstance(value, dict) and predicate(value):
+            return value
+    return None
+
+
+def find_json_array(text: str, predicate: Callable[[List[Any]], bool]) -> List[Any] | None:
+    """
+    Return the first outermost JSON array in text that satisfies predicate.
+
+    Arrays are decoded from each '[' outside an earlier decoded array, so
+    brackets in surrounding prose ("[see below]") fail to decode and are
+    skipped. As in iter_json_objects, a failed decode resumes after its error.
+    """
+    cursor = 0
+    for match in _ARRAY_OPENING.finditer(text):
+        start = match.start()
+        if start < cursor:
+            continue
+        try:
+            decoded, value, pos = _decode_object(text, start, len(text))
+        except RecursionError:
+            # Nested too deeply to decode; so are the arrays opened right after it
+            cursor = _ARRAY_OPENINGS.match(text, start).end()
+            continue
+        if not decoded:
+            cursor = max(pos, start + 1)
+            continue
+        if isinstance(value, list) and predicate(value):
+            return value
+        cursor = pos
+    return None
+
+
+def extract_architecture_json(text: str) -> str | None:
+    """
+    Find the source of the outermost JSON object with an "architecture" key.
+
+    If no such object decodes, returns the first outermost brace span that
+    mentions "architecture" so the caller can report its syntax error, or None
+    if there is none.
+    """
+    spans = balanced_spans(text)
+    for value, start, end in iter_json_objects(text, spans):
+        if isinstance(value, dict) and "architecture" in value:
+            return text[start:end]
+
+    starts, ends = spans
+    outer_end = 0
+    for start in starts:
+        if start < outer_end or start not in ends:
+            continue
+        outer_end = ends[start]
+        if '"architecture"' in text[start:outer_end]:
+            return text[start:outer_end]
+    return None
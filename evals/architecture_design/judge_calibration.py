@@ -0,0 +1,78 @@
+"""
+Judge calibration data and the persistent judge result cache.
+
+The calibration set holds architecture responses with ground-truth scores.
+scripts/measure_judge_agreement.py judges them and caches every result;
+scripts/optimize_blend.py reads the cached results back to fit the blend
+weight and score modifiers without calling the judge again.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+TOLERANCE = 0.15  # Agreement threshold
+NUM_RUNS = 3  # Number of judge runs for consistency check
+DIMENSIONS = ("accuracy", "completeness", "quality")
+CALIBRATION_FILE = Path(__file__).parent / "calibration" / "responses.jsonl"
+CACHE_FILE = PROJECT_ROOT / ".judge_cache" / "agreement.jsonl"
+
+
+def load_calibration_data():
+    """Load calibration responses with ground truth."""
+    samples = []
+    with open(CALIBRATION_FILE, "r") as f:
+        for line in f:
+            if line.strip():
+                samples.append(json.loads(line))
+    return samples
+
+
+def judge_mode(batch_size: int, layout: str) -> str:
+    """How judge calls are made, as part of the cache key.
+
+    Batched requests always use the inline prompt text, so the layout only
+    matters for unbatched calls.
+    """
+    return f"batch={batch_size}" if batch_size > 1 else f"single,{layout}"
+
+
+class JudgeCache:
+    """Append-only JSONL cache of judge results, keyed by model, prompt, run and judging mode."""
+
+    def __init__(self, path: Path | None):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        if path is not None and path.exists():
+            with open(path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.entries[record["key"]] = record["result"]
+
+    @staticmethod
+    def key(model_name: str, rubric_prompt: str, run: int, mode: str) -> str:
+        payload = json.dumps([model_name, rubric_prompt, run, mode])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, key: str, result: dict, **info) -> None:
+        # Failed judge calls come back as neutral scores; don't keep them
+        if str(result.get("reasoning", "")).startswith("Error:"):
+            return
+        self.entries[key] = result
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps({"key": key, **info, "result": result}) + "\n")
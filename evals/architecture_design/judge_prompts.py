@@ -5,6 +5,8 @@ Each rubric provides structured guidance for evaluating architecture responses
 across three dimensions: accuracy, completeness, and quality.
 """
 
+import re
+from dataclasses import dataclass
 from typing import Dict, List, Any
 
 # Base judge system prompt
@@ -24,6 +26,21 @@ IMPORTANT: Return ONLY valid JSON in this exact format:
   "reasoning": "Brief explanation of scores"
 }"""
 
+# Judge system prompt for multi-item (batched) requests
+JUDGE_BATCH_SYSTEM_PROMPT = """You are an expert AWS Solutions Architect evaluator. You will be given several numbered items, each with its own rubric and response. Score every item independently on three dimensions:
+
+1. **accuracy** (0.0-1.0): How well does the response match the expected answer and AWS best practices?
+2. **completeness** (0.0-1.0): Does it cover all required elements thoroughly?
+3. **quality** (0.0-1.0): Is the reasoning sound, well-structured, and professionally presented?
+
+Be objective and consistent. Do not let one item influence the score of another.
+
+IMPORTANT: Return ONLY a valid JSON array with exactly one object per item, in item order:
+[
+  {"item": 1, "accuracy": 0.X, "completeness": 0.X, "quality": 0.X, "reasoning": "Brief explanation"},
+  {"item": 2, "accuracy": 0.X, "completeness": 0.X, "quality": 0.X, "reasoning": "Brief explanation"}
+]"""
+
 
 # Rubric prompts keyed by (type, subtype)
 RUBRIC_PROMPTS: Dict[tuple, str] = {
@@ -437,18 +454,31 @@ def get_hidden_criteria(subtype: str) -> List[str]:
     return HIDDEN_CRITERIA.get(subtype, [])
 
 
-def format_rubric_prompt(
-    eval_type: str,
-    subtype: str,
-    response: str,
-    eval_data: Dict[str, Any],
-) -> str | None:
-    """Format a rubric prompt with response and evaluation data."""
-    template = get_rubric_prompt(eval_type, subtype)
-    if not template:
-        return None
+@dataclass
+class RubricPromptParts:
+    """A rubric prompt split so that everything but the response is a stable prefix.
+
+    ``rubric`` (task header and scoring guidance) is identical for every item of a
+    subtype and ``reference`` (expected answer data) is identical for every model
+    judged on an item, so provider-side prompt caching can reuse them.
+    """
+
+    rubric: str
+    reference: str
+    response: str
+
+    @property
+    def prefix(self) -> str:
+        """Stable part of the prompt: rubric followed by the item's reference data."""
+        return "\n".join(part for part in (self.rubric, self.reference) if part)
+
+    def render(self) -> str:
+        """Full prompt text with the response appended last."""
+        return f"{self.prefix}\n{self.response}"
 
-    # Build format kwargs from eval_data
+
+def _format_kwargs(template: str, response: str, eval_data: Dict[str, Any]) -> Dict[str, str]:
+    """Build template format kwargs from the response and evaluation data."""
     format_kwargs = {"response": response}
 
     # Add all list/string fields from eval_data
@@ -470,15 +500,87 @@ def format_rubric_prompt(
             format_kwargs[key] = str(value) if value else "N/A"
 
     # Fill in any missing placeholders with N/A
-    import re
     placeholders = re.findall(r'\{(\w+)\}', template)
     for ph in placeholders:
         if ph not in format_kwargs:
             format_kwargs[ph] = "N/A"
 
-    return template.format(**format_kwargs)
+    return format_kwargs
+
+
+def format_rubric_prompt(
+    eval_type: str,
+    subtype: str,
+    response: str,
+    eval_data: Dict[str, Any],
+) -> str | None:
+    """Format a rubric prompt with response and evaluation data."""
+    template = get_rubric_prompt(eval_type, subtype)
+    if not template:
+        return None
+
+    return template.format(**_format_kwargs(template, response, eval_data))
+
+
+def format_rubric_prompt_parts(
+    eval_type: str,
+    subtype: str,
+    response: str,
+    eval_data: Dict[str, Any],
+) -> RubricPromptParts | None:
+    """Format a rubric prompt in cache-friendly order: rubric, reference data, response.
+
+    Template sections without placeholders (task header, scoring guidance) form the
+    static rubric, sections filled from eval_data form the reference block, and the
+    response section is always last.
+    """
+    template = get_rubric_prompt(eval_type, subtype)
+    if not template:
+        return None
+
+    format_kwargs = _format_kwargs(template, response, eval_data)
+    rubric, reference, response_sections = [], [], []
+    for section in re.split(r"\n(?=## )", template.strip()):
+        placeholders = set(re.findall(r'\{(\w+)\}', section))
+        if "response" in placeholders:
+            response_sections.append(section)
+        elif placeholders:
+            reference.append(section)
+        else:
+            rubric.append(section)
+
+    def render(sections: List[str]) -> str:
+        return "\n".join(sections).format(**format_kwargs).strip() + "\n" if sections else ""
+
+    return RubricPromptParts(
+        rubric=render(rubric),
+        reference=render(reference),
+        response=render(response_sections),
+    )
+
+
+def format_batch_prompt(rubric_prompts: List[str]) -> str:
+    """Combine several formatted rubric prompts into one multi-item judge prompt."""
+    items = "\n\n".join(
+        f"# Item {i}\n{prompt.strip()}" for i, prompt in enumerate(rubric_prompts, start=1)
+    )
+    return (
+        f"Evaluate the following {len(rubric_prompts)} items. "
+        f"Return a JSON array of {len(rubric_prompts)} score objects.\n\n{items}\n"
+    )
 
 
 def get_all_subtypes() -> List[tuple]:
     """Return all supported (type, subtype) pairs."""
     return list(RUBRIC_PROMPTS.keys())
+
+
+def get_rubric_fields() -> List[str]:
+    """Return the item fields referenced by any rubric template (excluding the response)."""
+    fields = {
+        placeholder
+        for template in RUBRIC_PROMPTS.values()
+        for placeholder in re.findall(r'\{(\w+)\}', template)
+    }
+    fields.discard("response")
+    return sorted(fields)
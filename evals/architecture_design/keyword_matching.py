@@ -0,0 +1,37 @@
+"""
+Precompiled keyword groups for the deterministic architecture scorers.
+
+The keyword scorers check each expected phrase of an item against the response,
+either as a whole phrase or by any of its first few words. Lowercasing and
+splitting those phrases on every scored response costs more than the substring
+checks themselves, so each item's phrases are compiled once into keyword groups
+and every check afterwards is a plain substring test against the response.
+"""
+
+from typing import Iterable, Tuple
+
+# One tuple of keywords per expected phrase; a phrase matches if any keyword does
+KeywordGroups = Tuple[Tuple[str, ...], ...]
+
+
+def phrase_groups(phrases: Iterable[str]) -> KeywordGroups:
+    """Compile phrases that must appear whole."""
+    return tuple((phrase.lower(),) for phrase in phrases)
+
+
+def word_groups(phrases: Iterable[str], max_words: int | None = None) -> KeywordGroups:
+    """Compile phrases that match on any of their first ``max_words`` words."""
+    return tuple(tuple(phrase.lower().split()[:max_words]) for phrase in phrases)
+
+
+def group_matches(group: Tuple[str, ...], text: str) -> bool:
+    """Return True if any keyword of the group occurs in the lowercased text."""
+    for keyword in group:
+        if keyword in text:
+            return True
+    return False
+
+
+def count_matches(groups: KeywordGroups, text: str) -> int:
+    """Count the groups with at least one keyword in the lowercased text."""
+    return sum(1 for group in groups if group_matches(group, text))
@@ -0,0 +1,184 @@
+"""
+Lexical similarity of responses to architecture item references (BM25-weighted TF-IDF).
+
+The keyword scorers only test whether the first words of each expected phrase
+occur somewhere in a response. This module compares the whole response to the
+item's reference texts instead: ``target``, ``expected_flow`` and
+``potential_improvements``. All references are indexed once into a sparse
+term-weight matrix (BM25 term-frequency saturation times IDF, rows L2
+normalized), and responses are scored in batches by cosine similarity against
+the rows of their own item. It needs only numpy: no model download, CPU only.
+
+Each item has one row per reference field plus a combined row of all its
+fields; the combined similarity is the overall score.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+# Item fields used as references; list fields are joined into one text
+REFERENCE_FIELDS = ("target", "expected_flow", "potential_improvements")
+COMBINED = "combined"
+
+# BM25 parameters: term-frequency saturation and reference length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the "
+    "their then this to was were which will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphanumeric tokens of a text, without stopwords."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _reference_text(value: Any) -> str:
+    if isinstance(value, list):
+        return "\n".join(str(item) for item in value)
+    return str(value) if value else ""
+
+
+@dataclass
+class SparseRows:
+    """Rows of a sparse matrix in CSR form."""
+
+    indptr: np.ndarray  # Row i spans indices/data[indptr[i]:indptr[i + 1]]
+    indices: np.ndarray
+    data: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+
+class LexicalIndex:
+    """BM25-weighted, L2-normalized term vectors of every item's reference texts."""
+
+    def __init__(self, records: Iterable[Dict[str, Any]], fields: Sequence[str] = REFERENCE_FIELDS):
+        self.fields = tuple(fields)
+        row_items: List[str] = []
+        row_fields: List[str] = []
+        row_tokens: List[List[str]] = []
+        for record in records:
+            field_tokens = {f: tokenize(_reference_text(record.get(f))) for f in self.fields}
+            field_tokens = {f: tokens for f, tokens in field_tokens.items() if tokens}
+            if not field_tokens:
+                continue
+            combined = [token for tokens in field_tokens.values() for token in tokens]
+            for name, tokens in (*field_tokens.items(), (COMBINED, combined)):
+                row_items.append(record.get("id"))
+                row_fields.append(name)
+                row_tokens.append(tokens)
+
+        # Document frequencies are counted over items (their combined rows)
+        combined_rows = [tokens for tokens, name in zip(row_tokens, row_fields) if name == COMBINED]
+        document_frequency: Dict[str, int] = {}
+        for tokens in combined_rows:
+            for token in set(tokens):
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+
+        self.vocabulary = {token: i for i, token in enumerate(sorted(document_frequency))}
+        items = len(combined_rows)
+        df = np.array([document_frequency[t] for t in self.vocabulary], dtype=np.float64)
+        self.idf = np.log1p((items - df + 0.5) / (df + 0.5))
+        # Terms no reference uses are maximally specific
+        self.unseen_idf = math.log1p((items + 0.5) / 0.5)
+        self.average_length = float(np.mean([len(t) for t in row_tokens])) if row_tokens else 1.0
+
+        self.rows = self._vectorize(row_tokens, length_normalize=True)
+        self.row_fields = row_fields
+        self.item_rows: Dict[str, Dict[str, int]] = {}
+        for row, (item_id, name) in enumerate(zip(row_items, row_fields)):
+            self.item_rows.setdefault(item_id, {})[name] = row
+
+    def __len__(self) -> int:
+        return len(self.item_rows)
+
+    def _vectorize(self, documents: List[List[str]], length_normalize: bool) -> SparseRows:
+        """BM25-weighted, L2-normalized sparse rows for tokenized documents.
+
+        References are length normalized against the average reference length;
+        responses (queries) are not, so a response scores the same in any batch.
+        Tokens outside the vocabulary can't match any reference, but still count
+        towards the row norm, so padding a response with unrelated text lowers
+        its similarity.
+        """
+        indptr = np.zeros(len(documents) + 1, dtype=np.int64)
+        indices: List[np.ndarray] = []
+        data: List[np.ndarray] = []
+        b = BM25_B if length_normalize else 0.0
+        for i, tokens in enumerate(documents):
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            known = [(self.vocabulary[t], c) for t, c in counts.items() if t in self.vocabulary]
+            unseen = np.array([c for t, c in counts.items() if t not in self.vocabulary], dtype=np.float64)
+
+            norm_factor = BM25_K1 * (1 - b + b * len(tokens) / self.average_length)
+            columns = np.array([column for column, _ in known], dtype=np.int64)
+            tf = np.array([count for _, count in known], dtype=np.float64)
+            weights = self.idf[columns] * tf * (BM25_K1 + 1) / (tf + norm_factor)
+            unseen_weights = self.unseen_idf * unseen * (BM25_K1 + 1) / (unseen + norm_factor)
+
+            norm = math.sqrt(float(weights @ weights) + float(unseen_weights @ unseen_weights))
+            order = np.argsort(columns)
+            indices.append(columns[order])
+            data.append(weights[order] / norm if norm else weights[order])
+            indptr[i + 1] = indptr[i] + len(columns)
+
+        return SparseRows(
+            indptr=indptr,
+            indices=np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+            data=np.concatenate(data) if data else np.zeros(0, dtype=np.float64),
+        )
+
+    def score_batch(self, item_ids: Sequence[str], responses: Sequence[str]) -> List[Dict[str, float] | None]:
+        """Cosine similarity of each response to each reference row of its item.
+
+        Returns, per response, {field: similarity, ..., "combined": similarity},
+        or None for items without references in the index.
+        """
+        queries = self._vectorize([tokenize(r) for r in responses], length_normalize=False)
+
+        # (query, reference row) pairs: every row of each response's own item
+        pair_query, pair_row = [], []
+        for q, item_id in enumerate(item_ids):
+            for row in self.item_rows.get(item_id, {}).values():
+                pair_query.append(q)
+                pair_row.append(row)
+        results: List[Dict[str, float] | None] = [
+            {} if item_id in self.item_rows else None for item_id in item_ids
+        ]
+        if not pair_row:
+            return results
+        pair_query_arr = np.array(pair_query, dtype=np.int64)
+        pair_row_arr = np.array(pair_row, dtype=np.int64)
+
+        # Dense query block: only the vocabulary columns, one row per response
+        dense = np.zeros((len(queries), len(self.vocabulary)), dtype=np.float64)
+        query_of_entry = np.repeat(np.arange(len(queries)), np.diff(queries.indptr))
+        dense[query_of_entry, queries.indices] = queries.data
+
+        # Gather every reference entry of every pair, multiply by the query weight
+        # in that column, and sum per pair
+        starts = self.rows.indptr[pair_row_arr]
+        lengths = self.rows.indptr[pair_row_arr + 1] - starts
+        offsets = np.cumsum(lengths) - lengths
+        entry = np.repeat(starts - offsets, lengths) + np.arange(int(lengths.sum()))
+        products = dense[np.repeat(pair_query_arr, lengths), self.rows.indices[entry]] * self.rows.data[entry]
+        similarity = np.zeros(len(pair_row_arr))
+        nonempty = lengths > 0
+        if products.size:
+            similarity[nonempty] = np.add.reduceat(products, offsets[nonempty])
+
+        for q, row, value in zip(pair_query, pair_row, similarity.tolist()):
+            results[q][self.row_fields[row]] = round(value, 6)
+        return results
@@ -0,0 +1,81 @@
+"""
+Shared, lazily computed views of a model response.
+
+Scoring one architecture sample runs several stages over the same response:
+the keyword scorers, the anti-gaming checks and the structural validators. A
+ResponseAnalysis is created once per sample and passed to each stage, so the
+lowercased text, word list, sentences, mentioned AWS services, fenced code blocks
+and detected diagram format are each computed at most once, and only by the stages that need them.
+"""
+
+from collections import Counter
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, List
+
+# Support both relative imports (when run as package) and absolute imports (when loaded by inspect-ai)
+try:
+    from .diagram_validators import detect_format, extract_code_block
+    from ..aws_services import service_counts
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent))
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from diagram_validators import detect_format, extract_code_block
+    from evals.aws_services import service_counts
+
+
+class ResponseAnalysis:
+    """Lazily computed views of one response text."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self._code_blocks: Dict[str | None, str | None] = {}
+
+    @classmethod
+    def of(cls, response: "str | ResponseAnalysis") -> "ResponseAnalysis":
+        """Return ``response`` itself if already analysed, otherwise a new analysis."""
+        if isinstance(response, cls):
+            return response
+        return cls(response)
+
+    @cached_property
+    def lower(self) -> str:
+        """The response lowercased, for case-insensitive keyword matching."""
+        return self.text.lower()
+
+    @cached_property
+    def words(self) -> List[str]:
+        """Whitespace-separated words of the response."""
+        return self.text.split()
+
+    @cached_property
+    def word_count(self) -> int:
+        """Number of whitespace-separated words."""
+        return len(self.words)
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        """The response split on periods (the anti-gaming repetition check)."""
+        return self.text.split(".")
+
+    @cached_property
+    def is_blank(self) -> bool:
+        """True for an empty or whitespace-only response."""
+        return not self.text or self.text.isspace()
+
+    @cached_property
+    def services(self) -> Counter:
+        """Canonical AWS service ids mentioned in the response, with counts (one pass)."""
+        return service_counts(self.text)
+
+    @cached_property
+    def detected_format(self) -> str | None:
+        """Diagram format detected in the response (see detect_format)."""
+        return detect_format(self.text)
+
+    def code_block(self, language: str | None = None) -> str | None:
+        """Largest fenced code block for ``language`` (see extract_code_block), memoized."""
+        if language not in self._code_blocks:
+            self._code_blocks[language] = extract_code_block(self.text, language)
+        return self._code_blocks[language]
@@ -5,17 +5,20 @@ This module defines evaluation tasks for testing AI model capabilities on AWS ar
 design, including diagram interpretation and creation tasks.
 """
 
+import asyncio
 import base64
 import json
 import logging
 import mimetypes
 import os
 import re
+from dataclasses import asdict, dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict
 
 from inspect_ai import Task, task
-from inspect_ai.dataset import Dataset, MemoryDataset, Sample
+from inspect_ai.dataset import Dataset, Sample
 from inspect_ai.model import (
     ChatMessageSystem,
     ChatMessageUser,
@@ -31,32 +34,69 @@ from inspect_ai.solver import Generate, Solver, TaskState, generate, solver
 # Support both relative imports (when run as package) and absolute imports (when loaded by inspect-ai)
 try:
     from .judge_prompts import (
+        JUDGE_BATCH_SYSTEM_PROMPT,
         JUDGE_SYSTEM_PROMPT,
+        format_batch_prompt,
         format_rubric_prompt,
+        format_rubric_prompt_parts,
+        RubricPromptParts,
         get_hidden_criteria,
+        get_rubric_fields,
     )
     from .diagram_validators import (
         validate_structured_output,
         check_required_components,
         ValidationResult,
     )
+    from .dataset_index import LazyArchitectureDataset, get_index
+    from .json_extraction import find_json_array, find_json_object
+    from .lexical_similarity import COMBINED, LexicalIndex
+    from .keyword_matching import (
+        KeywordGroups,
+        count_matches,
+        group_matches,
+        phrase_groups,
+        word_groups,
+    )
+    from .response_analysis import ResponseAnalysis
+    from ..aws_services import canonical_service
 except ImportError:
     # Fallback for inspect-ai direct module loading
     import sys
     sys.path.insert(0, str(Path(__file__).parent))
     from judge_prompts import (
+        JUDGE_BATCH_SYSTEM_PROMPT,
         JUDGE_SYSTEM_PROMPT,
+        format_batch_prompt,
         format_rubric_prompt,
+        format_rubric_prompt_parts,
+        RubricPromptParts,
         get_hidden_criteria,
+        get_rubric_fields,
     )
     from diagram_validators import (
         validate_structured_output,
         check_required_components,
         ValidationResult,
     )
+    from dataset_index import LazyArchitectureDataset, get_index
+    from json_extraction import find_json_array, find_json_object
+    from lexical_similarity import COMBINED, LexicalIndex
+    from keyword_matching import (
+        KeywordGroups,
+        count_matches,
+        group_matches,
+        phrase_groups,
+        word_groups,
+    )
+    from response_analysis import ResponseAnalysis
+    from evals.aws_services import canonical_service
 
 logger = logging.getLogger(__name__)
 
+# Dataset file for the architecture tasks, relative to this module
+ARCHITECTURE_DATASET = "architecture_interpretation.jsonl"
+
 
 # System prompts for different evaluation types
 ARCHITECTURE_SYSTEM_PROMPT = """You are an expert AWS Solutions Architect with deep knowledge of AWS services, architectural patterns, and best practices. You have extensive experience in:
@@ -125,43 +165,92 @@ Your response should include:
 Format your response clearly with these sections. Be specific about AWS services, configurations, and architectural patterns used."""
 
 
-def load_architecture_dataset(file_path: str) -> Dataset:
-    """Load architecture dataset with full metadata preserved.
+def _sample_metadata(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a dataset record onto the fields the solver and scorers read.
 
-    Skips items that reference images which don't exist to avoid
-    asking models to analyze diagrams they can't see.
+    Unset (None) fields are dropped; they format and score the same as missing ones.
     """
-    import json
+    return {
+        field: data[field]
+        for field in SAMPLE_METADATA_FIELDS
+        if data.get(field) is not None
+    }
 
-    samples = []
-    skipped_count = 0
-    file_path_obj = Path(__file__).parent / file_path
+
+def _architecture_sample(data: Dict[str, Any]) -> Sample:
+    """Build a Sample from one dataset record, keeping only the metadata used for scoring
+    and for breaking scores down by item.
+
+    Metadata is copied into every logged sample, so the rest of the record
+    (scoring criteria, answer text, ...) is left in the dataset file and can be
+    looked up by id with item_record.
+    """
+    # Compile the item's keyword groups once, ahead of scoring
+    _item_keywords(data)
+
+    return Sample(
+        id=data.get("id"),
+        input=data.get("input", ""),
+        target=data.get("target", ""),
+        metadata=_sample_metadata(data),
+    )
+
+
+def item_record(item_id: str, file_path: str = ARCHITECTURE_DATASET) -> Dict[str, Any] | None:
+    """Return the full dataset record for an item id, or None if there is no such item."""
     base_dir = Path(__file__).parent
+    return get_index(base_dir / file_path, base_dir).record(item_id)
 
-    with open(file_path_obj, "r") as f:
-        for line in f:
-            data = json.loads(line.strip())
 
-            # Check if item references an image that doesn't exist
-            diagram_path = data.get("diagram_path")
-            if diagram_path:
-                image_file = (base_dir / diagram_path).resolve()
-                if not image_file.exists():
-                    item_id = data.get("id", "unknown")
-                    logger.warning(
-                        f"Skipping architecture item {item_id}: "
-                        f"referenced image not found: {diagram_path}"
-                    )
-                    skipped_count += 1
-                    continue
-
-            # Create sample with input/target fields and preserve metadata
-            sample = Sample(
-                input=data.get("input", ""),
-                target=data.get("target", ""),
-                metadata=data,  # Store the full original data
+def load_architecture_dataset(
+    file_path: str,
+    limit: int | None = None,
+    sample_ids: str | list[str] | None = None,
+) -> Dataset:
+    """Load architecture dataset, with the metadata used for prompting and scoring.
+
+    Skips items that reference images which don't exist to avoid
+    asking models to analyze diagrams they can't see.
+
+    Records are located through a cached offset index (see dataset_index) and
+    parsed only when their Sample is first used, so slicing the dataset (e.g.
+    inspect's --limit) reads only the records it keeps.
+
+    Args:
+        file_path: JSONL file, relative to this module
+        limit: Keep only the first N usable items
+        sample_ids: Keep only these item ids (a list or comma-separated string),
+                    in file order
+    """
+    base_dir = Path(__file__).parent
+    index = get_index(base_dir / file_path, base_dir)
+
+    if sample_ids is not None:
+        if isinstance(sample_ids, str):
+            sample_ids = [s.strip() for s in sample_ids.split(",") if s.strip()]
+        positions = []
+        for item_id in sample_ids:
+            position = index.position(item_id)
+            if position is None:
+                logger.warning(f"Architecture item {item_id} not found in {file_path}")
+            else:
+                positions.append(position)
+        candidates = sorted(set(positions))
+    else:
+        candidates = range(len(index))
+
+    positions = []
+    skipped_count = 0
+    for position in candidates:
+        if not index.is_usable(position):
+            item_id = index.ids[position]
+            logger.warning(
+                f"Skipping architecture item {item_id}: "
+                f"referenced image not found: {index.missing_diagrams.get(item_id)}"
             )
-            samples.append(sample)
+            skipped_count += 1
+            continue
+        positions.append(position)
 
     if skipped_count > 0:
         logger.warning(
@@ -169,7 +258,16 @@ def load_architecture_dataset(file_path: str) -> Dataset:
             "Run with DEBUG logging to see details."
         )
 
-    return MemoryDataset(samples)
+    if limit is not None:
+        positions = positions[:limit]
+
+    return LazyArchitectureDataset(
+        index,
+        positions,
+        _architecture_sample,
+        name=Path(file_path).stem,
+        location=str(index.path),
+    )
 
 
 # Custom metrics for architecture evaluation
@@ -274,6 +372,7 @@ def architecture_scorer() -> Scorer:
         eval_data = _get_sample_metadata(state)
 
         response = state.output.completion if state.output else ""
+        analysis = ResponseAnalysis(response)
 
         # Initialize scores
         accuracy_score = 0.0
@@ -285,11 +384,11 @@ def architecture_scorer() -> Scorer:
 
         if eval_type == "diagram_interpretation":
             accuracy_score, completeness_score, quality_score = score_interpretation(
-                response, eval_data, subtype
+                analysis, eval_data, subtype
             )
         elif eval_type == "diagram_creation":
             accuracy_score, completeness_score, quality_score = score_creation(
-                response, eval_data, subtype
+                analysis, eval_data, subtype
             )
 
         # Calculate overall score
@@ -309,113 +408,238 @@ def architecture_scorer() -> Scorer:
     return score
 
 
+@lru_cache(maxsize=None)
+def _lexical_index(path: str, mtime_ns: int) -> LexicalIndex:
+    """Build the lexical index of a dataset file (once per file version)."""
+    index = get_index(Path(path), Path(__file__).parent)
+    return LexicalIndex(data for _, data in index.read_records(range(len(index))))
+
+
+def lexical_index(file_path: str = ARCHITECTURE_DATASET) -> LexicalIndex:
+    """Return the lexical index of every item's reference texts in a dataset file."""
+    base_dir = Path(__file__).parent
+    index = get_index(base_dir / file_path, base_dir)
+    return _lexical_index(str(index.path), index.mtime_ns)
+
+
+@scorer(metrics=[mean()])
+def lexical_similarity_scorer(dataset: str = ARCHITECTURE_DATASET) -> Scorer:
+    """Deterministic scorer: cosine similarity of the response to the item's references.
+
+    Compares BM25-weighted term vectors of the response and of the item's
+    target, expected_flow and potential_improvements (see lexical_similarity).
+    Runs locally with no model calls, as a cheap signal for blending or for
+    deciding which samples need a judge.
+    """
+    index = lexical_index(dataset)
+
+    async def score(state: TaskState, target: Target) -> Score:
+        eval_data = _get_sample_metadata(state)
+        item_id = eval_data.get("id", state.sample_id)
+        response = state.output.completion if state.output else ""
+        similarity = index.score_batch([item_id], [response])[0]
+        if similarity is None:
+            return Score(value=0.0, explanation=f"No reference texts for item {item_id}")
+        return Score(
+            value=similarity[COMBINED],
+            metadata={
+                "scorer": "lexical_similarity",
+                "similarity": similarity,
+                "type": eval_data.get("type", ""),
+                "subtype": eval_data.get("subtype", ""),
+            },
+        )
+
+    return score
+
+
+# How each item field is matched: whole phrase (None) or by its first N words (0 = all)
+KEYWORD_FIELDS: Dict[str, int | None] = {
+    "expected_flow": 3,
+    "expected_security_components": None,
+    "potential_improvements": 2,
+    "expected_scaling_mechanisms": None,
+    "potential_bottlenecks": 2,
+    "cost_optimization_opportunities": 2,
+    "cost_factors": None,
+    "expected_components": None,
+    "architectural_principles": 0,
+    "expected_pattern_elements": None,
+    "pattern_benefits": 0,
+    "expected_solution_elements": 2,
+    "migration_phases": 0,
+}
+
+# Item fields kept as Sample metadata: those read by the solver, the deterministic
+# checks and the judge rubric templates
+SAMPLE_METADATA_FIELDS: tuple[str, ...] = tuple(
+    dict.fromkeys(
+        [
+            "id",
+            "type",
+            "subtype",
+            # Item fields scores are broken down by (aggregate_multi.item_metadata)
+            "difficulty",
+            "domains",
+            "aws_services",
+            "diagram_path",
+            "output_format",
+            "requirements",
+            "pattern",
+            "problem",
+            "constraints",
+            "expected_services",
+            *KEYWORD_FIELDS,
+            *get_rubric_fields(),
+        ]
+    )
+)
+
+# Compiled keyword groups by item id, with the field values they were compiled from
+_ITEM_KEYWORDS: Dict[str, tuple[list, Dict[str, KeywordGroups]]] = {}
+
+
+def _compile_item_keywords(eval_data: Dict) -> Dict[str, KeywordGroups]:
+    """Lowercase and split an item's expected phrases into keyword groups."""
+    services = eval_data.get("expected_services") or []
+    compiled = {
+        "services": tuple(
+            (info["service"].lower(), *info["service"].lower().split()) for info in services
+        ),
+        "service_roles": word_groups(info["role"] for info in services),
+        # Canonical service ids (None for names the service index doesn't know)
+        "service_ids": tuple(canonical_service(info["service"]) for info in services),
+        "component_ids": tuple(
+            canonical_service(name) for name in eval_data.get("expected_components") or []
+        ),
+    }
+    for field, max_words in KEYWORD_FIELDS.items():
+        phrases = eval_data.get(field) or []
+        if max_words is None:
+            compiled[field] = phrase_groups(phrases)
+        else:
+            compiled[field] = word_groups(phrases, max_words or None)
+    return compiled
+
+
+def _item_keywords(eval_data: Dict) -> Dict[str, KeywordGroups]:
+    """Return the keyword groups for an item, compiling them on first use."""
+    sources = [eval_data.get("expected_services")]
+    sources.extend(eval_data.get(field) for field in KEYWORD_FIELDS)
+
+    item_id = eval_data.get("id")
+    cached = _ITEM_KEYWORDS.get(item_id) if item_id else None
+    if cached is not None and cached[0] == sources:
+        return cached[1]
+
+    compiled = _compile_item_keywords(eval_data)
+    if item_id:
+        _ITEM_KEYWORDS[item_id] = (sources, compiled)
+    return compiled
+
+
+def _service_mentioned(
+    keywords: tuple[str, ...], service_id: str | None, analysis: ResponseAnalysis
+) -> bool:
+    """Whether the response mentions a service by its keywords or any alias of its canonical id."""
+    if group_matches(keywords, analysis.lower):
+        return True
+    return service_id is not None and service_id in analysis.services
+
+
 def score_interpretation(
-    response: str, eval_data: Dict, subtype: str
+    response: str | ResponseAnalysis, eval_data: Dict, subtype: str
 ) -> tuple[float, float, float]:
     """Score diagram interpretation tasks."""
 
-    response_lower = response.lower()
+    analysis = ResponseAnalysis.of(response)
 
     if subtype == "service_identification":
-        return score_service_identification(response, response_lower, eval_data)
+        return score_service_identification(analysis, eval_data)
     elif subtype == "data_flow_analysis":
-        return score_data_flow_analysis(response, response_lower, eval_data)
+        return score_data_flow_analysis(analysis, eval_data)
     elif subtype == "security_assessment":
-        return score_security_assessment(response, response_lower, eval_data)
+        return score_security_assessment(analysis, eval_data)
     elif subtype == "scalability_analysis":
-        return score_scalability_analysis(response, response_lower, eval_data)
+        return score_scalability_analysis(analysis, eval_data)
     elif subtype == "cost_optimization":
-        return score_cost_optimization(response, response_lower, eval_data)
+        return score_cost_optimization(analysis, eval_data)
 
     return 0.5, 0.5, 0.5  # Default moderate score
 
 
 def score_service_identification(
-    response: str, response_lower: str, eval_data: Dict
+    analysis: ResponseAnalysis, eval_data: Dict
 ) -> tuple[float, float, float]:
     """Score service identification tasks."""
 
     expected_services = eval_data.get("expected_services", [])
+    keywords = _item_keywords(eval_data)
 
     # Check for service mentions
     services_found = 0
     roles_explained = 0
 
-    for service_info in expected_services:
-        service_name = service_info["service"].lower()
-        service_role = service_info["role"].lower()
-
-        # Check if service is mentioned
-        if service_name in response_lower or any(
-            word in response_lower for word in service_name.split()
-        ):
+    for service_keywords, role_keywords, service_id in zip(
+        keywords["services"], keywords["service_roles"], keywords["service_ids"]
+    ):
+        # Check if service is mentioned, by name or by any alias of the same service
+        if _service_mentioned(service_keywords, service_id, analysis):
             services_found += 1
 
             # Check if role is explained (basic keyword matching)
-            role_keywords = service_role.split()
-            if any(keyword in response_lower for keyword in role_keywords):
+            if group_matches(role_keywords, analysis.lower):
                 roles_explained += 1
 
     accuracy = services_found / len(expected_services) if expected_services else 0
     completeness = roles_explained / len(expected_services) if expected_services else 0
 
     # Quality based on response length and structure
-    quality = min(1.0, len(response.split()) / 100)  # Reward detailed responses
+    quality = min(1.0, analysis.word_count / 100)  # Reward detailed responses
 
     return accuracy, completeness, quality
 
 
 def score_data_flow_analysis(
-    response: str, response_lower: str, eval_data: Dict
+    analysis: ResponseAnalysis, eval_data: Dict
 ) -> tuple[float, float, float]:
     """Score data flow analysis tasks."""
 
     expected_flow = eval_data.get("expected_flow", [])
+    keywords = _item_keywords(eval_data)
 
-    # Check for flow step mentions
-    steps_found = 0
-    for step in expected_flow:
-        step_keywords = step.lower().split()
-        if any(
-            keyword in response_lower for keyword in step_keywords[:3]
-        ):  # Check first 3 words
-            steps_found += 1
+    # Check for flow step mentions (first 3 words of each step)
+    steps_found = count_matches(keywords["expected_flow"], analysis.lower)
 
     accuracy = steps_found / len(expected_flow) if expected_flow else 0
 
     # Check for flow indicators (sequential words)
     flow_indicators = ["first", "then", "next", "after", "finally", "step", "->", "→"]
     flow_structure = sum(
-        1 for indicator in flow_indicators if indicator in response_lower
+        1 for indicator in flow_indicators if indicator in analysis.lower
     )
     completeness = min(1.0, flow_structure / 5)  # Normalize to 0-1
 
     # Quality based on explanation depth
-    quality = min(1.0, len(response.split()) / 150)
+    quality = min(1.0, analysis.word_count / 150)
 
     return accuracy, completeness, quality
 
 
 def score_security_assessment(
-    response: str, response_lower: str, eval_data: Dict
+    analysis: ResponseAnalysis, eval_data: Dict
 ) -> tuple[float, float, float]:
     """Score security assessment tasks."""
 
     security_components = eval_data.get("expected_security_components", [])
     improvements = eval_data.get("potential_improvements", [])
+    keywords = _item_keywords(eval_data)
 
     # Check for security component identification
-    components_found = 0
-    for component in security_components:
-        if component.lower() in response_lower:
-            components_found += 1
+    components_found = count_matches(keywords["expected_security_components"], analysis.lower)
 
     # Check for improvement suggestions
-    improvements_found = 0
-    for improvement in improvements:
-        improvement_keywords = improvement.lower().split()
-        if any(keyword in response_lower for keyword in improvement_keywords[:2]):
-            improvements_found += 1
+    improvements_found = count_matches(keywords["potential_improvements"], analysis.lower)
 
     accuracy = components_found / len(security_components) if security_components else 0
     completeness = improvements_found / len(improvements) if improvements else 0
@@ -430,7 +654,7 @@ def score_security_assessment(
         "encryption",
     ]
     security_depth = sum(
-        1 for keyword in security_keywords if keyword in response_lower
+        1 for keyword in security_keywords if keyword in analysis.lower
     )
     quality = min(1.0, security_depth / 5)
 
@@ -438,25 +662,19 @@ def score_security_assessment(
 
 
 def score_scalability_analysis(
-    response: str, response_lower: str, eval_data: Dict
+    analysis: ResponseAnalysis, eval_data: Dict
 ) -> tuple[float, float, float]:
     """Score scalability analysis tasks."""
 
     scaling_mechanisms = eval_data.get("expected_scaling_mechanisms", [])
     bottlenecks = eval_data.get("potential_bottlenecks", [])
+    keywords = _item_keywords(eval_data)
 
     # Check for scaling mechanism identification
-    mechanisms_found = 0
-    for mechanism in scaling_mechanisms:
-        if mechanism.lower() in response_lower:
-            mechanisms_found += 1
+    mechanisms_found = count_matches(keywords["expected_scaling_mechanisms"], analysis.lower)
 
     # Check for bottleneck identification
-    bottlenecks_found = 0
-    for bottleneck in bottlenecks:
-        bottleneck_keywords = bottleneck.lower().split()
-        if any(keyword in response_lower for keyword in bottleneck_keywords[:2]):
-            bottlenecks_found += 1
+    bottlenecks_found = count_matches(keywords["potential_bottlenecks"], analysis.lower)
 
     accuracy = mechanisms_found / len(scaling_mechanisms) if scaling_mechanisms else 0
     completeness = bottlenecks_found / len(bottlenecks) if bottlenecks else 0
@@ -471,7 +689,7 @@ def score_scalability_analysis(
         "throughput",
     ]
     scalability_depth = sum(
-        1 for keyword in scalability_keywords if keyword in response_lower
+        1 for keyword in scalability_keywords if keyword in analysis.lower
     )
     quality = min(1.0, scalability_depth / 4)
 
@@ -479,25 +697,21 @@ def score_scalability_analysis(
 
 
 def score_cost_optimization(
-    response: str, response_lower: str, eval_data: Dict
+    analysis: ResponseAnalysis, eval_data: Dict
 ) -> tuple[float, float, float]:
     """Score cost optimization tasks."""
 
     opportunities = eval_data.get("cost_optimization_opportunities", [])
     cost_factors = eval_data.get("cost_factors", [])
+    keywords = _item_keywords(eval_data)
 
     # Check for optimization opportunities
-    opportunities_found = 0
-    for opportunity in opportunities:
-        opportunity_keywords = opportunity.lower().split()
-        if any(keyword in response_lower for keyword in opportunity_keywords[:2]):
-            opportunities_found += 1
+    opportunities_found = count_matches(
+        keywords["cost_optimization_opportunities"], analysis.lower
+    )
 
     # Check for cost factor understanding
-    factors_found = 0
-    for factor in cost_factors:
-        if factor.lower() in response_lower:
-            factors_found += 1
+    factors_found = count_matches(keywords["cost_factors"], analysis.lower)
 
     accuracy = opportunities_found / len(opportunities) if opportunities else 0
     completeness = factors_found / len(cost_factors) if cost_factors else 0
@@ -512,49 +726,49 @@ def score_cost_optimization(
         "reserved",
         "spot",
     ]
-    cost_depth = sum(1 for keyword in cost_keywords if keyword in response_lower)
+    cost_depth = sum(1 for keyword in cost_keywords if keyword in analysis.lower)
     quality = min(1.0, cost_depth / 5)
 
     return accuracy, completeness, quality
 
 
 def score_creation(
-    response: str, eval_data: Dict, subtype: str
+    response: str | ResponseAnalysis, eval_data: Dict, subtype: str
 ) -> tuple[float, float, float]:
     """Score diagram creation tasks."""
 
-    response_lower = response.lower()
+    analysis = ResponseAnalysis.of(response)
 
     if subtype == "requirements_to_architecture":
-        return score_requirements_architecture(response, response_lower, eval_data)
+        return score_requirements_architecture(analysis, eval_data)
     elif subtype == "pattern_implementation":
-        return score_pattern_implementation(response, response_lower, eval_data)
+        return score_pattern_implementation(analysis, eval_data)
     elif subtype == "problem_solving":
-        return score_problem_solving(response, response_lower, eval_data)
+        return score_problem_solving(analysis, eval_data)
 
     return 0.5, 0.5, 0.5  # Default moderate score
 
 
 def score_requirements_architecture(
-    response: str, response_lower: str, eval_data: Dict
+    analysis: ResponseAnalysis, eval_data: Dict
 ) -> tuple[float, float, float]:
     """Score requirements to architecture tasks."""
 
     expected_components = eval_data.get("expected_components", [])
     principles = eval_data.get("architectural_principles", [])
+    keywords = _item_keywords(eval_data)
 
-    # Check for component mentions
-    components_found = 0
-    for component in expected_components:
-        if component.lower() in response_lower:
-            components_found += 1
+    # Check for component mentions, by name or by any alias of the same service
+    components_found = sum(
+        1
+        for component_keywords, service_id in zip(
+            keywords["expected_components"], keywords["component_ids"]
+        )
+        if _service_mentioned(component_keywords, service_id, analysis)
+    )
 
     # Check for architectural principles
-    principles_found = 0
-    for principle in principles:
-        principle_keywords = principle.lower().split()
-        if any(keyword in response_lower for keyword in principle_keywords):
-            principles_found += 1
+    principles_found = count_matches(keywords["architectural_principles"], analysis.lower)
 
     accuracy = components_found / len(expected_components) if expected_components else 0
     completeness = principles_found / len(principles) if principles else 0
@@ -568,66 +782,52 @@ def score_requirements_architecture(
         "secure",
         "resilient",
     ]
-    arch_depth = sum(1 for keyword in arch_keywords if keyword in response_lower)
+    arch_depth = sum(1 for keyword in arch_keywords if keyword in analysis.lower)
     quality = min(1.0, arch_depth / 4)
 
     return accuracy, completeness, quality
 
 
 def score_pattern_implementation(
-    response: str, response_lower: str, eval_data: Dict
+    analysis: ResponseAnalysis, eval_data: Dict
 ) -> tuple[float, float, float]:
     """Score pattern implementation tasks."""
 
     pattern_elements = eval_data.get("expected_pattern_elements", [])
     benefits = eval_data.get("pattern_benefits", [])
+    keywords = _item_keywords(eval_data)
 
     # Check for pattern elements
-    elements_found = 0
-    for element in pattern_elements:
-        if element.lower() in response_lower:
-            elements_found += 1
+    elements_found = count_matches(keywords["expected_pattern_elements"], analysis.lower)
 
     # Check for pattern benefits understanding
-    benefits_found = 0
-    for benefit in benefits:
-        benefit_keywords = benefit.lower().split()
-        if any(keyword in response_lower for keyword in benefit_keywords):
-            benefits_found += 1
+    benefits_found = count_matches(keywords["pattern_benefits"], analysis.lower)
 
     accuracy = elements_found / len(pattern_elements) if pattern_elements else 0
     completeness = benefits_found / len(benefits) if benefits else 0
 
     # Quality based on pattern understanding
     pattern_keywords = ["pattern", "microservices", "event", "serverless", "decoupled"]
-    pattern_depth = sum(1 for keyword in pattern_keywords if keyword in response_lower)
+    pattern_depth = sum(1 for keyword in pattern_keywords if keyword in analysis.lower)
     quality = min(1.0, pattern_depth / 3)
 
     return accuracy, completeness, quality
 
 
 def score_problem_solving(
-    response: str, response_lower: str, eval_data: Dict
+    analysis: ResponseAnalysis, eval_data: Dict
 ) -> tuple[float, float, float]:
     """Score problem solving tasks."""
 
     solution_elements = eval_data.get("expected_solution_elements", [])
     phases = eval_data.get("migration_phases", [])
+    keywords = _item_keywords(eval_data)
 
     # Check for solution elements
-    elements_found = 0
-    for element in solution_elements:
-        element_keywords = element.lower().split()
-        if any(keyword in response_lower for keyword in element_keywords[:2]):
-            elements_found += 1
+    elements_found = count_matches(keywords["expected_solution_elements"], analysis.lower)
 
     # Check for migration phases (if applicable)
-    phases_found = 0
-    if phases:
-        for phase in phases:
-            phase_keywords = phase.lower().split()
-            if any(keyword in response_lower for keyword in phase_keywords):
-                phases_found += 1
+    phases_found = count_matches(keywords["migration_phases"], analysis.lower)
 
     accuracy = elements_found / len(solution_elements) if solution_elements else 0
     completeness = (
@@ -643,7 +843,7 @@ def score_problem_solving(
         "implementation",
     ]
     solution_depth = sum(
-        1 for keyword in solution_keywords if keyword in response_lower
+        1 for keyword in solution_keywords if keyword in analysis.lower
     )
     quality = min(1.0, solution_depth / 3)
 
@@ -659,16 +859,57 @@ DEFAULT_JUDGE_MODEL = os.environ.get(
     "ARCHITECTURE_JUDGE_MODEL", "openai/gpt-4o-mini"
 )
 
+# Max rubric prompts per judge request (1 = batching disabled)
+DEFAULT_JUDGE_BATCH_SIZE = int(os.environ.get("ARCHITECTURE_JUDGE_BATCH_SIZE", "1"))
+
+# Rubric prompt layout: "inline" (response inside the rubric) or "cached"
+# (stable rubric/reference prefix in the system message, response last)
+DEFAULT_JUDGE_PROMPT_LAYOUT = os.environ.get("ARCHITECTURE_JUDGE_PROMPT_LAYOUT", "inline")
+
+# Weight of the deterministic (keyword) scores when blending with the judge
+DEFAULT_BLEND_DETERMINISTIC = 0.3
+
+# Judge ensembles: stop after the first two judges when every dimension agrees
+# within this tolerance, otherwise call the rest and aggregate all of them
+DEFAULT_JUDGE_AGREEMENT = 0.1
+
+# Sampling temperature for repeated draws from the same judge model (a single
+# draw is always at temperature 0)
+DEFAULT_JUDGE_DRAW_TEMPERATURE = 0.7
+
+JUDGE_DIMENSIONS = ("accuracy", "completeness", "quality")
+
+
+@dataclass(frozen=True)
+class ScoreModifiers:
+    """Adjustments applied after blending judge and deterministic scores.
+
+    scripts/optimize_blend.py fits these (and the blend weight) against the
+    calibration ground truth.
+    """
+
+    hidden_criteria_bonus: float = 0.1  # Scaled by the fraction of hidden criteria met
+    short_response_factor: float = 0.8  # Responses under 50 words
+    repetitive_response_factor: float = 0.9  # Long responses with repeated sentence starts
+    validation_bonus: float = 0.05  # Quality bonus for valid structured output
+    validation_penalty: float = 0.2  # All dimensions, when required output is invalid
+    missing_components_penalty: float = 0.1  # Scaled by the fraction of components missing
+
+
+DEFAULT_SCORE_MODIFIERS = ScoreModifiers()
+
+# The hidden-criteria bonus never lifts the anti-gaming factor above this
+MAX_CRITERIA_FACTOR = 1.1
+
 
 def _parse_judge_response(response_text: str) -> Dict:
     """Parse JSON scores from judge response, handling common formatting issues."""
-    # Try to extract JSON from the response
-    json_match = re.search(r'\{[^{}]*\}', response_text, re.DOTALL)
-    if json_match:
-        try:
-            return json.loads(json_match.group())
-        except json.JSONDecodeError:
-            pass
+    # Try to extract the scores object from the response
+    scores = find_json_object(
+        response_text, lambda obj: any(key in obj for key in ("accuracy", "completeness", "quality"))
+    )
+    if scores is not None:
+        return scores
 
     # Try parsing the whole response as JSON
     try:
@@ -689,8 +930,33 @@ def _parse_judge_response(response_text: str) -> Dict:
     return scores
 
 
+def _parse_batch_judge_response(response_text: str, expected_count: int) -> list[Dict] | None:
+    """Parse a JSON array of per-item scores from a batched judge response.
+
+    Returns None unless the array can be matched one-to-one with the batch items,
+    so callers can fall back to judging each item separately.
+    """
+    items = find_json_array(
+        response_text,
+        lambda items: len(items) == expected_count
+        and all(
+            isinstance(item, dict)
+            and all(isinstance(item.get(key), (int, float)) for key in ("accuracy", "completeness", "quality"))
+            for item in items
+        ),
+    )
+    if items is None:
+        return None
+
+    # Honour explicit item numbers if the judge returned them out of order
+    numbers = [item.get("item") for item in items]
+    if sorted(n for n in numbers if isinstance(n, int)) == list(range(1, expected_count + 1)):
+        items = sorted(items, key=lambda item: item["item"])
+    return items
+
+
 def _apply_deterministic_checks(
-    response: str, eval_data: Dict, subtype: str
+    response: str | ResponseAnalysis, eval_data: Dict, subtype: str
 ) -> tuple[float, float, float]:
     """Get deterministic (keyword-based) scores for fallback/blending."""
     eval_type = eval_data.get("type", "")
@@ -706,6 +972,7 @@ def _apply_validation_modifier(
     validation_result: ValidationResult,
     format_required: bool,
     expected_components: list[str] | None = None,
+    modifiers: ScoreModifiers = DEFAULT_SCORE_MODIFIERS,
 ) -> tuple[Dict[str, float], Dict[str, Any]]:
     """
     Apply score modifier based on structural validation result.
@@ -715,6 +982,7 @@ def _apply_validation_modifier(
         validation_result: Result from validate_structured_output
         format_required: Whether structured format was required for this task
         expected_components: Optional list of component names to check
+        modifiers: Bonus and penalty sizes (default: DEFAULT_SCORE_MODIFIERS)
 
     Returns:
         Tuple of (modified_scores, validation_metadata)
@@ -725,6 +993,8 @@ def _apply_validation_modifier(
         "validation_passed": validation_result.is_valid,
         "validation_error": validation_result.error_message,
     }
+    if validation_result.graph is not None:
+        metadata["graph_metrics"] = validation_result.graph.metrics()
 
     if not format_required:
         # No format requirement, validation is informational only
@@ -732,93 +1002,351 @@ def _apply_validation_modifier(
         return scores, metadata
 
     if validation_result.is_valid:
-        # Valid structured output: +5% bonus to quality
+        # Valid structured output: bonus to quality (+5% by default)
         scores = scores.copy()
-        scores["quality"] = min(1.0, scores["quality"] * 1.05)
-        metadata["validation_bonus"] = 0.05
+        scores["quality"] = min(1.0, scores["quality"] * (1.0 + modifiers.validation_bonus))
+        metadata["validation_bonus"] = modifiers.validation_bonus
 
         # Check for required components if specified
         if expected_components:
             all_present, missing = check_required_components(
                 validation_result, expected_components
             )
+            missing_ratio = len(missing) / len(expected_components)
             metadata["components_check"] = {
                 "all_present": all_present,
                 "missing": missing,
+                "missing_ratio": missing_ratio,
             }
             if not all_present:
-                # Penalty for missing components
-                missing_ratio = len(missing) / len(expected_components)
-                penalty = 1.0 - (0.1 * missing_ratio)  # Up to 10% penalty
+                # Penalty for missing components (up to 10% by default)
+                penalty = 1.0 - (modifiers.missing_components_penalty * missing_ratio)
                 scores = {k: v * penalty for k, v in scores.items()}
                 metadata["components_penalty"] = 1.0 - penalty
     else:
-        # Invalid when required: -20% penalty to all dimensions
-        penalty = 0.8
+        # Invalid when required: penalty to all dimensions (-20% by default)
+        penalty = 1.0 - modifiers.validation_penalty
         scores = {k: v * penalty for k, v in scores.items()}
-        metadata["validation_penalty"] = 0.2
+        metadata["validation_penalty"] = modifiers.validation_penalty
 
     return scores, metadata
 
 
-def _check_anti_gaming(response: str, subtype: str) -> float:
-    """Check for anti-gaming signals and return a penalty factor (0.0-1.0)."""
-    response_lower = response.lower()
-    penalty = 1.0
+@lru_cache(maxsize=None)
+def _hidden_criteria_keywords(subtype: str) -> KeywordGroups:
+    """Return the compiled keyword groups (first 3 words) of a subtype's hidden criteria."""
+    return word_groups(get_hidden_criteria(subtype), 3)
 
-    # Check for hidden criteria (reward expertise)
-    hidden_criteria = get_hidden_criteria(subtype)
-    criteria_met = 0
-    for criterion in hidden_criteria:
-        # Check if key concepts from criterion appear in response
-        criterion_keywords = criterion.lower().split()[:3]
-        if any(kw in response_lower for kw in criterion_keywords):
-            criteria_met += 1
 
-    # Bonus for meeting hidden criteria (up to 10%)
-    if hidden_criteria:
-        criteria_bonus = 0.1 * (criteria_met / len(hidden_criteria))
-        penalty = min(1.1, penalty + criteria_bonus)
+def _anti_gaming_signals(response: str | ResponseAnalysis, subtype: str) -> Dict[str, Any]:
+    """Measure the raw anti-gaming signals that _anti_gaming_factor turns into a factor."""
+    analysis = ResponseAnalysis.of(response)
 
-    # Penalty for suspicious patterns
-    word_count = len(response.split())
+    # Check for hidden criteria (reward expertise)
+    hidden_criteria = get_hidden_criteria(subtype)
+    # Check if key concepts from each criterion appear in response
+    criteria_met = count_matches(_hidden_criteria_keywords(subtype), analysis.lower)
 
-    # Very short responses (likely incomplete)
-    if word_count < 50:
-        penalty *= 0.8
+    # Suspicious patterns
+    word_count = analysis.word_count
+    repetitive = False
 
     # Extremely long responses may be padding
     if word_count > 1500:
         # Check for repetitive content
-        sentences = response.split('.')
+        sentences = analysis.sentences
         if len(sentences) > 10:
             unique_starts = set(s[:30].lower() for s in sentences if len(s) > 30)
-            if len(unique_starts) < len(sentences) * 0.5:
-                penalty *= 0.9  # Penalty for repetitive content
+            repetitive = len(unique_starts) < len(sentences) * 0.5
+
+    return {
+        "criteria_ratio": criteria_met / len(hidden_criteria) if hidden_criteria else 0.0,
+        "short": word_count < 50,  # Very short responses (likely incomplete)
+        "repetitive": repetitive,
+    }
+
+
+def _anti_gaming_factor(
+    signals: Dict[str, Any], modifiers: ScoreModifiers = DEFAULT_SCORE_MODIFIERS
+) -> float:
+    """Turn anti-gaming signals into a penalty factor (0.0-1.0)."""
+    # Bonus for meeting hidden criteria (up to 10% by default) offsets penalties
+    penalty = min(MAX_CRITERIA_FACTOR, 1.0 + modifiers.hidden_criteria_bonus * signals["criteria_ratio"])
+
+    if signals["short"]:
+        penalty *= modifiers.short_response_factor
+    if signals["repetitive"]:
+        penalty *= modifiers.repetitive_response_factor
 
     return min(1.0, penalty)
 
 
+def _check_anti_gaming(
+    response: str | ResponseAnalysis,
+    subtype: str,
+    modifiers: ScoreModifiers = DEFAULT_SCORE_MODIFIERS,
+) -> float:
+    """Check for anti-gaming signals and return a penalty factor (0.0-1.0)."""
+    return _anti_gaming_factor(_anti_gaming_signals(response, subtype), modifiers)
+
+
+def _cached_tokens(result: Any) -> int:
+    """Return the number of prompt tokens the provider served from its cache."""
+    usage = getattr(result, "usage", None)
+    return int(getattr(usage, "input_tokens_cache_read", None) or 0)
+
+
 async def _call_judge(
     judge_model: Model,
-    rubric_prompt: str,
+    rubric_prompt: str | RubricPromptParts,
+    cache_prompt: bool | None = None,
+    temperature: float = 0.0,
 ) -> Dict:
-    """Call the judge model and parse the response."""
+    """Call the judge model and parse the response.
+
+    A RubricPromptParts prompt puts the judge instructions, rubric and reference
+    data in the system message and only the response in the user message, so
+    repeated judge calls share a long cacheable prefix. ``cache_prompt`` is passed
+    through to providers that accept explicit cache-control hints.
+    """
+    if isinstance(rubric_prompt, RubricPromptParts):
+        messages = [
+            ChatMessageSystem(content=f"{JUDGE_SYSTEM_PROMPT}\n\n{rubric_prompt.prefix}"),
+            ChatMessageUser(content=rubric_prompt.response),
+        ]
+    else:
+        messages = [
+            ChatMessageSystem(content=JUDGE_SYSTEM_PROMPT),
+            ChatMessageUser(content=rubric_prompt),
+        ]
     try:
         result = await judge_model.generate(
-            input=[
-                ChatMessageSystem(content=JUDGE_SYSTEM_PROMPT),
-                ChatMessageUser(content=rubric_prompt),
-            ],
-            config=GenerateConfig(temperature=0.0, max_tokens=500),
+            input=messages,
+            config=GenerateConfig(temperature=temperature, max_tokens=500, cache_prompt=cache_prompt),
         )
         response_text = result.completion
-        return _parse_judge_response(response_text)
+        parsed = _parse_judge_response(response_text)
+        parsed["cached_tokens"] = _cached_tokens(result)
+        return parsed
     except Exception as e:
         logger.warning(f"Judge call failed: {e}")
         return {"accuracy": 0.5, "completeness": 0.5, "quality": 0.5, "reasoning": f"Error: {e}"}
 
 
+async def _call_judge_batch(
+    judge_model: Model,
+    rubric_prompts: list[str],
+) -> list[Dict] | None:
+    """Judge several rubric prompts in one request; None if the batch can't be split back."""
+    try:
+        result = await judge_model.generate(
+            input=[
+                ChatMessageSystem(content=JUDGE_BATCH_SYSTEM_PROMPT),
+                ChatMessageUser(content=format_batch_prompt(rubric_prompts)),
+            ],
+            config=GenerateConfig(temperature=0.0, max_tokens=500 * len(rubric_prompts)),
+        )
+        items = _parse_batch_judge_response(result.completion, len(rubric_prompts))
+        if items is not None:
+            # Cached tokens are reported for the whole batched request; split
+            # them so per-sample totals add up to the request's
+            share, rest = divmod(_cached_tokens(result), len(items))
+            items = [{**item, "cached_tokens": share + (i < rest)} for i, item in enumerate(items)]
+        return items
+    except Exception as e:
+        logger.warning(f"Batched judge call failed: {e}")
+        return None
+
+
+class JudgeBatcher:
+    """Coalesce concurrent rubric prompts into multi-item judge requests.
+
+    Prompts are grouped by (type, subtype). A group is sent as soon as it holds
+    ``max_batch_size`` prompts, or ``max_wait`` seconds after its first prompt
+    arrived. If the batched response can't be split back into per-item scores,
+    every prompt in the batch is re-judged with a single ``_call_judge``.
+    """
+
+    def __init__(self, judge_model: Model, max_batch_size: int = 4, max_wait: float = 0.05):
+        self.judge_model = judge_model
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._pending: Dict[tuple, list[tuple[str, asyncio.Future]]] = {}
+        self._timers: Dict[tuple, asyncio.TimerHandle] = {}
+        self._running: set[asyncio.Task] = set()
+
+    async def judge(self, key: tuple, rubric_prompt: str) -> Dict:
+        """Queue a rubric prompt and wait for its (possibly batched) judge result."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        group = self._pending.setdefault(key, [])
+        group.append((rubric_prompt, future))
+
+        if len(group) >= self.max_batch_size:
+            self._flush(key)
+        elif len(group) == 1:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: tuple) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        group = self._pending.pop(key, [])
+        if group:
+            task = asyncio.ensure_future(self._run(group))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, group: list[tuple[str, asyncio.Future]]) -> None:
+        prompts = [prompt for prompt, _ in group]
+        try:
+            results = None
+            if len(prompts) > 1:
+                results = await _call_judge_batch(self.judge_model, prompts)
+                if results is None:
+                    logger.warning(
+                        f"Could not parse batched judge response for {len(prompts)} items, "
+                        "falling back to single judge calls"
+                    )
+                else:
+                    results = [{**result, "batch_size": len(prompts)} for result in results]
+            if results is None:
+                results = await asyncio.gather(
+                    *(_call_judge(self.judge_model, prompt) for prompt in prompts)
+                )
+        except Exception as e:
+            for _, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(group, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def _judge_failed(result: Dict) -> bool:
+    """Whether a judge result is _call_judge's neutral fallback for a failed call."""
+    return str(result.get("reasoning", "")).startswith("Error:")
+
+
+def _aggregate_scores(values: list[float], method: str) -> float:
+    """Combine one dimension's scores from several judges."""
+    ordered = sorted(values)
+    n = len(ordered)
+    if method == "median":
+        middle = n // 2
+        return ordered[middle] if n % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+    # Trimmed mean: drop the lowest and highest score once there are three or more
+    if n >= 3:
+        ordered = ordered[1:-1]
+    return sum(ordered) / len(ordered)
+
+
+@dataclass(frozen=True)
+class JudgeDraw:
+    """One member of a judge ensemble: a model and the temperature it is sampled at."""
+
+    name: str
+    model: Model
+    temperature: float = 0.0
+
+
+class JudgeEnsemble:
+    """Score a rubric prompt with several judges, stopping early when they agree.
+
+    All judges are called concurrently. Once the first two have answered, if
+    every dimension agrees within ``agreement``, their scores are aggregated and
+    the other calls are cancelled. Otherwise all successful results are
+    aggregated with ``aggregate`` ("median" or "trimmed_mean"). Either way the
+    ensemble costs about one judge's latency. Failed judge calls are left out of
+    the aggregate.
+    """
+
+    def __init__(
+        self,
+        draws: list[JudgeDraw],
+        agreement: float = DEFAULT_JUDGE_AGREEMENT,
+        aggregate: str = "median",
+    ):
+        if aggregate not in ("median", "trimmed_mean"):
+            raise ValueError(f"Unknown judge aggregate: {aggregate}. Use 'median' or 'trimmed_mean'.")
+        self.draws = draws
+        self.agreement = agreement
+        self.aggregate = aggregate
+
+    def _agree(self, results: list[Dict]) -> bool:
+        if len(results) < 2 or any(_judge_failed(r) for r in results):
+            return False
+        return all(
+            abs(float(results[0].get(dim, 0.5)) - float(results[1].get(dim, 0.5))) <= self.agreement
+            for dim in JUDGE_DIMENSIONS
+        )
+
+    async def judge(self, rubric_prompt: str | RubricPromptParts, cache_prompt: bool | None = None) -> Dict:
+        """Judge one prompt, returning aggregated scores plus per-judge scores and spread."""
+
+        calls = [
+            asyncio.ensure_future(_call_judge(d.model, rubric_prompt, cache_prompt, d.temperature))
+            for d in self.draws
+        ]
+        results = list(await asyncio.gather(*calls[:2]))
+        early_exit = self._agree(results)
+        if early_exit:
+            for rest in calls[2:]:
+                rest.cancel()
+            await asyncio.gather(*calls[2:], return_exceptions=True)
+        else:
+            results += await asyncio.gather(*calls[2:])
+
+        scored = [r for r in results if not _judge_failed(r)] or results
+        aggregated: Dict[str, Any] = {
+            dim: _aggregate_scores([float(r.get(dim, 0.5)) for r in scored], self.aggregate)
+            for dim in JUDGE_DIMENSIONS
+        }
+        # Keep the reasoning of the judge closest to the aggregate
+        closest = min(
+            scored,
+            key=lambda r: sum(abs(float(r.get(dim, 0.5)) - aggregated[dim]) for dim in JUDGE_DIMENSIONS),
+        )
+        aggregated["reasoning"] = closest.get("reasoning", "")
+        aggregated["cached_tokens"] = sum(r.get("cached_tokens", 0) for r in results)
+        aggregated["ensemble"] = {
+            "aggregate": self.aggregate,
+            "early_exit": early_exit,
+            "judges": [
+                {
+                    "model": draw.name,
+                    "temperature": draw.temperature,
+                    **{dim: float(result.get(dim, 0.5)) for dim in JUDGE_DIMENSIONS},
+                    "failed": _judge_failed(result),
+                }
+                for draw, result in zip(self.draws, results)
+            ],
+            "spread": {
+                dim: max(float(r.get(dim, 0.5)) for r in scored) - min(float(r.get(dim, 0.5)) for r in scored)
+                for dim in JUDGE_DIMENSIONS
+            },
+        }
+        return aggregated
+
+
+def _judge_draws(models: list[str | Model], draws: int, draw_temperature: float) -> list[JudgeDraw]:
+    """Expand judge models into ensemble members, repeating each model ``draws`` times.
+
+    Repeated draws are sampled at ``draw_temperature``; identical temperature-0 calls
+    would always agree.
+    """
+    temperature = draw_temperature if draws > 1 else 0.0
+    members = []
+    for model in models:
+        judge_model = get_model(model) if isinstance(model, str) else model
+        members.extend(JudgeDraw(str(model), judge_model, temperature) for _ in range(draws))
+    return members
+
+
 @scorer(
     metrics=[
         mean(),
@@ -828,28 +1356,83 @@ async def _call_judge(
     ]
 )
 def llm_judge_scorer(
-    model: str | Model | None = None,
-    blend_deterministic: float = 0.3,
+    model: str | Model | list[str | Model] | None = None,
+    blend_deterministic: float = DEFAULT_BLEND_DETERMINISTIC,
     validate_structure: bool = True,
+    judge_batch_size: int = DEFAULT_JUDGE_BATCH_SIZE,
+    judge_batch_window: float = 0.05,
+    prompt_layout: str = DEFAULT_JUDGE_PROMPT_LAYOUT,
+    cache_prompt: bool | None = None,
+    modifiers: ScoreModifiers | None = None,
+    judge_draws: int = 1,
+    judge_agreement: float = DEFAULT_JUDGE_AGREEMENT,
+    judge_aggregate: str = "median",
+    judge_draw_temperature: float = DEFAULT_JUDGE_DRAW_TEMPERATURE,
 ) -> Scorer:
     """
     LLM-as-judge scorer for architecture evaluation tasks.
 
     Args:
-        model: Judge model to use (default: from ARCHITECTURE_JUDGE_MODEL env var or gpt-4o-mini)
+        model: Judge model to use (default: from ARCHITECTURE_JUDGE_MODEL env var or gpt-4o-mini).
+               A list (or comma-separated string) of models scores each response with a
+               judge ensemble (see JudgeEnsemble).
         blend_deterministic: Weight for deterministic checks (0.0-1.0). Higher = more deterministic.
                            Default 0.3 means 70% LLM judge + 30% keyword checks.
         validate_structure: Whether to apply structural validation for diagram creation tasks.
                           Default True. Validation affects scoring when output_format is specified.
+        judge_batch_size: Max rubric prompts of the same type/subtype sent in one judge request
+                          (default: from ARCHITECTURE_JUDGE_BATCH_SIZE env var or 1 = no batching).
+        judge_batch_window: Seconds to wait for a batch to fill before sending it.
+        prompt_layout: "inline" renders the response inside the rubric; "cached" sends the
+                       judge instructions, rubric and reference data as a stable system
+                       prefix with the response last, so provider prompt caching can apply
+                       (default: from ARCHITECTURE_JUDGE_PROMPT_LAYOUT env var or "inline").
+        cache_prompt: Explicit provider cache-control hint (None leaves the provider default).
+        modifiers: Anti-gaming and validation bonus/penalty sizes (default: DEFAULT_SCORE_MODIFIERS).
+                   The raw judge/deterministic scores and anti-gaming signals are recorded in
+                   Score metadata so scripts/optimize_blend.py can refit these from logs.
+        judge_draws: Calls per judge model; more than one samples each model repeatedly at
+                     judge_draw_temperature and scores with a judge ensemble.
+        judge_agreement: Ensemble early-exit tolerance: if the first two judges agree within
+                         this on every dimension, the other judges' calls are cancelled.
+        judge_aggregate: How ensemble scores are combined: "median" or "trimmed_mean".
+        judge_draw_temperature: Sampling temperature for repeated draws of one model.
     """
-    # Initialize judge model
-    judge_model_name = model if model else DEFAULT_JUDGE_MODEL
-    judge_model = get_model(judge_model_name) if isinstance(judge_model_name, str) else judge_model_name
+    if prompt_layout not in ("inline", "cached"):
+        raise ValueError(f"Unknown prompt_layout: {prompt_layout}. Use 'inline' or 'cached'.")
+
+    modifiers = modifiers or DEFAULT_SCORE_MODIFIERS
+
+    # Initialize judge model(s)
+    judge_models = model if model else DEFAULT_JUDGE_MODEL
+    if isinstance(judge_models, str):
+        judge_models = [name.strip() for name in judge_models.split(",") if name.strip()]
+    elif not isinstance(judge_models, list):
+        judge_models = [judge_models]
+
+    ensemble = None
+    if len(judge_models) > 1 or judge_draws > 1:
+        if judge_batch_size > 1:
+            raise ValueError("Judge batching can't be combined with a judge ensemble.")
+        draws = _judge_draws(judge_models, judge_draws, judge_draw_temperature)
+        ensemble = JudgeEnsemble(draws, judge_agreement, judge_aggregate)
+        judge_model_name = ",".join(str(m) for m in judge_models)
+        judge_model = draws[0].model
+    else:
+        judge_model_name = judge_models[0]
+        judge_model = get_model(judge_model_name) if isinstance(judge_model_name, str) else judge_model_name
+    batcher = (
+        JudgeBatcher(judge_model, judge_batch_size, judge_batch_window)
+        if judge_batch_size > 1
+        else None
+    )
 
     async def score(state: TaskState, target: Target) -> Score:
         """Score architecture evaluation responses using LLM judge."""
         eval_data = _get_sample_metadata(state)
         response = state.output.completion if state.output else ""
+        # Shared by the deterministic, anti-gaming and validation stages below
+        analysis = ResponseAnalysis(response)
 
         eval_type = eval_data.get("type", "")
         subtype = eval_data.get("subtype", "")
@@ -859,13 +1442,17 @@ def llm_judge_scorer(
         expected_components = eval_data.get("expected_components", [])
 
         # Get rubric prompt for this task type
-        rubric_prompt = format_rubric_prompt(eval_type, subtype, response, eval_data)
+        rubric_prompt: str | RubricPromptParts | None
+        if prompt_layout == "cached":
+            rubric_prompt = format_rubric_prompt_parts(eval_type, subtype, response, eval_data)
+        else:
+            rubric_prompt = format_rubric_prompt(eval_type, subtype, response, eval_data)
 
         if not rubric_prompt:
             # No rubric available, fall back to deterministic scoring
             logger.warning(f"No rubric for {eval_type}/{subtype}, using deterministic scoring")
             accuracy, completeness, quality = _apply_deterministic_checks(
-                response, eval_data, subtype
+                analysis, eval_data, subtype
             )
             overall_score = (accuracy + completeness + quality) / 3
             return Score(
@@ -881,7 +1468,15 @@ def llm_judge_scorer(
             )
 
         # Call the LLM judge
-        judge_result = await _call_judge(judge_model, rubric_prompt)
+        if batcher is not None:
+            # Batched requests combine several items, so they always use the inline text
+            if isinstance(rubric_prompt, RubricPromptParts):
+                rubric_prompt = rubric_prompt.render()
+            judge_result = await batcher.judge((eval_type, subtype), rubric_prompt)
+        elif ensemble is not None:
+            judge_result = await ensemble.judge(rubric_prompt, cache_prompt)
+        else:
+            judge_result = await _call_judge(judge_model, rubric_prompt, cache_prompt)
 
         # Extract scores from judge response
         judge_accuracy = float(judge_result.get("accuracy", 0.5))
@@ -891,7 +1486,7 @@ def llm_judge_scorer(
 
         # Get deterministic scores for blending
         det_accuracy, det_completeness, det_quality = _apply_deterministic_checks(
-            response, eval_data, subtype
+            analysis, eval_data, subtype
         )
 
         # Blend judge and deterministic scores
@@ -901,7 +1496,8 @@ def llm_judge_scorer(
         quality = blend_llm * judge_quality + blend_deterministic * det_quality
 
         # Apply anti-gaming adjustments
-        anti_gaming_factor = _check_anti_gaming(response, subtype)
+        anti_gaming_signals = _anti_gaming_signals(analysis, subtype)
+        anti_gaming_factor = _anti_gaming_factor(anti_gaming_signals, modifiers)
         accuracy *= anti_gaming_factor
         completeness *= anti_gaming_factor
         quality *= anti_gaming_factor
@@ -909,13 +1505,14 @@ def llm_judge_scorer(
         # Apply structural validation for diagram creation tasks
         validation_metadata: Dict[str, Any] = {}
         if validate_structure and eval_type == "diagram_creation" and output_format:
-            validation_result = validate_structured_output(response, output_format)
+            validation_result = validate_structured_output(analysis, output_format)
             scores_dict = {"accuracy": accuracy, "completeness": completeness, "quality": quality}
             scores_dict, validation_metadata = _apply_validation_modifier(
                 scores_dict,
                 validation_result,
                 format_required=True,
                 expected_components=expected_components if expected_components else None,
+                modifiers=modifiers,
             )
             accuracy = scores_dict["accuracy"]
             completeness = scores_dict["completeness"]
@@ -938,9 +1535,27 @@ def llm_judge_scorer(
             "scorer": "llm_judge",
             "judge_model": str(judge_model_name),
             "judge_reasoning": judge_reasoning,
+            "judge_batch_size": judge_result.get("batch_size", 1),
+            "judge_prompt_layout": prompt_layout,
+            "judge_cached_tokens": judge_result.get("cached_tokens", 0),
             "anti_gaming_factor": anti_gaming_factor,
+            "anti_gaming_signals": anti_gaming_signals,
             "blend_deterministic": blend_deterministic,
+            "score_modifiers": asdict(modifiers),
+            # Unblended inputs, for refitting the blend weight and modifiers offline
+            "judge_scores": {
+                "accuracy": judge_accuracy,
+                "completeness": judge_completeness,
+                "quality": judge_quality,
+            },
+            "deterministic_scores": {
+                "accuracy": det_accuracy,
+                "completeness": det_completeness,
+                "quality": det_quality,
+            },
         }
+        if "ensemble" in judge_result:
+            score_metadata["judge_ensemble"] = judge_result["ensemble"]
         if validation_metadata:
             score_metadata["validation"] = validation_metadata
 
@@ -1050,41 +1665,47 @@ def architecture_solver() -> Solver:
 
 
 @task
-def architecture_interpretation() -> Task:
+def architecture_interpretation(sample_ids: str | list[str] | None = None) -> Task:
     """Task for architecture diagram interpretation evaluations."""
 
     return Task(
-        dataset=load_architecture_dataset("architecture_interpretation.jsonl"),
+        dataset=load_architecture_dataset(ARCHITECTURE_DATASET, sample_ids=sample_ids),
         plan=[architecture_solver(), generate()],
         scorer=architecture_scorer(),
     )
 
 
 @task
-def architecture_design() -> Task:
+def architecture_design(sample_ids: str | list[str] | None = None) -> Task:
     """Combined task for all architecture design evaluations."""
 
     return Task(
-        dataset=load_architecture_dataset("architecture_interpretation.jsonl"),
+        dataset=load_architecture_dataset(ARCHITECTURE_DATASET, sample_ids=sample_ids),
         plan=[architecture_solver(), generate()],
         scorer=architecture_scorer(),
     )
 
 
 @task
-def architecture_design_llm_judge() -> Task:
+def architecture_design_llm_judge(
+    sample_ids: str | list[str] | None = None,
+    judge_models: str | list[str] | None = None,
+    judge_draws: int = 1,
+) -> Task:
     """Architecture design evaluations with LLM-as-judge scoring.
 
     Uses an LLM judge for nuanced evaluation of architectural reasoning,
     with anti-gaming mechanisms and blended deterministic checks.
 
     Configure the judge model via ARCHITECTURE_JUDGE_MODEL env var
-    (default: openai/gpt-4o-mini).
+    (default: openai/gpt-4o-mini), or score with a judge ensemble via
+    -T judge_models=model_a,model_b and/or -T judge_draws=3. Select items by
+    id with -T sample_ids=arch_001,arch_002 (only those records are read).
     """
     return Task(
-        dataset=load_architecture_dataset("architecture_interpretation.jsonl"),
+        dataset=load_architecture_dataset(ARCHITECTURE_DATASET, sample_ids=sample_ids),
         plan=[architecture_solver(), generate()],
-        scorer=llm_judge_scorer(),
+        scorer=llm_judge_scorer(model=judge_models, judge_draws=judge_draws),
     )
 
 
@@ -1094,4 +1715,5 @@ __all__ = [
     "architecture_design",
     "architecture_design_llm_judge",
     "llm_judge_scorer",
+    "lexical_similarity_scorer",
 ]
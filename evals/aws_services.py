@@ -0,0 +1,274 @@
+"""
+Canonical AWS service ids shared by the architecture, CDK and practice exam tracks.
+
+Service names appear as free text throughout the datasets (``expected_services``
+and ``expected_components`` of architecture items, ``metadata.aws_services`` of
+CDK and practice exam items) and in model responses, spelled many ways: "ALB",
+"Application Load Balancer" and "Elastic Load Balancing" are one service. The
+alias table below maps every surface form to a canonical service id. It is
+compiled once per process into
+
+- a dict for looking up a whole name (``canonical_service("Amazon ALB")``), and
+- a token trie for finding every service mentioned in a text in one
+  left-to-right, longest-match pass (``service_counts(response)``).
+
+Names are compared on lowercase alphanumeric tokens, so punctuation, hyphens
+and spacing don't matter, and a leading "Amazon"/"AWS" is optional. Bare names
+that are also common words ("config", "glue", "shield", ...) are recognized in
+running text only with their "AWS"/"Amazon" prefix, but always as a whole name.
+"""
+
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Canonical id -> (display name, other names). The display name is an alias too.
+SERVICES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    # Compute
+    "ec2": ("Amazon EC2", ("EC2", "Elastic Compute Cloud", "EC2 instance", "EC2 instances")),
+    "lambda": ("AWS Lambda", ("Lambda", "Lambda function", "Lambda functions")),
+    "lambda_edge": ("Lambda@Edge", ("Lambda at Edge",)),
+    "auto_scaling": (
+        "Amazon EC2 Auto Scaling",
+        ("Auto Scaling", "Autoscaling", "Auto Scaling Group", "Auto Scaling Groups", "ASG",
+         "EC2 Auto Scaling", "AWS Auto Scaling"),
+    ),
+    "ecs": ("Amazon ECS", ("ECS", "Elastic Container Service")),
+    "eks": ("Amazon EKS", ("EKS", "Elastic Kubernetes Service")),
+    "fargate": ("AWS Fargate", ("Fargate",)),
+    "ecr": ("Amazon ECR", ("ECR", "Elastic Container Registry")),
+    "app_runner": ("AWS App Runner", ("App Runner",)),
+    "batch": ("AWS Batch", ("Batch",)),
+    "elastic_beanstalk": ("AWS Elastic Beanstalk", ("Elastic Beanstalk", "Beanstalk")),
+    "karpenter": ("Karpenter", ()),
+    # Networking and content delivery
+    "vpc": ("Amazon VPC", ("VPC", "Virtual Private Cloud", "Subnet", "Subnets")),
+    "elb": (
+        "Elastic Load Balancing",
+        ("ELB", "Elastic Load Balancer", "Elastic Load Balancers", "Load Balancer", "Load Balancers",
+         "ALB", "Application Load Balancer", "NLB", "Network Load Balancer", "GWLB",
+         "Gateway Load Balancer", "Classic Load Balancer"),
+    ),
+    "cloudfront": ("Amazon CloudFront", ("CloudFront", "Cloud Front")),
+    "route53": ("Amazon Route 53", ("Route 53", "Route53")),
+    "api_gateway": ("Amazon API Gateway", ("API Gateway", "APIGW", "VPC Link")),
+    "nat_gateway": ("NAT Gateway", ("NAT Gateways", "NAT GW")),
+    "internet_gateway": ("Internet Gateway", ("IGW",)),
+    "transit_gateway": ("AWS Transit Gateway", ("Transit Gateway", "TGW")),
+    "direct_connect": ("AWS Direct Connect", ("Direct Connect", "DX")),
+    "vpn": ("AWS VPN", ("Site-to-Site VPN", "Client VPN", "VPN Gateway")),
+    "privatelink": ("AWS PrivateLink", ("PrivateLink", "VPC Endpoint", "VPC Endpoints", "Interface Endpoint")),
+    "vpc_peering": ("VPC Peering", ("VPC Peering Connection",)),
+    "global_accelerator": ("AWS Global Accelerator", ("Global Accelerator",)),
+    "elastic_ip": ("Elastic IP", ("Elastic IP Address", "Elastic IPs", "EIP")),
+    "security_groups": ("Security Groups", ("Security Group",)),
+    "app_mesh": ("AWS App Mesh", ("App Mesh",)),
+    # Storage
+    "s3": ("Amazon S3", ("S3", "Simple Storage Service", "S3 Bucket", "S3 Buckets")),
+    "s3_glacier": ("Amazon S3 Glacier", ("Glacier", "S3 Glacier Deep Archive", "Glacier Deep Archive")),
+    "s3_transfer_acceleration": ("Amazon S3 Transfer Acceleration", ("S3 Transfer Acceleration",)),
+    "ebs": ("Amazon EBS", ("EBS", "Elastic Block Store")),
+    "efs": ("Amazon EFS", ("EFS", "Elastic File System")),
+    "fsx": ("Amazon FSx", ("FSx",)),
+    "storage_gateway": ("AWS Storage Gateway", ("Storage Gateway",)),
+    "backup": ("AWS Backup", ("Backup",)),
+    "snowball": ("AWS Snowball", ("Snowball", "Snow Family")),
+    "datasync": ("AWS DataSync", ("DataSync",)),
+    # Databases
+    "rds": ("Amazon RDS", ("RDS", "Relational Database Service", "RDS for MySQL", "RDS for PostgreSQL")),
+    "aurora": ("Amazon Aurora", ("Aurora", "Aurora Serverless")),
+    "aurora_global_database": ("Amazon Aurora Global Database", ("Aurora Global Database",)),
+    "dynamodb": ("Amazon DynamoDB", ("DynamoDB", "Dynamo DB")),
+    "dynamodb_global_tables": ("DynamoDB Global Tables", ("Global Tables",)),
+    "dynamodb_streams": ("DynamoDB Streams", ()),
+    "elasticache": ("Amazon ElastiCache", ("ElastiCache", "Redis", "Memcached")),
+    "redshift": ("Amazon Redshift", ("Redshift",)),
+    "redshift_spectrum": ("Amazon Redshift Spectrum", ("Redshift Spectrum",)),
+    "dms": ("AWS Database Migration Service", ("DMS", "AWS DMS", "Database Migration Service")),
+    # Analytics
+    "kinesis": ("Amazon Kinesis", ("Kinesis",)),
+    "kinesis_data_streams": ("Amazon Kinesis Data Streams", ("Kinesis Data Streams", "Kinesis Streams")),
+    "kinesis_firehose": (
+        "Amazon Kinesis Data Firehose",
+        ("Kinesis Data Firehose", "Kinesis Firehose", "Data Firehose", "Firehose"),
+    ),
+    "kinesis_data_analytics": ("Amazon Kinesis Data Analytics", ("Kinesis Data Analytics", "Kinesis Analytics")),
+    "data_pipeline": ("AWS Data Pipeline", ("Data Pipeline",)),
+    "msk": ("Amazon MSK", ("MSK", "Managed Streaming for Apache Kafka", "Managed Streaming for Kafka")),
+    "glue": ("AWS Glue", ("Glue", "Glue Data Catalog")),
+    "athena": ("Amazon Athena", ("Athena",)),
+    "emr": ("Amazon EMR", ("EMR", "Elastic MapReduce")),
+    "quicksight": ("Amazon QuickSight", ("QuickSight",)),
+    "lake_formation": ("AWS Lake Formation", ("Lake Formation",)),
+    "opensearch": ("Amazon OpenSearch Service", ("OpenSearch", "Elasticsearch Service")),
+    # Application integration
+    "sqs": ("Amazon SQS", ("SQS", "Simple Queue Service")),
+    "sns": ("Amazon SNS", ("SNS", "Simple Notification Service")),
+    "eventbridge": ("Amazon EventBridge", ("EventBridge", "CloudWatch Events")),
+    "step_functions": ("AWS Step Functions", ("Step Functions", "Step Function")),
+    # Security, identity and compliance
+    "iam": ("AWS IAM", ("IAM", "Identity and Access Management", "IAM Role", "IAM Roles")),
+    "iam_identity_center": ("AWS IAM Identity Center", ("IAM Identity Center", "AWS SSO", "Single Sign-On")),
+    "kms": ("AWS KMS", ("KMS", "Key Management Service")),
+    "secrets_manager": ("AWS Secrets Manager", ("Secrets Manager",)),
+    "acm": ("AWS Certificate Manager", ("ACM", "Certificate Manager")),
+    "waf": ("AWS WAF", ("WAF", "Web Application Firewall")),
+    "shield": ("AWS Shield", ("Shield", "Shield Advanced")),
+    "guardduty": ("Amazon GuardDuty", ("GuardDuty",)),
+    "security_hub": ("AWS Security Hub", ("Security Hub",)),
+    "cognito": ("Amazon Cognito", ("Cognito",)),
+    "resource_access_manager": ("AWS Resource Access Manager", ("Resource Access Manager", "RAM")),
+    "organizations": ("AWS Organizations", ("Organizations", "SCP", "SCPs", "Service Control Policies")),
+    # Management and governance
+    "cloudwatch": ("Amazon CloudWatch", ("CloudWatch", "AWS CloudWatch")),
+    "cloudwatch_logs": ("Amazon CloudWatch Logs", ("CloudWatch Logs", "CloudWatch Logs Insights")),
+    "cloudtrail": ("AWS CloudTrail", ("CloudTrail",)),
+    "config": ("AWS Config", ("Config", "Config Rules", "Config Rule")),
+    "cloudformation": ("AWS CloudFormation", ("CloudFormation",)),
+    "systems_manager": ("AWS Systems Manager", ("Systems Manager", "SSM")),
+    "ssm_parameter_store": ("AWS Systems Manager Parameter Store", ("SSM Parameter Store", "Parameter Store")),
+    "trusted_advisor": ("AWS Trusted Advisor", ("Trusted Advisor",)),
+    "cost_explorer": ("AWS Cost Explorer", ("Cost Explorer",)),
+    "budgets": ("AWS Budgets", ("Budgets",)),
+    "x_ray": ("AWS X-Ray", ("X-Ray", "XRay")),
+    "elastic_disaster_recovery": ("AWS Elastic Disaster Recovery", ("Elastic Disaster Recovery", "DRS")),
+    # Developer tools
+    "codepipeline": ("AWS CodePipeline", ("CodePipeline",)),
+    "codebuild": ("AWS CodeBuild", ("CodeBuild",)),
+    "codedeploy": ("AWS CodeDeploy", ("CodeDeploy",)),
+    # Machine learning and IoT
+    "sagemaker": ("Amazon SageMaker", ("SageMaker",)),
+    "bedrock": ("Amazon Bedrock", ("Bedrock", "AWS Bedrock")),
+    "iot_core": ("AWS IoT Core", ("IoT Core",)),
+}
+
+# Bare names that are also ordinary words; in running text they only count with
+# an "AWS"/"Amazon" prefix (or as part of a longer alias)
+AMBIGUOUS_NAMES = frozenset(
+    {"backup", "batch", "budgets", "config", "glue", "organizations", "shield", "athena",
+     "bedrock", "aurora", "firehose", "glacier", "redis", "subnet", "subnets", "dx", "drs", "ram",
+     "global tables"}
+)
+
+_PREFIXES = ("amazon", "aws")
+# Words a name may add to a service's own name and still mean just that service
+# ("ElastiCache cluster", "CloudFront CDN"); any other word ("Lambda Authorizer")
+# may name a feature of the service rather than the service itself
+GENERIC_WORDS = frozenset(
+    {"service", "services", "function", "functions", "resource", "resources", "instance", "instances",
+     "cluster", "clusters", "bucket", "buckets", "table", "tables", "queue", "queues", "topic", "topics",
+     "database", "databases", "db", "cache", "cdn", "the", *_PREFIXES}
+)
+# A name's words from one of these on qualify how the service is used ("S3 for static assets")
+QUALIFIER_WORDS = frozenset({"for", "with", "using", "via"})
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def name_tokens(text: str) -> Tuple[str, ...]:
+    """Lowercase alphanumeric tokens of a name or text."""
+    return tuple(_TOKEN.findall(text.lower()))
+
+
+def _strip_prefix(tokens: Tuple[str, ...]) -> Tuple[str, ...]:
+    while len(tokens) > 1 and tokens[0] in _PREFIXES:
+        tokens = tokens[1:]
+    return tokens
+
+
+class ServiceIndex:
+    """Alias lookup and a token trie over all surface forms of every service."""
+
+    def __init__(self, services: Dict[str, Tuple[str, Tuple[str, ...]]] = SERVICES):
+        self.display_names = {service_id: display for service_id, (display, _) in services.items()}
+        # Whole-name lookup on prefix-stripped tokens
+        self.aliases: Dict[Tuple[str, ...], str] = {}
+        # Trie of token sequences; the terminal "" key holds the service id
+        self.trie: Dict[str, dict] = {}
+        ambiguous = {name_tokens(name) for name in AMBIGUOUS_NAMES}
+
+        for service_id, (display, names) in services.items():
+            for name in (display, *names):
+                tokens = _strip_prefix(name_tokens(name))
+                existing = self.aliases.setdefault(tokens, service_id)
+                if existing != service_id:
+                    raise ValueError(f"Alias {name!r} maps to both {existing} and {service_id}")
+                variants = [(prefix, *tokens) for prefix in _PREFIXES]
+                if tokens not in ambiguous:
+                    variants.append(tokens)
+                for variant in variants:
+                    node = self.trie
+                    for token in variant:
+                        node = node.setdefault(token, {})
+                    node.setdefault("", service_id)
+
+    def canonical(self, name: str) -> str | None:
+        """Canonical id of a whole service name, or None if it isn't a known service.
+
+        Names that aren't an alias themselves but mention exactly one service
+        with only generic words around it ("Amazon Elastic File System (Amazon
+        EFS)", "RDS database", "S3 for static assets") resolve to that service.
+        """
+        tokens = name_tokens(name)
+        service_id = self.aliases.get(_strip_prefix(tokens))
+        if service_id is None:
+            for i, token in enumerate(tokens[1:], 1):
+                if token in QUALIFIER_WORDS:
+                    tokens = tokens[:i]
+                    break
+            matches = list(self._matches(tokens))
+            mentioned = {match for _, _, match in matches}
+            covered = {i for start, end, _ in matches for i in range(start, end)}
+            extra = {token for i, token in enumerate(tokens) if i not in covered}
+            if len(mentioned) == 1 and extra <= GENERIC_WORDS:
+                service_id = mentioned.pop()
+        return service_id
+
+    def find(self, text: str) -> List[str]:
+        """Canonical ids of every service mentioned in a text, in order (longest match)."""
+        return [match for _, _, match in self._matches(name_tokens(text))]
+
+    def _matches(self, tokens: Tuple[str, ...]) -> Iterator[Tuple[int, int, str]]:
+        """(start, end, id) of each service mention in a token sequence (longest match)."""
+        i = 0
+        while i < len(tokens):
+            node = self.trie
+            match, match_end = None, i
+            j = i
+            while j < len(tokens) and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if "" in node:
+                    match, match_end = node[""], j
+            if match is None:
+                i += 1
+            else:
+                yield i, match_end, match
+                i = match_end
+
+
+@lru_cache(maxsize=None)
+def service_index() -> ServiceIndex:
+    """The compiled service index (built once per process)."""
+    return ServiceIndex()
+
+
+def canonical_service(name: str) -> str | None:
+    """Canonical id of a service name ("ALB" -> "elb"), or None if unknown."""
+    return service_index().canonical(name)
+
+
+def canonical_services(names: Iterable[str]) -> List[str]:
+    """Canonical ids of known service names, deduplicated in first-seen order."""
+    ids = (canonical_service(name) for name in names)
+    return list(dict.fromkeys(service_id for service_id in ids if service_id))
+
+
+def service_counts(text: str) -> Counter:
+    """Multiset of canonical service ids mentioned in a text, in one pass."""
+    return Counter(service_index().find(text))
+
+
+def display_name(service_id: str) -> str:
+    """Display name of a canonical service id."""
+    return service_index().display_names.get(service_id, service_id)
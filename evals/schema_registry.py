@@ -0,0 +1,76 @@
+"""
+JSON Schemas under schemas/, loaded and compiled once per process.
+
+``jsonschema.validate`` re-checks the schema and builds a new validator on every
+call, which dominates the cost of validating many small documents. The
+registry loads ``schemas/<name>.schema.json`` once, checks it once, and reuses
+one validator (of the draft its ``$schema`` declares) for every instance.
+
+Usage:
+    from evals.schema_registry import schema_errors, validate
+
+    validate("leaderboard", data)  # raises jsonschema.ValidationError
+    for error in schema_errors("architecture", data):  # every error, one pass
+        print(format_error(error))
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import jsonschema
+from jsonschema.exceptions import best_match
+from jsonschema.protocols import Validator
+
+SCHEMA_DIR = Path(__file__).parent.parent / "schemas"
+
+
+def schema_path(name: str) -> Path:
+    """Path of the named schema file (schemas/<name>.schema.json)."""
+    return SCHEMA_DIR / f"{name}.schema.json"
+
+
+@lru_cache(maxsize=None)
+def load_schema(name: str) -> dict[str, Any]:
+    """
+    Load the named schema once.
+
+    Raises:
+        FileNotFoundError: If schemas/<name>.schema.json doesn't exist
+    """
+    with open(schema_path(name)) as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def get_validator(name: str) -> Validator:
+    """Return the named schema's validator, checking the schema itself on first use."""
+    schema = load_schema(name)
+    cls = jsonschema.validators.validator_for(schema, default=jsonschema.Draft7Validator)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+def schema_errors(name: str, instance: Any) -> list[jsonschema.ValidationError]:
+    """All validation errors for instance, ordered by their location in it."""
+    errors = get_validator(name).iter_errors(instance)
+    return sorted(errors, key=lambda e: [str(p) for p in e.absolute_path])
+
+
+def validate(name: str, instance: Any) -> None:
+    """
+    Validate instance against the named schema.
+
+    Raises:
+        jsonschema.ValidationError: The most relevant error, as jsonschema.validate would
+    """
+    error = best_match(get_validator(name).iter_errors(instance))
+    if error is not None:
+        raise error
+
+
+def format_error(error: jsonschema.ValidationError) -> str:
+    """One-line description of an error and where it occurred."""
+    path = " -> ".join(str(p) for p in error.absolute_path) if error.absolute_path else "root"
+    return f"at '{path}': {error.message}"
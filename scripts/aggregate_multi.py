@@ -15,16 +15,41 @@ Usage
 uv run --script scripts/aggregate_multi.py --log-dir logs \
         --outfile results/leaderboard.csv \
         --json-out  results/leaderboard.json
+
+Per-sample scores are kept in a score index (.score_cache/scores.sqlite, see
+score_index.py), so each rebuild reads only new or changed logs. Select what
+to aggregate with --since 2026-10-01 and --runs 7 (latest 7 runs) or
+--runs nightly-20261001-020000,nightly-20261002-020000.
+
+--watch keeps running during a bench: it polls --log-dir, re-reads the logs
+Inspect has appended samples to and rewrites the CSV (and --json-out) at most
+every --refresh seconds, with partial scores of the running evals.
 """
 
 from __future__ import annotations
 
-import argparse, pathlib, math, json, os
+import argparse, pathlib, math, json, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Union, Optional
+from typing import Any, Dict, Iterable, List, Set, Tuple, Union, Optional
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+import numpy as np
 import pandas as pd  # type: ignore
 from inspect_ai.log import list_eval_logs, read_eval_log_sample_summaries, read_eval_log
 from task_registry import TASKS
+from score_cube import build_score_cube, write_score_cube
+from results_history import ResultsHistory
+from score_index import DEFAULT_INDEX, ITEM_FIELDS, LIST_FIELDS, SAMPLE_COLUMNS, ScoreIndex, run_name
+from score_stats import (
+    BOOTSTRAP_RESAMPLES, BOOTSTRAP_SEED, CI_LEVEL, bootstrap_cis, category_margins, confidence_label,
+    paired_significance,
+)
+
+# Add project root to path (for the shared schema registry and service index)
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from evals.aws_services import canonical_services, display_name
 
 # Category metadata definitions
 CATEGORY_METADATA = {
@@ -33,24 +58,18 @@ CATEGORY_METADATA = {
         "description": "AWS certification-style MCQ questions testing service selection, best practices, and architectural decision-making",
         "dataset_path": "evals/practice_exam/aws_sa.jsonl",
         "scoring": "binary",
-        "confidence": "high",
-        "margin": "±5%",
     },
     "architecture_design": {
         "name": "Architecture Design",
         "description": "Diagram interpretation and architectural reasoning tasks covering data flow analysis, security assessment, and scalability",
         "dataset_path": "evals/architecture_design/architecture_interpretation.jsonl",
         "scoring": "rubric",
-        "confidence": "medium",
-        "margin": "±10%",
     },
     "cdk_synth": {
         "name": "CDK Synthesis",
         "description": "Infrastructure-as-code generation using AWS CDK Python that must successfully synthesize to CloudFormation",
         "dataset_path": "evals/cdk_synth/cdk_synth.jsonl",
         "scoring": "binary",
-        "confidence": "high",
-        "margin": "±5%",
     },
 }
 
@@ -60,6 +79,9 @@ SCHEMA_PATH = pathlib.Path(__file__).parent.parent / "schemas" / "leaderboard.sc
 # Base path for dataset files
 BASE_PATH = pathlib.Path(__file__).parent.parent
 
+# Per-sample fields extract_log returns, in sample table column order
+SAMPLE_FIELDS = ["id", "epoch", "value", *ITEM_FIELDS, *LIST_FIELDS]
+
 
 def count_dataset_items(dataset_path: str) -> int:
     """Count the number of items in a JSONL dataset file."""
@@ -70,8 +92,13 @@ def count_dataset_items(dataset_path: str) -> int:
         return sum(1 for line in f if line.strip())
 
 
-def build_category_metadata() -> Dict[str, Dict[str, Any]]:
-    """Build enhanced category metadata including sample counts and weights from registry."""
+def build_category_metadata(margins: Optional[Dict[str, int]] = None) -> Dict[str, Dict[str, Any]]:
+    """Build enhanced category metadata including sample counts and weights from registry.
+
+    ``margins`` (see score_stats.category_margins) holds each category's
+    typical bootstrap CI half-width in percentage points; categories with a
+    margin get it and a confidence label derived from it.
+    """
     categories = {}
     for task_key, task_cfg in TASKS.items():
         if task_key not in CATEGORY_METADATA:
@@ -89,6 +116,10 @@ def build_category_metadata() -> Dict[str, Dict[str, Any]]:
         else:
             meta["sample_count"] = 0
 
+        if margins and task_key in margins:
+            meta["confidence"] = confidence_label(margins[task_key])
+            meta["margin"] = f"±{margins[task_key]}%"
+
         categories[task_key] = meta
 
     return categories
@@ -105,7 +136,7 @@ def validate_leaderboard_json(data: Dict[str, Any]) -> None:
         FileNotFoundError: If schema file is missing
     """
     try:
-        import jsonschema
+        from evals.schema_registry import validate
     except ImportError:
         print("[warn] jsonschema not installed, skipping validation")
         return
@@ -114,10 +145,8 @@ def validate_leaderboard_json(data: Dict[str, Any]) -> None:
         print(f"[warn] Schema not found at {SCHEMA_PATH}, skipping validation")
         return
 
-    with open(SCHEMA_PATH) as f:
-        schema = json.load(f)
-
-    jsonschema.validate(instance=data, schema=schema)
+    # The schema is loaded and compiled once per process
+    validate("leaderboard", data)
 
 
 def scores_to_dict(scores_obj: Any) -> Dict[str, Any]:
@@ -139,8 +168,19 @@ def scores_to_dict(scores_obj: Any) -> Dict[str, Any]:
     return {}
 
 
-def detect_task_key(path: str) -> Optional[str]:
-    """Return TASK key for this log, or None if no match."""
+def read_header(path: str) -> Optional[Any]:
+    """Read a log's header (no samples), or None if it can't be read."""
+    try:
+        return read_eval_log(path, header_only=True)
+    except Exception:
+        return None
+
+
+def detect_task_key(path: str, header: Optional[Any] = None) -> Optional[str]:
+    """Return TASK key for this log, or None if no match.
+
+    ``header`` is the log's already-read header, if the caller has it.
+    """
     # 1) filename / folder substring
     path_str = str(path)
     for key, cfg in TASKS.items():
@@ -150,7 +190,7 @@ def detect_task_key(path: str) -> Optional[str]:
 
     # 2) fallback: inspect the dataset-id stored in the header
     try:
-        hdr = read_eval_log(path, header_only=True)
+        hdr = header if header is not None else read_eval_log(path, header_only=True)
         ds_id = str(getattr(hdr.eval, "dataset", ""))
         for key, cfg in TASKS.items():
             fallback_patterns = list(cfg.get("patterns", []))
@@ -223,10 +263,78 @@ def metric_value(sample: Any, task_cfg: Dict[str, Any]) -> float:
     return float(bool(v))
 
 
-def summarise_log(path: str) -> Optional[Dict[str, Any]]:
-    """Return dict: {'task': …, 'model': …, 'accuracy': …} for one file."""
+def metric_values(samples: List[Any], task_cfg: Dict[str, Any]) -> List[float]:
+    """metric_value of every sample of one log.
+
+    The score name and value type are resolved once, from the first sample,
+    and the values converted in bulk; if samples' scores are laid out
+    differently, each is converted with metric_value.
+    """
+    if not samples:
+        return []
+    first = scores_to_dict(getattr(samples[0], "scores", None) or getattr(samples[0], "score", None))
+    names = [task_cfg["metric"], *task_cfg.get("metric_aliases", [])]
+    name = next((n for n in names if n in first), None)
+    if name is None and len(first) == 1:
+        name = next(iter(first))
+    try:
+        raw = [getattr(s.scores[name], "value") for s in samples]
+    except (AttributeError, KeyError, TypeError):
+        return [metric_value(s, task_cfg) for s in samples]
+
+    if all(isinstance(v, (int, float, bool)) for v in raw):
+        return np.asarray(raw, dtype=np.float64).tolist()
+    if "pass_values" in task_cfg and all(isinstance(v, str) for v in raw):
+        return pd.Series(raw).isin(task_cfg["pass_values"]).astype(np.float64).tolist()
+    return [metric_value(s, task_cfg) for s in samples]
+
+
+def sample_services(metadata: Optional[Dict[str, Any]]) -> List[str]:
+    """Canonical AWS service ids an item covers, from its sample metadata.
+
+    Practice exam and CDK items list services in metadata.aws_services (nested
+    under "metadata" by json_dataset); architecture items in expected_services
+    and expected_components.
+    """
+    if not isinstance(metadata, dict):
+        return []
+    if isinstance(metadata.get("metadata"), dict):
+        metadata = {**metadata, **metadata["metadata"]}
+    names = list(metadata.get("aws_services") or [])
+    names += [s.get("service") for s in metadata.get("expected_services") or [] if isinstance(s, dict)]
+    names += list(metadata.get("expected_components") or [])
+    return canonical_services(n for n in names if isinstance(n, str))
+
+
+def item_metadata(metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """The item fields scores are broken down by, from a sample's metadata.
+
+    Practice exam items have a single "domain"; it is listed under "domains"
+    like the other tracks' items.
+    """
+    merged: Dict[str, Any] = metadata if isinstance(metadata, dict) else {}
+    if isinstance(merged.get("metadata"), dict):
+        merged = {**merged, **merged["metadata"]}
+    domains = merged.get("domains") or ([merged["domain"]] if merged.get("domain") else [])
+    return {
+        **{f: str(merged[f]) if merged.get(f) is not None else None for f in ITEM_FIELDS},
+        "domains": [str(d) for d in domains],
+        "services": sample_services(metadata),
+    }
+
+
+def extract_log(path: str) -> Optional[Dict[str, Any]]:
+    """Read one log's task, model, creation time and per-sample scores.
+
+    Returns {'task', 'model', 'created', 'samples'}, where each sample has its
+    id, epoch, value (normalized to [0, 1]) and item metadata (item_metadata),
+    or None if the log matches no task. The header and the sample summaries
+    are each read once.
+    """
+    header = read_header(path)
+
     # Detect task by registry pattern
-    task_key = detect_task_key(path)
+    task_key = detect_task_key(path, header)
     if task_key is None:
         print(f"[warn] Skipping {path} — no TASK pattern match")
         return None
@@ -235,56 +343,333 @@ def summarise_log(path: str) -> Optional[Dict[str, Any]]:
 
     # Pull per-sample scores
     samples = read_eval_log_sample_summaries(path)
-    if not samples:
-        return None
 
-    metric = task_cfg["metric"]
     norm = task_cfg.get("normalizer", 1)
     # Ensure norm is an integer
     if not isinstance(norm, int):
         norm = 1
 
-    # Process all samples
-    all_vals = [metric_value(s, task_cfg) for s in samples]
+    model = getattr(samples[0], "model", None) if samples else None
+    if (not model or model == "unknown") and header is not None:
+        model = str(getattr(header.eval, "model", "unknown"))
+
+    return {
+        "task": task_key,
+        "model": model or "unknown",
+        "created": str(getattr(header.eval, "created", "")) if header is not None else "",
+        "samples": [
+            {
+                "id": str(sample.id),
+                "epoch": sample.epoch,
+                "value": value / norm,
+                **item_metadata(getattr(sample, "metadata", None)),
+            }
+            for sample, value in zip(samples, metric_values(samples, task_cfg))
+        ],
+    }
+
+
+def sample_table(logs: List[tuple[str, Optional[Dict[str, Any]]]]) -> pd.DataFrame:
+    """One row per scored sample of the given (path, extract_log result) pairs."""
+    rows = [
+        (run_name(path), path, log["model"], log["task"], log["created"], *(s[c] for c in SAMPLE_FIELDS))
+        for path, log in logs
+        if log
+        for s in log["samples"]
+    ]
+    return pd.DataFrame(rows, columns=SAMPLE_COLUMNS)
+
+
+def map_logs(fn, files: List[str], workers: Optional[int] = None) -> List[Any]:
+    """Apply fn to every log, in a process pool of ``workers`` processes.
+
+    The default is one per CPU; 1 reads serially in this process. Results are
+    in input order whatever the worker count.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files) < 2:
+        return [fn(f) for f in files]
+    workers = min(workers, len(files))
+    chunksize = max(1, len(files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, files, chunksize=chunksize))
 
-    # Boolean pass/fail or numeric rubric → accuracy in [0,1]
-    acc = sum(all_vals) / (len(all_vals) * norm)
 
-    model = getattr(samples[0], "model", None) or "unknown"
+def collect_samples(files: List[str], workers: Optional[int] = None) -> pd.DataFrame:
+    """Read every log into one sample table, skipping logs that match no task.
 
-    if not model or model == "unknown":
-        try:
-            hdr = read_eval_log(path, header_only=True)
-            model = str(getattr(hdr.eval, "model", "unknown"))
-        except Exception as e:
-            pass
+    Logs are read in parallel (see map_logs). Rows are in sorted path order
+    whatever the worker count, so the leaderboard is identical.
+    """
+    files = sorted(files)
+    return sample_table(list(zip(files, map_logs(extract_log, files, workers))))
+
+
+def collect(files: List[str], workers: Optional[int] = None) -> pd.DataFrame:
+    return build_leaderboard(collect_samples(files, workers))
 
-    return {"task": task_key, "model": model, "accuracy": round(acc, 4)}
 
+def local_path(log_name: str) -> str:
+    """Filesystem path of a log listed by list_eval_logs (a path or file:// URI)."""
+    parsed = urlparse(log_name)
+    if parsed.scheme == "file":
+        return url2pathname(parsed.path)
+    if parsed.scheme and len(parsed.scheme) > 1:  # One letter: a Windows drive
+        raise ValueError(f"{log_name} is not a local file")
+    return log_name
 
-def collect(files: List[str]) -> pd.DataFrame:
-    rows = filter(None, (summarise_log(f) for f in files))
-    df = pd.DataFrame(rows)
 
-    if df.empty:
+def sync_index(index: ScoreIndex, log_dir: str, files: List[str], workers: Optional[int] = None) -> int:
+    """Bring the score index up to date with the logs under log_dir.
+
+    Only logs the index hasn't seen are parsed; indexed logs that were deleted
+    are dropped. Returns the number of logs parsed.
+    """
+    pending = index.pending(sorted(files))
+    logs = map_logs(extract_log, [path for path, *_ in pending], workers)
+    for (path, digest, stat), log in zip(pending, logs):
+        index.add(path, digest, stat, log)
+    index.prune(log_dir, files)
+    return len(pending)
+
+
+def task_weights() -> pd.Series:
+    return pd.Series({task: cfg["weight"] for task, cfg in TASKS.items()})
+
+
+def build_leaderboard(samples: pd.DataFrame) -> pd.DataFrame:
+    """One row per model, one column per task, plus the weighted overall.
+
+    A model's task score is its accuracy in each log (to 4 places), averaged
+    over duplicate logs for the same model and task.
+    """
+    if samples.empty:
         raise SystemExit("No valid logs found")
 
-    # Handle duplicate entries by aggregating them (take mean accuracy)
-    # This prevents pivot errors when there are multiple logs for the same model+task
-    df_agg = df.groupby(["model", "task"], as_index=False)["accuracy"].mean()
+    per_log = samples.groupby(["model", "task", "log"])["value"].mean().round(4)
+    table = per_log.groupby(level=["model", "task"]).mean().unstack("task").fillna(0)
 
-    # pivot: one row per model, one col per task
-    table = df_agg.pivot(index="model", columns="task", values="accuracy").fillna(0)
+    # weighted overall; tasks without logs score 0
+    weights = task_weights()
+    missing = [t for t in weights.index if t not in table.columns]
+    table = table.reindex(columns=[*table.columns, *missing], fill_value=0)
+    table["overall"] = (table[weights.index] @ weights).round(4)
+
+    return table.reset_index()
 
-    # weighted overall
-    for t, cfg in TASKS.items():
-        if t not in table.columns:
-            table[t] = 0
-    table["overall"] = sum(table[t] * cfg["weight"] for t, cfg in TASKS.items()).round(
-        4
+
+def service_breakdown(samples: pd.DataFrame) -> pd.DataFrame:
+    """Mean score per (model, task, canonical AWS service), pooled over all samples."""
+    columns = ["model", "task", "service", "service_name", "score", "samples"]
+    exploded = samples[["model", "task", "services", "value"]].explode("services").dropna(subset=["services"])
+    if exploded.empty:
+        return pd.DataFrame(columns=columns)
+    breakdown = (
+        exploded.rename(columns={"services": "service"})
+        .groupby(["model", "task", "service"])["value"]
+        .agg(score="mean", samples="size")
+        .reset_index()
     )
+    breakdown["score"] = breakdown["score"].round(4)
+    names = {service_id: display_name(service_id) for service_id in breakdown["service"].unique()}
+    breakdown["service_name"] = breakdown["service"].map(names)
+    return breakdown[columns]
+
+
+def write_sample_table(samples: pd.DataFrame, path: str) -> pathlib.Path:
+    """Write the sample table as Parquet (if the path ends in .parquet), else CSV.
+
+    Without pyarrow, a .parquet path is written as CSV next to it. In CSV the
+    list columns (domains, services) are joined with "|".
+    """
+    out = pathlib.Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    if out.suffix == ".parquet":
+        try:
+            samples.to_parquet(out, index=False)
+            return out
+        except ImportError:
+            out = out.with_suffix(".csv")
+            print(f"[warn] pyarrow not installed, writing the sample table as CSV to {out}")
+    samples.assign(**{c: samples[c].str.join("|") for c in LIST_FIELDS}).to_csv(out, index=False)
+    return out
+
+
+WATCH_REFRESH = 30  # Seconds between polls of the log dir in --watch mode
 
-    return table.reset_index()
+
+def write_atomic(path: str, text: str) -> None:
+    """Replace path's content in one step, so readers never see a partial file."""
+    out = pathlib.Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + ".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, out)
+
+
+class LiveLeaderboard:
+    """A leaderboard updated one log at a time, for logs still being written.
+
+    Each log's accuracy is kept. When logs change, only their (model, task)
+    cells and those models' overall scores are recomputed. Scores are the
+    same as build_leaderboard's over the same logs.
+    """
+
+    def __init__(self, weights: pd.Series):
+        self.weights = weights
+        self.logs: Dict[str, Tuple[str, str, float, int]] = {}  # path -> (model, task, accuracy, samples)
+        self.cells: Dict[Tuple[str, str], float] = {}
+        self.overall: Dict[str, float] = {}
+
+    def update(self, paths: Iterable[str], samples: pd.DataFrame) -> Set[Tuple[str, str]]:
+        """Replace the given logs with their rows in samples; logs without rows are dropped.
+
+        Returns the (model, task) cells whose score changed.
+        """
+        touched: Set[Tuple[str, str]] = set()
+        for path in paths:
+            old = self.logs.pop(path, None)
+            if old is not None:
+                touched.add(old[:2])
+        per_log = samples.groupby(["log", "model", "task"])["value"].agg(["mean", "size"])
+        for (path, model, task), row in per_log.iterrows():
+            self.logs[path] = (model, task, round(float(row["mean"]), 4), int(row["size"]))
+            touched.add((model, task))
+        if not touched:
+            return set()
+
+        accuracies: Dict[Tuple[str, str], List[float]] = {cell: [] for cell in touched}
+        for model, task, accuracy, _ in self.logs.values():
+            if (model, task) in accuracies:
+                accuracies[(model, task)].append(accuracy)
+        changed = set()
+        for cell, values in accuracies.items():
+            score = float(np.mean(values)) if values else None
+            if score != self.cells.get(cell):
+                changed.add(cell)
+            if score is None:
+                self.cells.pop(cell, None)
+            else:
+                self.cells[cell] = score
+        for model in {model for model, _ in touched}:
+            tasks = {task: score for (m, task), score in self.cells.items() if m == model}
+            if tasks:
+                self.overall[model] = round(sum(w * tasks.get(t, 0.0) for t, w in self.weights.items()), 4)
+            else:
+                self.overall.pop(model, None)
+        return changed
+
+    def frame(self) -> pd.DataFrame:
+        """The leaderboard, in build_leaderboard's layout."""
+        present = sorted({task for _, task in self.cells})
+        missing = [t for t in self.weights.index if t not in present]
+        columns = [*present, *missing]
+        rows = [
+            {"model": model, **{t: self.cells.get((model, t), 0.0) for t in present}, **dict.fromkeys(missing, 0),
+             "overall": overall}
+            for model, overall in sorted(self.overall.items())
+        ]
+        return pd.DataFrame(rows, columns=["model", *columns, "overall"]).rename_axis(columns="task")
+
+
+def read_live_log(path: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """extract_log for a log that may be mid-write: (log, None), or (None, error) if it can't be read yet."""
+    try:
+        return extract_log(path), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+class LogWatcher:
+    """Keeps a LiveLeaderboard in step with a log dir through the score index.
+
+    Each poll stats every log. Only logs that are new or have grown are read
+    (Inspect journals sample summaries, so a running eval's log can be read
+    without the full samples). Logs that can't be read mid-write are retried
+    on the next poll.
+    """
+
+    def __init__(self, index: ScoreIndex, log_dir: str, workers: Optional[int] = None):
+        self.index = index
+        self.log_dir = log_dir
+        self.workers = workers
+        self.board = LiveLeaderboard(task_weights())
+        self.known: Set[str] = set()
+
+    def poll(self) -> Set[Tuple[str, str]]:
+        """Ingest changed logs; returns the (model, task) cells whose score changed."""
+        files = [local_path(str(log.name)) for log in list_eval_logs(self.log_dir)]
+        pending = self.index.pending(sorted(files))
+        changed = set(files) ^ self.known
+        for (path, digest, stat), (log, error) in zip(pending, map_logs(read_live_log, [p for p, *_ in pending],
+                                                                         self.workers)):
+            if error is not None:
+                print(f"[warn] {path} not readable yet ({error})")
+                changed.discard(path)
+                continue
+            self.index.add(path, digest, stat, log)
+            changed.add(path)
+        self.index.prune(self.log_dir, files)
+        self.known = (self.known | changed) & set(files)
+        if not changed:
+            return set()
+        ids = {path: log_id for log_id, path in self.index.log_paths(self.index.select(self.log_dir)).items()}
+        samples = self.index.sample_table([ids[path] for path in changed if path in ids])
+        return self.board.update(changed, samples)
+
+    def write(self, outfile: str, json_out: Optional[str] = None) -> pd.DataFrame:
+        """Atomically rewrite the CSV (and JSON) leaderboard."""
+        leaderboard = self.board.frame()
+        write_atomic(outfile, leaderboard.to_csv(index=False))
+        if json_out:
+            records = leaderboard.to_dict(orient="records")
+            output = {
+                "_metadata": {
+                    "generated_at": datetime.now(timezone.utc).isoformat(),
+                    "run_id": os.environ.get("GITHUB_RUN_ID", f"local-{datetime.now().strftime('%Y%m%d-%H%M%S')}"),
+                    "model_count": len(records),
+                    "categories": build_category_metadata(),
+                    "in_progress": {
+                        "logs": len(self.board.logs),
+                        "samples": sum(n for *_, n in self.board.logs.values()),
+                    },
+                },
+                "models": records,
+            }
+            validate_leaderboard_json(output)
+            write_atomic(json_out, json.dumps(output, indent=2))
+        return leaderboard
+
+
+def watch(
+    log_dir: str,
+    outfile: str,
+    json_out: Optional[str] = None,
+    index_path: str = str(DEFAULT_INDEX),
+    refresh: float = WATCH_REFRESH,
+    workers: Optional[int] = None,
+) -> None:
+    """Poll log_dir every ``refresh`` seconds, rewriting the leaderboard whenever a score changes.
+
+    Runs until interrupted.
+    """
+    with ScoreIndex(index_path) as index:
+        watcher = LogWatcher(index, log_dir, workers)
+        try:
+            while True:
+                started = time.monotonic()
+                changed = watcher.poll()
+                if changed:
+                    watcher.write(outfile, json_out)
+                    cells = ", ".join(
+                        f"{model} {task} {watcher.board.cells[(model, task)]:.4f}"
+                        if (model, task) in watcher.board.cells else f"{model} {task} removed"
+                        for model, task in sorted(changed)
+                    )
+                    print(f"[{datetime.now().strftime('%H:%M:%S')}] {outfile}: {cells}")
+                time.sleep(max(0.0, refresh - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            print(f"Stopped watching {log_dir}")
 
 
 def main():
@@ -292,23 +677,119 @@ def main():
     ap.add_argument("--log-dir", required=True)
     ap.add_argument("--outfile", default="results/leaderboard.csv")
     ap.add_argument("--json-out", default=None)
+    ap.add_argument("--by-service", default=None,
+                    help="Also write per-model, per-task scores by canonical AWS service to this CSV")
+    ap.add_argument("--samples-out", default=None,
+                    help="Also write the per-sample table (.parquet if pyarrow is installed, else .csv)")
+    ap.add_argument("--cube-out", default=None,
+                    help="Also write score sums and counts by item difficulty, domain, service, skill "
+                         "and subtype to this JSON")
+    ap.add_argument("--significance-out", default=None,
+                    help="Also write paired significance tests of every model pair, per task, to this JSON")
+    ap.add_argument("--resamples", type=int, default=BOOTSTRAP_RESAMPLES,
+                    help="Bootstrap resamples for confidence intervals and paired tests")
+    ap.add_argument("--seed", type=int, default=BOOTSTRAP_SEED,
+                    help="Random seed for the bootstrap")
+    ap.add_argument("--workers", type=int, default=None,
+                    help="Processes reading logs in parallel (default: one per CPU; 1 = serial)")
+    ap.add_argument("--index", default=str(DEFAULT_INDEX),
+                    help="Per-sample score index; only logs not already in it are read")
+    ap.add_argument("--no-index", action="store_true",
+                    help="Read every log directly instead of going through the score index")
+    ap.add_argument("--history", default=None,
+                    help="Also append logs not yet in this results history directory (see results_history.py)")
+    ap.add_argument("--since", default=None,
+                    help="Only aggregate logs created on or after this date (YYYY-MM-DD)")
+    ap.add_argument("--runs", default=None,
+                    help="Only aggregate these runs (log subdirectories, comma-separated), "
+                         "or the latest N runs if a number")
+    ap.add_argument("--watch", action="store_true",
+                    help="Keep polling --log-dir and rewrite --outfile and --json-out as samples arrive "
+                         "(no confidence intervals or other outputs)")
+    ap.add_argument("--refresh", type=float, default=WATCH_REFRESH,
+                    help="Seconds between polls in --watch mode; the leaderboard is rewritten at most this often")
     args = ap.parse_args()
 
+    if args.watch:
+        if args.no_index or args.since or args.runs or args.history:
+            ap.error("--watch uses the score index over every log under --log-dir")
+        watch(args.log_dir, args.outfile, args.json_out, args.index, args.refresh, args.workers)
+        return
+
     logs = list_eval_logs(args.log_dir)
     log_paths = [str(log.name) for log in logs]
-    leaderboard = collect(log_paths)
+    use_index = not args.no_index
+    if use_index:
+        try:
+            log_paths = [local_path(p) for p in log_paths]
+        except ValueError as e:
+            print(f"[warn] {e}; reading every log directly (the score index only covers local log dirs)")
+            use_index = False
+    if not use_index:
+        if args.since or args.runs or args.history:
+            ap.error("--since, --runs and --history need the score index, which only covers local log dirs")
+        samples = collect_samples(log_paths, args.workers)
+    else:
+        runs = args.runs
+        if runs is not None:
+            runs = int(runs) if runs.isdigit() else [r.strip() for r in runs.split(",") if r.strip()]
+        with ScoreIndex(args.index) as index:
+            parsed = sync_index(index, args.log_dir, log_paths, args.workers)
+            print(f"Score index {args.index}: read {parsed} new or changed of {len(log_paths)} logs")
+            if args.history:
+                history = ResultsHistory(args.history)
+                ids = index.select(args.log_dir)
+                paths, versions = index.log_paths(ids), index.log_versions(ids)
+                versions = {path: versions[log_id] for log_id, path in paths.items()}
+                new = set(history.new_logs(versions))
+                appended = history.append(
+                    index.sample_table([i for i, p in paths.items() if p in new]), task_weights().to_dict(), versions
+                )
+                print(f"Results history {args.history}: appended {appended} samples")
+            selected = index.select(args.log_dir, since=args.since, runs=runs)
+            samples = index.sample_table(selected)
+    leaderboard = build_leaderboard(samples)
 
     pathlib.Path(args.outfile).parent.mkdir(parents=True, exist_ok=True)
     leaderboard.to_csv(args.outfile, index=False)
     print(f"CSV leaderboard → {args.outfile}")
     print(leaderboard.to_string(index=False))
 
+    if args.samples_out:
+        written = write_sample_table(samples, args.samples_out)
+        print(f"Sample table → {written} ({len(samples)} samples)")
+
+    if args.by_service:
+        breakdown = service_breakdown(samples)
+        pathlib.Path(args.by_service).parent.mkdir(parents=True, exist_ok=True)
+        breakdown.to_csv(args.by_service, index=False)
+        print(f"Service breakdown → {args.by_service} ({breakdown['service'].nunique()} services)")
+
+    if args.cube_out:
+        cube = build_score_cube(samples)
+        write_score_cube(cube, args.cube_out)
+        cells = sum(len(d["sum"]) for d in cube["dimensions"].values())
+        print(f"Score cube → {args.cube_out} ({cells} cells over {len(cube['dimensions'])} dimensions)")
+
+    if args.significance_out:
+        scoring = {task: CATEGORY_METADATA.get(task, {}).get("scoring", "rubric") for task in TASKS}
+        significance = paired_significance(samples, scoring, args.resamples, args.seed)
+        significance["generated_at"] = datetime.now(timezone.utc).isoformat()
+        pathlib.Path(args.significance_out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.significance_out, "w") as f:
+            json.dump(significance, f, separators=(",", ":"))
+        print(f"Paired significance → {args.significance_out} "
+              f"({len(significance['models'])} models, {len(significance['tasks'])} tasks)")
+
     if args.json_out:
-        # Convert to records
+        # Convert to records, each with its bootstrap confidence intervals
         records = leaderboard.to_dict(orient="records")
+        cis = bootstrap_cis(samples, task_weights().to_dict(), args.resamples, args.seed)
+        for record in records:
+            record["ci"] = cis.get(record["model"], {})
 
-        # Build enhanced category metadata
-        category_metadata = build_category_metadata()
+        # Build enhanced category metadata, with margins from the intervals
+        category_metadata = build_category_metadata(category_margins(cis))
 
         # Add metadata with enhanced categories
         metadata = {
@@ -316,6 +797,12 @@ def main():
             "run_id": os.environ.get("GITHUB_RUN_ID", f"local-{datetime.now().strftime('%Y%m%d-%H%M%S')}"),
             "model_count": len(records),
             "categories": category_metadata,
+            "confidence_intervals": {
+                "method": "percentile bootstrap over items",
+                "level": CI_LEVEL,
+                "resamples": args.resamples,
+                "seed": args.seed,
+            },
         }
 
         # Output format: { "_metadata": {...}, "models": [...] }
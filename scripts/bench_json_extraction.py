@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+bench_json_extraction.py — Check that JSON extraction stays linear on adversarial input.
+
+Times extract_architecture_json and the judge-response extraction
+(find_json_object) on brace-heavy inputs of doubling size, alongside the regex
+fallback they replaced. For each input family it fits the growth exponent k in
+time ~ size^k on a log-log scale: k near 1 is linear, k near 2 quadratic.
+
+Input families
+--------------
+- repeated-opening: '{"architecture": {' repeated; backtracks the old regex
+- deep-nesting:     {{{...}}} nested to the full size
+- nested-keys:      {"a" {"a" ... }} — every opening looks like JSON, none decode
+- escaped-strings:  {"a": "\\ repeated, mixing escapes, strings and braces
+- prose-braces:     {{"a": 1} x repeated — decodable objects inside unclosed prose
+
+Usage
+-----
+uv run python scripts/bench_json_extraction.py
+uv run python scripts/bench_json_extraction.py --max-size 4000000 --legacy-max-size 0
+"""
+
+import argparse
+import math
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from evals.architecture_design.json_extraction import extract_architecture_json, find_json_object
+
+LEGACY_ARCHITECTURE_PATTERN = re.compile(r'\{[^{}]*"architecture"[^{}]*\{.*\}[^{}]*\}', re.DOTALL)
+SCORE_KEYS = ("accuracy", "completeness", "quality")
+
+# Repeating unit (or builder) per input family, sized to roughly `size` characters
+FAMILIES = {
+    "repeated-opening": lambda size: '{"architecture": {' * (size // 18),
+    "deep-nesting": lambda size: "{" * (size // 2) + "}" * (size // 2),
+    "nested-keys": lambda size: '{"a" ' * (size // 6) + "}" * (size // 6),
+    "escaped-strings": lambda size: '{"a": "\\\\' * (size // 10) + "}" * (size // 10),
+    "prose-braces": lambda size: '{{"a": 1} x ' * (size // 12),
+}
+MAX_EXPONENT = 1.3  # Fitted growth above this counts as super-linear
+
+
+def _time(fn, text: str, repeat: int) -> float:
+    """Best-of-repeat wall time of fn(text), in seconds."""
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def growth_exponent(sizes: list[int], times: list[float]) -> float:
+    """Least-squares slope of log(time) against log(size)."""
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in times]
+    x_mean, y_mean = sum(xs) / len(xs), sum(ys) / len(ys)
+    numerator = sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys))
+    denominator = sum((x - x_mean) ** 2 for x in xs)
+    return numerator / denominator if denominator else 0.0
+
+
+def run_family(name: str, sizes: list[int], legacy_max_size: int, repeat: int) -> dict:
+    """Time every extractor on one input family across sizes."""
+    extractors = {
+        "architecture": extract_architecture_json,
+        "judge": lambda text: find_json_object(text, lambda obj: any(k in obj for k in SCORE_KEYS)),
+        "legacy-regex": LEGACY_ARCHITECTURE_PATTERN.search,
+    }
+    timings: dict[str, list[tuple[int, float]]] = {label: [] for label in extractors}
+    for size in sizes:
+        text = FAMILIES[name](size)
+        for label, fn in extractors.items():
+            if label == "legacy-regex" and size > legacy_max_size:
+                continue
+            timings[label].append((len(text), _time(fn, text, repeat)))
+
+    exponents = {
+        label: growth_exponent([s for s, _ in points], [t for _, t in points])
+        for label, points in timings.items()
+        if len(points) >= 2
+    }
+    return {"timings": timings, "exponents": exponents}
+
+
+def print_family(name: str, result: dict) -> None:
+    print(f"\n{name}")
+    labels = list(result["timings"])
+    print(f"  {'size':>10}" + "".join(f"{label:>15}" for label in labels))
+    by_size: dict[int, dict[str, float]] = {}
+    for label, points in result["timings"].items():
+        for size, seconds in points:
+            by_size.setdefault(size, {})[label] = seconds
+    for size, row in sorted(by_size.items()):
+        cells = "".join(
+            f"{row[label] * 1000:>13.2f}ms" if label in row else f"{'-':>15}" for label in labels
+        )
+        print(f"  {size:>10,}{cells}")
+    exponents = ", ".join(f"{label} k={k:.2f}" for label, k in result["exponents"].items())
+    print(f"  growth: {exponents}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark JSON extraction on adversarial input.")
+    ap.add_argument("--min-size", type=int, default=25_000, help="Smallest input size in characters")
+    ap.add_argument("--max-size", type=int, default=800_000, help="Largest input size in characters")
+    ap.add_argument("--legacy-max-size", type=int, default=100_000,
+                    help="Largest input to run the legacy regex on (it is quadratic); 0 to skip it")
+    ap.add_argument("--repeat", type=int, default=3, help="Timing repetitions per measurement (best is kept)")
+    ap.add_argument("--families", nargs="+", default=list(FAMILIES), choices=list(FAMILIES),
+                    help="Input families to run")
+    args = ap.parse_args()
+
+    sizes = []
+    size = args.min_size
+    while size <= args.max_size:
+        sizes.append(size)
+        size *= 2
+
+    failures = []
+    for name in args.families:
+        result = run_family(name, sizes, args.legacy_max_size, args.repeat)
+        print_family(name, result)
+        for label in ("architecture", "judge"):
+            exponent = result["exponents"].get(label)
+            if exponent is not None and exponent > MAX_EXPONENT:
+                failures.append(f"{name}/{label} (k={exponent:.2f})")
+
+    if failures:
+        print(f"\nSuper-linear growth (k > {MAX_EXPONENT}): {', '.join(failures)}")
+        sys.exit(1)
+    print(f"\nAll extractors grew at most linearly (k <= {MAX_EXPONENT}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+build_site_data.py — Sharded, precompressed leaderboard data for the static site.
+
+The leaderboard page used to fetch the full leaderboard.json and the log
+manifest (every log of every model) uncached on every load. This splits them
+into:
+
+- board.json: the summary for first paint. It holds the category metadata
+  and, per model, its scores, confidence intervals, a link to its latest log
+  and the name of its detail shard. It is small and revalidated on each load.
+- models/<model>.<hash>.json: one detail shard per model, fetched when the
+  model's row is expanded. It holds the model's logs and its paired
+  significance against every other model.
+- score_cube.<hash>.json: the score cube, fetched when the breakdown is opened.
+
+Shard names carry a hash of their content, so browsers and CDNs can cache
+them indefinitely. A shard whose content didn't change between builds keeps
+its name and stays cached. Every file gets a gzip sibling (.gz) and, if the
+brotli package is installed, a brotli one (.br) for servers that serve
+precompressed files. Shards no longer referenced by board.json are removed.
+
+Usage
+-----
+python scripts/build_site_data.py --results results --manifest docs/logs/manifest.json --out site/data
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import pathlib
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - optional
+    brotli = None
+
+SUMMARY = "board.json"
+HASH_LENGTH = 10
+_HASHED = re.compile(r"\.[0-9a-f]{%d}\.json$" % HASH_LENGTH)
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), sort_keys=True).encode()
+
+
+def hashed_name(stem: str, content: bytes) -> str:
+    """stem.<content hash>.json"""
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}.json"
+
+
+def model_slug(model: str) -> str:
+    return re.sub(r"[^a-z0-9._-]+", "-", model.lower()).strip("-")
+
+
+def display_name(model: str) -> str:
+    """The model name as in the log manifest, without the openrouter/ prefix."""
+    return model[len("openrouter/"):] if model.startswith("openrouter/") else model
+
+
+def model_logs(manifest: Optional[Dict[str, Any]], model: str) -> List[Dict[str, Any]]:
+    """A model's manifest log entries, latest first."""
+    entry = ((manifest or {}).get("models") or {}).get(display_name(model)) or {}
+    return sorted(entry.get("logs") or [], key=lambda log: log.get("completed_at") or "", reverse=True)
+
+
+def log_url(logs: List[Dict[str, Any]]) -> Optional[str]:
+    """Log viewer link to the latest log, or None without logs."""
+    if not logs:
+        return None
+    return "logs/index.html?log_file=" + quote(logs[0]["file"], safe="-_.!~*'()")
+
+
+def significance_rows(significance: Optional[Dict[str, Any]], model: str) -> Dict[str, Any]:
+    """One model's row of every task's paired significance matrix.
+
+    Returns {task: {"test", "versus": [{"model", "delta", "p_value",
+    "shared_items"}]}}, with only the models it shares items with.
+    """
+    if not significance or model not in significance.get("models", []):
+        return {}
+    models = significance["models"]
+    row = models.index(model)
+    rows = {}
+    for task, report in significance["tasks"].items():
+        rows[task] = {
+            "test": report["test"],
+            "versus": [
+                {
+                    "model": other,
+                    "delta": report["delta"][row][col],
+                    "p_value": report["p_value"][row][col],
+                    "shared_items": report["shared_items"][row][col],
+                }
+                for col, other in enumerate(models)
+                if col != row and report["shared_items"][row][col] > 0
+            ],
+        }
+    return rows
+
+
+def build_site_data(
+    leaderboard: Dict[str, Any],
+    manifest: Optional[Dict[str, Any]] = None,
+    significance: Optional[Dict[str, Any]] = None,
+    cube: Optional[Dict[str, Any]] = None,
+) -> Dict[str, bytes]:
+    """Site data files by path relative to the data directory: the summary and its shards."""
+    files: Dict[str, bytes] = {}
+    models = []
+    for record in leaderboard["models"]:
+        logs = model_logs(manifest, record["model"])
+        detail = _dumps({
+            "model": record["model"],
+            "logs": logs,
+            "significance": significance_rows(significance, record["model"]),
+        })
+        name = "models/" + hashed_name(model_slug(record["model"]), detail)
+        files[name] = detail
+        models.append({**record, "log": log_url(logs), "detail": name})
+
+    summary: Dict[str, Any] = {"_metadata": leaderboard["_metadata"], "models": models, "files": {}}
+    if cube is not None:
+        content = _dumps(cube)
+        name = hashed_name("score_cube", content)
+        files[name] = content
+        summary["files"]["score_cube"] = name
+    files[SUMMARY] = _dumps(summary)
+    return files
+
+
+def write_site_data(files: Dict[str, bytes], out_dir: str) -> List[pathlib.Path]:
+    """Write the files and their precompressed siblings; remove shards of earlier builds.
+
+    Returns the paths written.
+    """
+    root = pathlib.Path(out_dir)
+    written = []
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        siblings = {path: content, path.with_name(path.name + ".gz"): gzip.compress(content, 9, mtime=0)}
+        if brotli is not None:
+            siblings[path.with_name(path.name + ".br")] = brotli.compress(content)
+        for target, data in siblings.items():
+            target.write_bytes(data)
+            written.append(target)
+
+    keep = set(written)
+    for path in root.rglob("*"):
+        base = path.name.removesuffix(".gz").removesuffix(".br")
+        if path.is_file() and _HASHED.search(base) and path not in keep:
+            path.unlink()
+    return written
+
+
+def _load(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    if path is None or not pathlib.Path(path).exists():
+        return None
+    return json.loads(pathlib.Path(path).read_text())
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build the static site's leaderboard data shards")
+    ap.add_argument("--results", default="results",
+                    help="Directory with leaderboard.json and, optionally, significance.json and score_cube.json")
+    ap.add_argument("--manifest", default="docs/logs/manifest.json", help="Log manifest from bundle_logs.sh")
+    ap.add_argument("--out", default="site/data")
+    args = ap.parse_args()
+
+    results = pathlib.Path(args.results)
+    leaderboard = _load(str(results / "leaderboard.json"))
+    if leaderboard is None:
+        raise SystemExit(f"No leaderboard.json in {results}; run aggregate_multi.py --json-out first")
+    if brotli is None:
+        print("[warn] brotli not installed, writing .gz siblings only")
+
+    files = build_site_data(
+        leaderboard,
+        manifest=_load(args.manifest),
+        significance=_load(str(results / "significance.json")),
+        cube=_load(str(results / "score_cube.json")),
+    )
+    write_site_data(files, args.out)
+    print(f"Site data → {args.out}: {SUMMARY} ({len(files[SUMMARY])} bytes) and {len(files) - 1} shards")
+
+
+if __name__ == "__main__":
+    main()
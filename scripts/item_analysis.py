@@ -0,0 +1,142 @@
+"""
+item_analysis.py — Classical item statistics across models.
+
+Every item of the three datasets has been answered by many models. For each
+(task, item) this computes, from the score index (see score_index.py):
+
+- p_value: classical item difficulty, the mean score of the models that
+  answered the item (for binary tasks, the share that got it right)
+- pass_rate: the share of those models scoring 0.5 or more
+- discrimination: corrected point-biserial correlation between the item's
+  score and each model's mean score on the task's other items. Items that
+  separate strong from weak models score high. Negative values usually mean
+  a wrong or ambiguous answer key.
+- saturated: "all_pass" or "all_fail" if every model that answered the item
+  passed or failed it. These items tell models apart no better than chance
+  and are the first to drop or down-sample in future runs.
+
+A model's score on an item is averaged over epochs and duplicate logs.
+Statistics need answers from at least --min-models models and are left
+empty otherwise. Each task is one (models × items) matrix, so all items of a
+task are computed at once.
+
+The index is filled by aggregate_multi.py; run it first. No logs are read.
+
+Usage
+-----
+python scripts/item_analysis.py --log-dir logs --out results/item_stats.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+from score_index import DEFAULT_INDEX, ITEM_FIELDS, ScoreIndex
+from score_stats import score_matrix
+
+DEFAULT_OUT = pathlib.Path(__file__).parent.parent / "results" / "item_stats.csv"
+MIN_MODELS = 3
+PASS_SCORE = 0.5  # As in score_stats.mcnemar
+
+ITEM_STATS_COLUMNS = [
+    "task", "sample_id", "models", "p_value", "pass_rate", "discrimination", "saturated", *ITEM_FIELDS, "domains",
+]
+
+
+def matrix_item_stats(values: np.ndarray, min_models: int = MIN_MODELS) -> Dict[str, np.ndarray]:
+    """Item statistics of every column of a (models × items) score matrix, NaN where unanswered."""
+    answered = ~np.isnan(values)
+    scores = np.where(answered, values, 0.0)
+    models = answered.sum(axis=0)
+    enough = models >= min_models
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p_value = scores.sum(axis=0) / models
+        pass_rate = (answered & (scores >= PASS_SCORE)).sum(axis=0) / models
+
+        # Each model's mean score on the task's other items
+        totals = scores.sum(axis=1, keepdims=True)
+        counts = answered.sum(axis=1, keepdims=True)
+        rest = (totals - scores) / (counts - 1)
+        paired = answered & (counts > 1)
+        n = paired.sum(axis=0)
+        x = scores - (scores * paired).sum(axis=0) / n
+        r = rest - np.where(paired, rest, 0.0).sum(axis=0) / n
+        x, r = np.where(paired, x, 0.0), np.where(paired, r, 0.0)
+        discrimination = (x * r).sum(axis=0) / np.sqrt((x * x).sum(axis=0) * (r * r).sum(axis=0))
+
+    saturated = np.where(pass_rate == 1, "all_pass", np.where(pass_rate == 0, "all_fail", None))
+    return {
+        "models": models,
+        "p_value": np.where(enough, p_value, np.nan),
+        "pass_rate": np.where(enough, pass_rate, np.nan),
+        "discrimination": np.where(enough & (n >= min_models) & np.isfinite(discrimination), discrimination, np.nan),
+        "saturated": np.where(enough, saturated, None),
+    }
+
+
+def item_stats(samples: pd.DataFrame, min_models: int = MIN_MODELS) -> pd.DataFrame:
+    """One row of item statistics per (task, item), with the item's metadata ("|"-joined domains)."""
+    frames = []
+    for task, task_samples in samples.groupby("task", sort=True):
+        matrix = score_matrix(task_samples)
+        stats = matrix_item_stats(matrix.values, min_models)
+        frames.append(pd.DataFrame({"task": task, "sample_id": matrix.items, **stats}))
+    if not frames:
+        return pd.DataFrame(columns=ITEM_STATS_COLUMNS)
+    stats = pd.concat(frames, ignore_index=True)
+    metadata = samples.groupby(["task", "sample_id"])[[*ITEM_FIELDS, "domains"]].first().reset_index()
+    metadata["domains"] = metadata["domains"].map(lambda domains: "|".join(domains or []))
+    stats = stats.merge(metadata.astype({"sample_id": str}), on=["task", "sample_id"], how="left")
+    return stats.round({"p_value": 4, "pass_rate": 4, "discrimination": 4})[ITEM_STATS_COLUMNS]
+
+
+def summarize(stats: pd.DataFrame) -> pd.DataFrame:
+    """Per task: items, saturated items and the median discrimination."""
+    grouped = stats.groupby("task")
+    return pd.DataFrame({
+        "items": grouped.size(),
+        "all_pass": grouped["saturated"].apply(lambda s: int((s == "all_pass").sum())),
+        "all_fail": grouped["saturated"].apply(lambda s: int((s == "all_fail").sum())),
+        "negative_discrimination": grouped["discrimination"].apply(lambda d: int((d < 0).sum())),
+        "median_discrimination": grouped["discrimination"].median().round(4),
+    })
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Item difficulty, discrimination and saturation across models")
+    ap.add_argument("--index", default=str(DEFAULT_INDEX), help="Score index written by aggregate_multi.py")
+    ap.add_argument("--log-dir", default=None, help="Only logs under this directory (default: all indexed logs)")
+    ap.add_argument("--since", default=None, help="Only logs created on or after this date (YYYY-MM-DD)")
+    ap.add_argument("--runs", default=None,
+                    help="Only these runs (log subdirectories, comma-separated), or the latest N runs if a number")
+    ap.add_argument("--min-models", type=int, default=MIN_MODELS,
+                    help="Models that must have answered an item for its statistics")
+    ap.add_argument("--out", default=str(DEFAULT_OUT), help="Per-item statistics CSV")
+    args = ap.parse_args()
+
+    if not pathlib.Path(args.index).exists():
+        raise SystemExit(f"No score index at {args.index}; run aggregate_multi.py first")
+    runs: Optional[list | int] = None
+    if args.runs is not None:
+        runs = int(args.runs) if args.runs.isdigit() else [r.strip() for r in args.runs.split(",") if r.strip()]
+    with ScoreIndex(args.index) as index:
+        samples = index.sample_table(index.select(args.log_dir, since=args.since, runs=runs))
+    if samples.empty:
+        raise SystemExit("No scored samples in the index")
+
+    stats = item_stats(samples, args.min_models)
+    out = pathlib.Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    stats.to_csv(out, index=False)
+    print(summarize(stats).to_string())
+    print(f"Wrote {out} ({len(stats)} items)")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,44 +6,70 @@ This script runs the LLM judge on calibration responses and measures:
 - Agreement rate (% within tolerance of ground truth)
 - Mean absolute error per dimension
 - Self-consistency (variance across multiple runs)
+
+Every (model, sample, run) judge call is issued concurrently, limited by
+--concurrency. Judge results are appended to a JSONL cache keyed by model,
+rubric prompt, run number and judging mode (batch size and prompt layout), so re-running the script (or adding a model to the
+comparison) only calls the judge for results it hasn't seen. Pass several
+--models to compare candidate judges side by side, and --json-out / --csv-out for
+a machine-readable report.
+
+Usage
+-----
+uv run python scripts/measure_judge_agreement.py \
+        --models openai/gpt-4o-mini anthropic/claude-3-5-haiku-latest \
+        --runs 3 --concurrency 16 --json-out results/judge_agreement.json
+
+Set ARCHITECTURE_JUDGE_BATCH_SIZE > 1 to measure batched judging, or
+ARCHITECTURE_JUDGE_PROMPT_LAYOUT=cached for the cache-friendly prompt layout;
+compare the result against an unbatched, inline run to check that the mode
+doesn't shift agreement.
 """
 
+import argparse
 import asyncio
+import csv
 import json
 import os
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 from statistics import mean, stdev
 
 # Add project root to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
 
 from evals.architecture_design.tasks import (
     _call_judge,
     _parse_judge_response,
     DEFAULT_JUDGE_MODEL,
+    DEFAULT_JUDGE_BATCH_SIZE,
+    DEFAULT_JUDGE_PROMPT_LAYOUT,
+    JudgeBatcher,
+)
+from evals.architecture_design.judge_calibration import (
+    CACHE_FILE,
+    CALIBRATION_FILE,
+    DIMENSIONS,
+    NUM_RUNS,
+    TOLERANCE,
+    JudgeCache,
+    judge_mode,
+    load_calibration_data,
 )
-from evals.architecture_design.judge_prompts import format_rubric_prompt
+from evals.architecture_design.judge_prompts import format_rubric_prompt, format_rubric_prompt_parts
 from inspect_ai.model import get_model, GenerateConfig
 
 
 # Configuration
-TOLERANCE = 0.15  # Agreement threshold
-NUM_RUNS = 3  # Number of judge runs for consistency check
-CALIBRATION_FILE = Path(__file__).parent.parent / "evals/architecture_design/calibration/responses.jsonl"
-
+TARGET_AGREEMENT = 80.0  # Minimum agreement rate (%) for a judge to pass
+CONCURRENCY = 16  # Maximum judge calls in flight
+BATCH_SIZE = DEFAULT_JUDGE_BATCH_SIZE  # >1 compares batched against unbatched judging
+PROMPT_LAYOUT = DEFAULT_JUDGE_PROMPT_LAYOUT  # "inline" or "cached" (unbatched calls only)
 
-def load_calibration_data():
-    """Load calibration responses with ground truth."""
-    samples = []
-    with open(CALIBRATION_FILE, "r") as f:
-        for line in f:
-            if line.strip():
-                samples.append(json.loads(line))
-    return samples
 
-
-async def run_judge_on_sample(judge_model, sample):
+async def run_judge_on_sample(judge_model, sample, batcher=None):
     """Run the judge on a single calibration sample."""
     rubric_prompt = format_rubric_prompt(
         sample["type"],
@@ -55,75 +81,77 @@ async def run_judge_on_sample(judge_model, sample):
     if not rubric_prompt:
         return None
 
+    if batcher is not None:
+        return await batcher.judge((sample["type"], sample["subtype"]), rubric_prompt)
+    if PROMPT_LAYOUT == "cached":
+        rubric_prompt = format_rubric_prompt_parts(
+            sample["type"], sample["subtype"], sample["model_response"], sample
+        )
     result = await _call_judge(judge_model, rubric_prompt)
     return result
 
 
-async def measure_agreement():
-    """Run agreement measurement against calibration set."""
-    print(f"Loading calibration data from {CALIBRATION_FILE}")
-    samples = load_calibration_data()
-    print(f"Loaded {len(samples)} calibration samples")
+async def judge_with_cache(model_name, judge_model, sample, run, cache, semaphore, batcher=None):
+    """Judge one (sample, run), reusing a cached result when there is one."""
+    rubric_prompt = format_rubric_prompt(
+        sample["type"], sample["subtype"], sample["model_response"], sample
+    )
+    if not rubric_prompt:
+        return None
 
-    # Initialize judge model
-    judge_model_name = os.environ.get("ARCHITECTURE_JUDGE_MODEL", DEFAULT_JUDGE_MODEL)
-    print(f"Using judge model: {judge_model_name}")
-    judge_model = get_model(judge_model_name)
+    mode = judge_mode(batcher.max_batch_size if batcher is not None else 1, PROMPT_LAYOUT)
+    key = JudgeCache.key(model_name, rubric_prompt, run, mode)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
 
-    # Track results
+    async with semaphore:
+        result = await run_judge_on_sample(judge_model, sample, batcher)
+    if result is not None:
+        cache.put(key, result, model=model_name, sample_id=sample["id"], run=run, mode=mode)
+    return result
+
+
+def summarise_model(model_name, samples, runs, tolerance=TOLERANCE, verbose=True):
+    """Compare one judge's results with ground truth.
+
+    ``runs`` holds one list of judge results (aligned with ``samples``) per run.
+    """
     all_results = []
-    dimension_errors = {"accuracy": [], "completeness": [], "quality": []}
 
-    for sample in samples:
+    for index, sample in enumerate(samples):
         sample_id = sample["id"]
         ground_truth = sample["ground_truth"]
         quality_tier = sample.get("quality_tier", "unknown")
 
-        print(f"\nProcessing {sample_id} ({quality_tier} tier)...")
-
-        # Run judge multiple times for consistency
-        sample_scores = []
-        for run in range(NUM_RUNS):
-            result = await run_judge_on_sample(judge_model, sample)
-            if result:
-                sample_scores.append(result)
+        # Collect the judge results for this sample across runs
+        sample_scores = [run[index] for run in runs if run[index]]
 
         if not sample_scores:
             print(f"  ⚠ Failed to get judge scores for {sample_id}")
             continue
 
-        # Calculate average scores across runs
-        avg_scores = {
-            "accuracy": mean([s.get("accuracy", 0.5) for s in sample_scores]),
-            "completeness": mean([s.get("completeness", 0.5) for s in sample_scores]),
-            "quality": mean([s.get("quality", 0.5) for s in sample_scores]),
-        }
-
-        # Calculate self-consistency (std dev across runs)
+        # Average scores and self-consistency (std dev) across runs
+        values = {dim: [s.get(dim, 0.5) for s in sample_scores] for dim in DIMENSIONS}
+        avg_scores = {dim: mean(values[dim]) for dim in DIMENSIONS}
         consistency = {
-            "accuracy": stdev([s.get("accuracy", 0.5) for s in sample_scores]) if len(sample_scores) > 1 else 0,
-            "completeness": stdev([s.get("completeness", 0.5) for s in sample_scores]) if len(sample_scores) > 1 else 0,
-            "quality": stdev([s.get("quality", 0.5) for s in sample_scores]) if len(sample_scores) > 1 else 0,
+            dim: stdev(values[dim]) if len(sample_scores) > 1 else 0 for dim in DIMENSIONS
         }
 
         # Calculate errors from ground truth
-        errors = {
-            "accuracy": abs(avg_scores["accuracy"] - ground_truth["accuracy"]),
-            "completeness": abs(avg_scores["completeness"] - ground_truth["completeness"]),
-            "quality": abs(avg_scores["quality"] - ground_truth["quality"]),
-        }
+        errors = {dim: abs(avg_scores[dim] - ground_truth[dim]) for dim in DIMENSIONS}
 
         # Check agreement (within tolerance)
-        within_tolerance = all(e <= TOLERANCE for e in errors.values())
+        within_tolerance = all(e <= tolerance for e in errors.values())
 
-        # Print sample result
-        print(f"  Ground Truth: A={ground_truth['accuracy']:.2f} C={ground_truth['completeness']:.2f} Q={ground_truth['quality']:.2f}")
-        print(f"  Judge Avg:    A={avg_scores['accuracy']:.2f} C={avg_scores['completeness']:.2f} Q={avg_scores['quality']:.2f}")
-        print(f"  Errors:       A={errors['accuracy']:.2f} C={errors['completeness']:.2f} Q={errors['quality']:.2f}")
-        print(f"  Consistency:  A={consistency['accuracy']:.2f} C={consistency['completeness']:.2f} Q={consistency['quality']:.2f}")
-        print(f"  Agreement:    {'✓' if within_tolerance else '✗'} (tolerance={TOLERANCE})")
+        if verbose:
+            print(f"\nProcessing {sample_id} ({quality_tier} tier)...")
+            print(f"  Ground Truth: A={ground_truth['accuracy']:.2f} C={ground_truth['completeness']:.2f} Q={ground_truth['quality']:.2f}")
+            print(f"  Judge Avg:    A={avg_scores['accuracy']:.2f} C={avg_scores['completeness']:.2f} Q={avg_scores['quality']:.2f}")
+            print(f"  Errors:       A={errors['accuracy']:.2f} C={errors['completeness']:.2f} Q={errors['quality']:.2f}")
+            print(f"  Consistency:  A={consistency['accuracy']:.2f} C={consistency['completeness']:.2f} Q={consistency['quality']:.2f}")
+            print(f"  Agreement:    {'✓' if within_tolerance else '✗'} (tolerance={tolerance})")
 
-        # Track for summary
         all_results.append({
             "id": sample_id,
             "tier": quality_tier,
@@ -134,44 +162,189 @@ async def measure_agreement():
             "within_tolerance": within_tolerance,
         })
 
-        for dim in dimension_errors:
-            dimension_errors[dim].append(errors[dim])
+    agreement_count = sum(1 for r in all_results if r["within_tolerance"])
+    agreement_rate = agreement_count / len(all_results) * 100 if all_results else 0
 
-    # Print summary
+    by_tier = {}
+    for tier in ["excellent", "good", "poor"]:
+        tier_results = [r for r in all_results if r["tier"] == tier]
+        if tier_results:
+            by_tier[tier] = {
+                "agreement_rate": sum(1 for r in tier_results if r["within_tolerance"]) / len(tier_results) * 100,
+                "samples": len(tier_results),
+            }
+
+    return {
+        "model": model_name,
+        "samples": len(all_results),
+        "runs": len(runs),
+        "tolerance": tolerance,
+        "agreement_rate": agreement_rate,
+        "agreement_count": agreement_count,
+        "passed": agreement_rate >= TARGET_AGREEMENT,
+        "mae": {
+            dim: mean([r["errors"][dim] for r in all_results]) if all_results else 0
+            for dim in DIMENSIONS
+        },
+        "consistency": {
+            dim: mean([r["consistency"][dim] for r in all_results]) if all_results else 0
+            for dim in DIMENSIONS
+        },
+        "by_tier": by_tier,
+        "results": all_results,
+    }
+
+
+def print_summary(report):
+    """Print the summary block for one judge model."""
     print("\n" + "=" * 60)
-    print("SUMMARY")
+    print(f"SUMMARY: {report['model']}")
     print("=" * 60)
 
-    agreement_count = sum(1 for r in all_results if r["within_tolerance"])
-    agreement_rate = agreement_count / len(all_results) * 100 if all_results else 0
-
-    print(f"\nAgreement Rate: {agreement_rate:.1f}% ({agreement_count}/{len(all_results)})")
-    print(f"Target: ≥80%")
-    print(f"Status: {'✓ PASS' if agreement_rate >= 80 else '✗ FAIL'}")
+    print(f"\nAgreement Rate: {report['agreement_rate']:.1f}% ({report['agreement_count']}/{report['samples']})")
+    print(f"Target: ≥{TARGET_AGREEMENT:.0f}%")
+    print(f"Status: {'✓ PASS' if report['passed'] else '✗ FAIL'}")
 
     print(f"\nMean Absolute Error by Dimension:")
-    for dim, errors in dimension_errors.items():
-        mae = mean(errors) if errors else 0
+    for dim, mae in report["mae"].items():
         print(f"  {dim}: {mae:.3f}")
 
-    print(f"\nSelf-Consistency (std dev across {NUM_RUNS} runs):")
-    avg_consistency = {
-        dim: mean([r["consistency"][dim] for r in all_results])
-        for dim in ["accuracy", "completeness", "quality"]
-    }
-    for dim, std in avg_consistency.items():
+    print(f"\nSelf-Consistency (std dev across {report['runs']} runs):")
+    for dim, std in report["consistency"].items():
         print(f"  {dim}: {std:.3f}")
 
     print(f"\nBy Quality Tier:")
-    for tier in ["excellent", "good", "poor"]:
-        tier_results = [r for r in all_results if r["tier"] == tier]
-        if tier_results:
-            tier_agreement = sum(1 for r in tier_results if r["within_tolerance"]) / len(tier_results) * 100
-            print(f"  {tier}: {tier_agreement:.1f}% agreement ({len(tier_results)} samples)")
+    for tier, tier_report in report["by_tier"].items():
+        print(f"  {tier}: {tier_report['agreement_rate']:.1f}% agreement ({tier_report['samples']} samples)")
+
+
+def write_json_report(reports, path):
+    """Write the full per-model reports as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    output = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "calibration_file": str(CALIBRATION_FILE.relative_to(PROJECT_ROOT)),
+        "target_agreement": TARGET_AGREEMENT,
+        "models": reports,
+    }
+    with open(path, "w") as f:
+        json.dump(output, f, indent=2)
+    print(f"JSON report → {path}")
+
+
+def write_csv_report(reports, path):
+    """Write one summary row per judge model as CSV."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fieldnames = ["model", "samples", "runs", "tolerance", "agreement_rate", "passed"]
+    fieldnames += [f"mae_{dim}" for dim in DIMENSIONS]
+    fieldnames += [f"consistency_{dim}" for dim in DIMENSIONS]
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for report in reports:
+            row = {key: report[key] for key in fieldnames[:6]}
+            row.update({f"mae_{dim}": round(v, 4) for dim, v in report["mae"].items()})
+            row.update({f"consistency_{dim}": round(v, 4) for dim, v in report["consistency"].items()})
+            writer.writerow(row)
+    print(f"CSV report → {path}")
+
+
+async def measure_agreement(
+    models=None,
+    num_runs=NUM_RUNS,
+    concurrency=CONCURRENCY,
+    tolerance=TOLERANCE,
+    cache_path=CACHE_FILE,
+    verbose=True,
+):
+    """Run agreement measurement against calibration set for each judge model."""
+    print(f"Loading calibration data from {CALIBRATION_FILE}")
+    samples = load_calibration_data()
+    print(f"Loaded {len(samples)} calibration samples")
+
+    models = models or [os.environ.get("ARCHITECTURE_JUDGE_MODEL", DEFAULT_JUDGE_MODEL)]
+    print(f"Using judge models: {', '.join(models)}")
+    print(f"Judge batch size: {BATCH_SIZE}{' (unbatched)' if BATCH_SIZE <= 1 else ''}")
+    print(f"Judge mode: {judge_mode(BATCH_SIZE, PROMPT_LAYOUT)}")
+    print(f"Runs: {num_runs}, concurrency: {concurrency}")
+
+    cache = JudgeCache(cache_path)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # Issue every (model, sample, run) judge call at once; the semaphore bounds
+    # how many are in flight and lets batches fill up when batching is enabled
+    calls = []
+    for model_name in models:
+        judge_model = get_model(model_name)
+        batcher = JudgeBatcher(judge_model, BATCH_SIZE) if BATCH_SIZE > 1 else None
+        for run in range(num_runs):
+            for sample in samples:
+                calls.append(
+                    judge_with_cache(model_name, judge_model, sample, run, cache, semaphore, batcher)
+                )
+    results = await asyncio.gather(*calls)
+    print(f"Judge cache: {cache.hits} hits, {cache.misses} new calls")
+
+    reports = []
+    per_model = num_runs * len(samples)
+    for model_index, model_name in enumerate(models):
+        model_results = results[model_index * per_model : (model_index + 1) * per_model]
+        runs = [
+            model_results[run * len(samples) : (run + 1) * len(samples)]
+            for run in range(num_runs)
+        ]
+        if verbose:
+            print(f"\n### {model_name}")
+        report = summarise_model(model_name, samples, runs, tolerance, verbose)
+        print_summary(report)
+        reports.append(report)
+
+    if len(reports) > 1:
+        print("\n" + "=" * 60)
+        print("COMPARISON")
+        print("=" * 60)
+        for report in sorted(reports, key=lambda r: -r["agreement_rate"]):
+            mae = mean(report["mae"].values())
+            print(f"  {report['model']}: {report['agreement_rate']:.1f}% agreement, mean MAE {mae:.3f}")
+
+    return reports
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    ap.add_argument("--models", nargs="+", default=None,
+                    help="Judge models to compare (default: ARCHITECTURE_JUDGE_MODEL)")
+    ap.add_argument("--runs", type=int, default=NUM_RUNS, help="Judge runs per sample")
+    ap.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Maximum judge calls in flight")
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE, help="Per-dimension agreement tolerance")
+    ap.add_argument("--cache", default=str(CACHE_FILE), help="Judge result cache (JSONL)")
+    ap.add_argument("--no-cache", action="store_true", help="Don't read or write the judge cache")
+    ap.add_argument("--json-out", default=None, help="Write the full report as JSON")
+    ap.add_argument("--csv-out", default=None, help="Write one summary row per model as CSV")
+    ap.add_argument("--quiet", action="store_true", help="Only print the summaries")
+    args = ap.parse_args()
+
+    reports = asyncio.run(
+        measure_agreement(
+            models=args.models,
+            num_runs=args.runs,
+            concurrency=args.concurrency,
+            tolerance=args.tolerance,
+            cache_path=None if args.no_cache else Path(args.cache),
+            verbose=not args.quiet,
+        )
+    )
+
+    if args.json_out:
+        write_json_report(reports, args.json_out)
+    if args.csv_out:
+        write_csv_report(reports, args.csv_out)
 
-    return agreement_rate >= 80
+    return all(report["passed"] for report in reports)
 
 
 if __name__ == "__main__":
-    success = asyncio.run(measure_agreement())
+    success = main()
     sys.exit(0 if success else 1)
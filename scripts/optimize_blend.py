@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+optimize_blend.py — Fit the LLM judge blend weight and score modifiers.
+
+llm_judge_scorer blends judge and deterministic (keyword) scores, then applies
+the anti-gaming and structural-validation modifiers in ScoreModifiers. None of
+those steps need the judge again once its raw scores are known, so this script
+loads, per sample, the judge scores, deterministic scores, anti-gaming signals
+and validation outcome into NumPy arrays and evaluates a whole grid of settings
+at once with broadcasting.
+
+Inputs
+------
+- Calibration set (has ground truth): judge scores come from the
+  measure_judge_agreement.py cache, so run that first for --judge-model. The
+  deterministic scores, signals and validation are recomputed locally.
+- --log-dir (optional, no ground truth): llm_judge scores recorded by past runs.
+  Used to report how far the best settings would move published scores.
+
+Usage
+-----
+uv run python scripts/measure_judge_agreement.py --models openai/gpt-4o-mini
+uv run python scripts/optimize_blend.py --judge-model openai/gpt-4o-mini \
+        --log-dir logs/ --json-out results/blend_settings.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from evals.architecture_design.tasks import (
+    DEFAULT_BLEND_DETERMINISTIC,
+    DEFAULT_JUDGE_BATCH_SIZE,
+    DEFAULT_JUDGE_MODEL,
+    DEFAULT_JUDGE_PROMPT_LAYOUT,
+    DEFAULT_SCORE_MODIFIERS,
+    MAX_CRITERIA_FACTOR,
+    ScoreModifiers,
+    _anti_gaming_signals,
+    _apply_deterministic_checks,
+    _apply_validation_modifier,
+)
+from evals.architecture_design.diagram_validators import validate_structured_output
+from evals.architecture_design.judge_calibration import (
+    CACHE_FILE,
+    DIMENSIONS,
+    NUM_RUNS,
+    TOLERANCE,
+    JudgeCache,
+    judge_mode,
+    load_calibration_data,
+)
+from evals.architecture_design.judge_prompts import format_rubric_prompt
+from evals.architecture_design.response_analysis import ResponseAnalysis
+
+# Candidate values per setting; the search covers their full Cartesian product
+GRID = {
+    "blend_deterministic": np.round(np.arange(0.0, 1.0001, 0.05), 2),
+    "hidden_criteria_bonus": np.array([0.0, 0.05, 0.1, 0.15, 0.2]),
+    "short_response_factor": np.array([0.6, 0.7, 0.8, 0.9, 1.0]),
+    "repetitive_response_factor": np.array([0.7, 0.8, 0.9, 1.0]),
+    "validation_bonus": np.array([0.0, 0.025, 0.05, 0.1]),
+    "validation_penalty": np.array([0.0, 0.1, 0.2, 0.3]),
+    "missing_components_penalty": np.array([0.0, 0.05, 0.1, 0.2]),
+}
+CHUNK_SIZE = 20_000  # Configurations evaluated per broadcast
+
+
+@dataclass
+class ScoringInputs:
+    """Per-sample inputs to the blend/modifier stage, one row per sample."""
+
+    ids: list
+    judge: np.ndarray  # (N, 3) raw judge accuracy/completeness/quality
+    deterministic: np.ndarray  # (N, 3) keyword scores
+    criteria_ratio: np.ndarray  # (N,) fraction of hidden criteria met
+    short: np.ndarray  # (N,) bool
+    repetitive: np.ndarray  # (N,) bool
+    validated: np.ndarray  # (N,) bool, structural validation applied
+    valid: np.ndarray  # (N,) bool
+    missing_ratio: np.ndarray  # (N,) fraction of expected components missing
+    ground_truth: np.ndarray | None = None  # (N, 3)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _build_inputs(rows, with_ground_truth):
+    """Stack per-sample dicts into a ScoringInputs."""
+    return ScoringInputs(
+        ids=[row["id"] for row in rows],
+        judge=np.array([row["judge"] for row in rows], dtype=float).reshape(-1, 3),
+        deterministic=np.array([row["deterministic"] for row in rows], dtype=float).reshape(-1, 3),
+        criteria_ratio=np.array([row["signals"]["criteria_ratio"] for row in rows], dtype=float),
+        short=np.array([row["signals"]["short"] for row in rows], dtype=bool),
+        repetitive=np.array([row["signals"]["repetitive"] for row in rows], dtype=bool),
+        validated=np.array([row["validated"] for row in rows], dtype=bool),
+        valid=np.array([row["valid"] for row in rows], dtype=bool),
+        missing_ratio=np.array([row["missing_ratio"] for row in rows], dtype=float),
+        ground_truth=(
+            np.array([row["ground_truth"] for row in rows], dtype=float).reshape(-1, 3)
+            if with_ground_truth
+            else None
+        ),
+    )
+
+
+def _validation_fields(validation):
+    """Extract (validated, valid, missing_ratio) from validation metadata."""
+    if not validation or not validation.get("validation_attempted"):
+        return False, False, 0.0
+    check = validation.get("components_check") or {}
+    return True, bool(validation.get("validation_passed")), float(check.get("missing_ratio", 0.0))
+
+
+def load_calibration_inputs(judge_model, cache_path=CACHE_FILE, max_runs=NUM_RUNS):
+    """Build inputs for the calibration set from cached judge results."""
+    cache = JudgeCache(cache_path)
+    mode = judge_mode(DEFAULT_JUDGE_BATCH_SIZE, DEFAULT_JUDGE_PROMPT_LAYOUT)
+    rows = []
+    for sample in load_calibration_data():
+        rubric_prompt = format_rubric_prompt(
+            sample["type"], sample["subtype"], sample["model_response"], sample
+        )
+        if not rubric_prompt:
+            continue
+        results = [
+            cache.entries[key]
+            for key in (
+                JudgeCache.key(judge_model, rubric_prompt, run, mode) for run in range(max_runs)
+            )
+            if key in cache.entries
+        ]
+        if not results:
+            continue
+
+        analysis = ResponseAnalysis(sample["model_response"])
+        subtype = sample["subtype"]
+        validation = {}
+        output_format = sample.get("output_format")
+        if sample["type"] == "diagram_creation" and output_format:
+            expected = sample.get("expected_components") or None
+            _, validation = _apply_validation_modifier(
+                {dim: 0.0 for dim in DIMENSIONS},
+                validate_structured_output(analysis, output_format),
+                format_required=True,
+                expected_components=expected,
+            )
+        validated, valid, missing_ratio = _validation_fields(validation)
+        rows.append({
+            "id": sample["id"],
+            "judge": [np.mean([float(r.get(dim, 0.5)) for r in results]) for dim in DIMENSIONS],
+            "deterministic": list(_apply_deterministic_checks(analysis, sample, subtype)),
+            "signals": _anti_gaming_signals(analysis, subtype),
+            "validated": validated,
+            "valid": valid,
+            "missing_ratio": missing_ratio,
+            "ground_truth": [sample["ground_truth"][dim] for dim in DIMENSIONS],
+        })
+    return _build_inputs(rows, with_ground_truth=True)
+
+
+def load_log_inputs(log_dir):
+    """Build inputs from llm_judge scores recorded in past eval logs."""
+    from inspect_ai.log import list_eval_logs, read_eval_log_sample_summaries
+
+    rows = []
+    for log in list_eval_logs(str(log_dir)):
+        for summary in read_eval_log_sample_summaries(log.name):
+            for score in (summary.scores or {}).values():
+                meta = score.metadata or {}
+                if meta.get("scorer") != "llm_judge" or "judge_scores" not in meta:
+                    continue
+                validated, valid, missing_ratio = _validation_fields(meta.get("validation"))
+                rows.append({
+                    "id": f"{Path(log.name).name}:{summary.id}:{summary.epoch}",
+                    "judge": [meta["judge_scores"][dim] for dim in DIMENSIONS],
+                    "deterministic": [meta["deterministic_scores"][dim] for dim in DIMENSIONS],
+                    "signals": meta["anti_gaming_signals"],
+                    "validated": validated,
+                    "valid": valid,
+                    "missing_ratio": missing_ratio,
+                })
+    return _build_inputs(rows, with_ground_truth=False)
+
+
+def expand_grid(grid=GRID):
+    """Return the Cartesian product of the grid as one (P,) array per setting."""
+    names = list(grid)
+    mesh = np.meshgrid(*(grid[name] for name in names), indexing="ij")
+    return {name: values.ravel() for name, values in zip(names, mesh)}
+
+
+def settings_grid(blend_deterministic, modifiers):
+    """A one-configuration grid for a fixed blend weight and ScoreModifiers."""
+    settings = {"blend_deterministic": blend_deterministic, **asdict(modifiers)}
+    return {name: np.array([value], dtype=float) for name, value in settings.items()}
+
+
+def apply_settings(inputs, grid):
+    """Final scores for every configuration and sample, shape (P, N, 3).
+
+    Mirrors llm_judge_scorer: blend, anti-gaming factor, validation modifier,
+    then clamp to [0, 1].
+    """
+    def column(name):
+        return np.asarray(grid[name], dtype=float)[:, None]
+
+    weight = column("blend_deterministic")[..., None]
+    scores = (1.0 - weight) * inputs.judge[None] + weight * inputs.deterministic[None]
+
+    bonus = 1.0 + column("hidden_criteria_bonus") * inputs.criteria_ratio[None]
+    factor = np.minimum(MAX_CRITERIA_FACTOR, bonus)
+    factor = factor * np.where(inputs.short[None], column("short_response_factor"), 1.0)
+    factor = factor * np.where(inputs.repetitive[None], column("repetitive_response_factor"), 1.0)
+    scores = scores * np.minimum(1.0, factor)[..., None]
+
+    valid = (inputs.validated & inputs.valid)[None]
+    invalid = (inputs.validated & ~inputs.valid)[None]
+    quality = scores[..., 2]
+    scores[..., 2] = np.where(
+        valid, np.minimum(1.0, quality * (1.0 + column("validation_bonus"))), quality
+    )
+    multiplier = np.where(
+        valid,
+        1.0 - column("missing_components_penalty") * inputs.missing_ratio[None],
+        np.where(invalid, 1.0 - column("validation_penalty"), 1.0),
+    )
+    scores = scores * multiplier[..., None]
+
+    return np.clip(scores, 0.0, 1.0)
+
+
+def agreement_metrics(scores, ground_truth, tolerance=TOLERANCE):
+    """Agreement rate (%), overall MAE and per-dimension MAE for each configuration."""
+    errors = np.abs(scores - ground_truth[None])
+    return {
+        "agreement_rate": (errors <= tolerance).all(axis=2).mean(axis=1) * 100,
+        "mae": errors.mean(axis=(1, 2)),
+        "mae_by_dimension": errors.mean(axis=1),
+    }
+
+
+def search(inputs, grid=GRID, tolerance=TOLERANCE, top=5, current=None):
+    """Evaluate every grid configuration; return the best ``top``.
+
+    Ranked by agreement, then MAE, then (when ``current`` settings are given)
+    closeness to them, so settings the calibration set can't distinguish are
+    left where they are.
+    """
+    configs = expand_grid(grid)
+    count = len(next(iter(configs.values())))
+    distance = np.zeros(count)
+    if current is not None:
+        for name, values in configs.items():
+            span = np.ptp(grid[name]) or 1.0
+            distance += np.abs(values - float(current[name][0])) / span
+    agreement = np.empty(count)
+    mae = np.empty(count)
+    for start in range(0, count, CHUNK_SIZE):
+        chunk = {name: values[start : start + CHUNK_SIZE] for name, values in configs.items()}
+        metrics = agreement_metrics(apply_settings(inputs, chunk), inputs.ground_truth, tolerance)
+        agreement[start : start + CHUNK_SIZE] = metrics["agreement_rate"]
+        mae[start : start + CHUNK_SIZE] = metrics["mae"]
+
+    # Highest agreement first, ties broken by lowest MAE, then by distance
+    order = np.lexsort((distance, mae, -agreement))[:top]
+    return count, [
+        {
+            "settings": {name: float(values[i]) for name, values in configs.items()},
+            "agreement_rate": float(agreement[i]),
+            "mae": float(mae[i]),
+        }
+        for i in order
+    ]
+
+
+def describe(inputs, grid, tolerance=TOLERANCE):
+    """Metrics for a single-configuration grid."""
+    metrics = agreement_metrics(apply_settings(inputs, grid), inputs.ground_truth, tolerance)
+    return {
+        "agreement_rate": float(metrics["agreement_rate"][0]),
+        "mae": float(metrics["mae"][0]),
+        "mae_by_dimension": dict(zip(DIMENSIONS, metrics["mae_by_dimension"][0].tolist())),
+    }
+
+
+def score_shift(inputs, current, best):
+    """Mean and max change in overall score between two single-configuration grids."""
+    before = apply_settings(inputs, current)[0].mean(axis=1)
+    after = apply_settings(inputs, best)[0].mean(axis=1)
+    delta = after - before
+    return {
+        "samples": len(inputs),
+        "mean_before": float(before.mean()),
+        "mean_after": float(after.mean()),
+        "mean_shift": float(delta.mean()),
+        "max_abs_shift": float(np.abs(delta).max()),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Fit the judge blend weight and score modifiers.")
+    ap.add_argument("--judge-model", default=DEFAULT_JUDGE_MODEL,
+                    help="Judge model whose cached calibration results to use")
+    ap.add_argument("--cache", default=str(CACHE_FILE), help="Judge result cache (JSONL)")
+    ap.add_argument("--runs", type=int, default=NUM_RUNS, help="Cached judge runs to average per sample")
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE, help="Per-dimension agreement tolerance")
+    ap.add_argument("--log-dir", default=None, help="Past eval logs to measure the score shift on")
+    ap.add_argument("--top", type=int, default=5, help="Number of best configurations to report")
+    ap.add_argument("--json-out", default=None, help="Write the best settings and metrics as JSON")
+    args = ap.parse_args()
+
+    calibration = load_calibration_inputs(args.judge_model, Path(args.cache), args.runs)
+    if not len(calibration):
+        print(f"No cached judge results for {args.judge_model} in {args.cache}.")
+        print("Run scripts/measure_judge_agreement.py for this model first.")
+        sys.exit(1)
+    print(f"Calibration samples with cached judge scores: {len(calibration)}")
+
+    current = settings_grid(DEFAULT_BLEND_DETERMINISTIC, DEFAULT_SCORE_MODIFIERS)
+    current_metrics = describe(calibration, current, args.tolerance)
+
+    started = time.perf_counter()
+    count, best = search(calibration, tolerance=args.tolerance, top=args.top, current=current)
+    elapsed = time.perf_counter() - started
+    print(f"Evaluated {count:,} configurations in {elapsed:.2f}s ({elapsed / count * 1e6:.1f}µs each)")
+
+    print(f"\nCurrent: {current_metrics['agreement_rate']:.1f}% agreement, MAE {current_metrics['mae']:.3f}")
+    print(f"\nTop {len(best)} configurations:")
+    for rank, entry in enumerate(best, 1):
+        settings = ", ".join(f"{k}={v:g}" for k, v in entry["settings"].items())
+        print(f"  {rank}. {entry['agreement_rate']:.1f}% agreement, MAE {entry['mae']:.3f}  [{settings}]")
+
+    best_settings = best[0]["settings"]
+    best_grid = {name: np.array([value]) for name, value in best_settings.items()}
+    output = {
+        "judge_model": args.judge_model,
+        "tolerance": args.tolerance,
+        "calibration_samples": len(calibration),
+        "configurations_evaluated": count,
+        "current": {
+            "settings": {name: float(values[0]) for name, values in current.items()},
+            **current_metrics,
+        },
+        "best": {"settings": best_settings, **describe(calibration, best_grid, args.tolerance)},
+        "top": best,
+    }
+
+    if args.log_dir:
+        logged = load_log_inputs(args.log_dir)
+        if len(logged):
+            output["log_shift"] = score_shift(logged, current, best_grid)
+            shift = output["log_shift"]
+            print(f"\nScore shift on {shift['samples']} logged samples: "
+                  f"mean {shift['mean_shift']:+.3f}, max |Δ| {shift['max_abs_shift']:.3f}")
+        else:
+            print(f"\nNo llm_judge samples with raw scores found under {args.log_dir}")
+
+    modifier_names = {field.name for field in fields(ScoreModifiers)}
+    modifiers = ScoreModifiers(**{k: v for k, v in best_settings.items() if k in modifier_names})
+    print("\nApply with:")
+    print(f"  llm_judge_scorer(blend_deterministic={best_settings['blend_deterministic']:g}, "
+          f"modifiers={modifiers!r})")
+
+    if args.json_out:
+        Path(args.json_out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.json_out, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"JSON settings → {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
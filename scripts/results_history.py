@@ -0,0 +1,330 @@
+#!/usr/bin/env -S uv run --script
+#
+# /// script
+# requires-python = ">=3.9"
+# dependencies = [
+#   "pandas>=2.2",
+# ]
+# ///
+"""
+results_history.py — Longitudinal store of results across nightly runs.
+
+Each nightly overwrites results/leaderboard.json. The history keeps every
+run: item-level results (one row per scored sample) and per-run scores (one
+row per run, model and task, plus each model's weighted "overall"). It is
+fed by aggregate_multi.py --history from the score index, with only the logs
+the history hasn't seen yet, so adding a night costs O(new logs).
+
+Layout (under the history directory, default results/history):
+
+    logs.txt                   Logs already appended, one path and version per line
+    segments/NNNNNN-items.*    Appended batches, not yet compacted
+    segments/NNNNNN-scores.*
+    items/month=YYYY-MM.*      Compacted partitions, by the month logs were created
+    scores/month=YYYY-MM.*
+    runs/run=<run>.*           Each run's per-log score sums and sample counts
+
+Tables are Parquet if pyarrow is installed, else gzipped CSV. Appends add
+segment files and rewrite the per-log sums of the runs they touch, which are
+then rescored from those sums alone. compact() (run automatically once
+COMPACT_AFTER segments pile up) merges segments into the monthly partitions.
+The latest score row for a (run, model, task) wins, so a run whose logs
+arrive over several appends ends up scored on all of them. A log appended
+again (re-run or grown at the same path) replaces its earlier results.
+
+Usage
+-----
+python scripts/results_history.py trend --task cdk_synth
+python scripts/results_history.py regressions --days 7 --threshold 0.03
+python scripts/results_history.py compact
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+from datetime import timedelta
+from typing import Dict, Iterable, List, Mapping, Optional
+from urllib.parse import quote
+
+import pandas as pd  # type: ignore
+
+from task_registry import TASKS
+
+DEFAULT_HISTORY = pathlib.Path(__file__).parent.parent / "results" / "history"
+COMPACT_AFTER = 8  # Segments (appends) before they are merged into partitions
+
+ITEM_COLUMNS = ["run", "created", "log", "model", "task", "sample_id", "epoch", "value"]
+SCORE_COLUMNS = ["run", "created", "model", "task", "score", "samples"]
+PARTIAL_COLUMNS = ["run", "created", "log", "model", "task", "sum", "samples"]
+TABLE_KEYS = {"items": ["log", "sample_id", "epoch"], "scores": ["run", "model", "task"]}
+OVERALL = "overall"
+
+
+def log_partials(items: pd.DataFrame) -> pd.DataFrame:
+    """Sum and count of the item scores of every log, with its run, model, task and creation time."""
+    partials = items.groupby(["run", "log", "model", "task"]).agg(
+        created=("created", "min"), sum=("value", "sum"), samples=("value", "size")
+    )
+    return partials.reset_index()[PARTIAL_COLUMNS]
+
+
+def run_scores(items: pd.DataFrame, weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """Score of every (run, model, task), and each run's weighted overall per model.
+
+    Task scores are computed as on the leaderboard: each log's accuracy, averaged
+    over duplicate logs. Tasks a model has no logs for count as 0 towards its overall.
+    """
+    return partial_scores(log_partials(items), weights)
+
+
+def partial_scores(partials: pd.DataFrame, weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """run_scores from the per-log sums of log_partials."""
+    weights = weights if weights is not None else {t: cfg["weight"] for t, cfg in TASKS.items()}
+    runs = partials.groupby("run")["created"].min()
+    per_log = partials.set_index(["run", "model", "task", "log"])
+    per_log = per_log.assign(mean=(per_log["sum"] / per_log["samples"]).round(4))
+    cells = per_log.groupby(level=["run", "model", "task"]).agg(score=("mean", "mean"), samples=("samples", "sum"))
+
+    table = cells["score"].unstack("task").reindex(columns=list(weights)).fillna(0)
+    overall = (table @ pd.Series(weights)).round(4).rename("score").to_frame()
+    overall["samples"] = cells["samples"].groupby(level=["run", "model"]).sum()
+    overall["task"] = OVERALL
+    overall = overall.set_index("task", append=True)
+
+    scores = pd.concat([cells, overall]).reset_index()
+    scores["created"] = scores["run"].map(runs)
+    return scores[SCORE_COLUMNS].sort_values(["created", "run", "model", "task"], ignore_index=True)
+
+
+def _write_table(frame: pd.DataFrame, base: pathlib.Path) -> pathlib.Path:
+    """Write frame to base.parquet, or base.csv.gz without pyarrow, atomically."""
+    base.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        import pyarrow  # type: ignore  # noqa: F401
+
+        path = base.with_name(base.name + ".parquet")
+        tmp = path.with_name(path.name + ".tmp")
+        frame.to_parquet(tmp, index=False)
+    except ImportError:
+        path = base.with_name(base.name + ".csv.gz")
+        tmp = path.with_name(path.name + ".tmp")
+        frame.to_csv(tmp, index=False, compression="gzip")
+    os.replace(tmp, path)
+    return path
+
+
+def _read_table(path: pathlib.Path) -> pd.DataFrame:
+    if path.name.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, dtype={"sample_id": str, "run": str, "created": str})
+
+
+def _tables(directory: pathlib.Path, pattern: str) -> List[pathlib.Path]:
+    return sorted(p for p in directory.glob(pattern) if not p.name.endswith(".tmp"))
+
+
+def _month(created: pd.Series) -> pd.Series:
+    """Partition month (YYYY-MM) of ISO creation times; "unknown" without one."""
+    return created.fillna("").astype(str).str.slice(0, 7).replace("", "unknown")
+
+
+class ResultsHistory:
+    """Append-only history of item results and per-run scores, compacted by month."""
+
+    def __init__(self, root: str | os.PathLike = DEFAULT_HISTORY):
+        self.root = pathlib.Path(root)
+
+    @property
+    def _log_list(self) -> pathlib.Path:
+        return self.root / "logs.txt"
+
+    def logs(self) -> Dict[str, str]:
+        """Version of each log already appended, by path ("" if not recorded)."""
+        if not self._log_list.exists():
+            return {}
+        lines = (line.partition("\t") for line in self._log_list.read_text().splitlines())
+        return {path: digest for path, _, digest in lines}
+
+    def new_logs(self, versions: Mapping[str, str]) -> List[str]:
+        """The logs ({path: version}, see ScoreIndex.log_versions) not appended at that version yet."""
+        seen = self.logs()
+        return [path for path, digest in versions.items() if seen.get(path) != digest]
+
+    def segments(self) -> List[pathlib.Path]:
+        return _tables(self.root / "segments", "*")
+
+    def append(
+        self,
+        samples: pd.DataFrame,
+        weights: Optional[Dict[str, float]] = None,
+        versions: Optional[Mapping[str, str]] = None,
+    ) -> int:
+        """Append the samples of new logs (a sample table) and rescore the runs they belong to.
+
+        ``versions`` has the version of each log (see new_logs). Every log
+        must come with all its samples; they replace the log's earlier ones.
+        Returns the number of item rows appended.
+        """
+        if samples.empty:
+            return 0
+        items = samples[ITEM_COLUMNS].copy()
+        items["sample_id"] = items["sample_id"].astype(str)
+        seq = 1 + max((int(p.name.split("-")[0]) for p in self.segments()), default=0)
+        _write_table(items, self.root / "segments" / f"{seq:06d}-items")
+
+        # Rescore the touched runs from their per-log sums, without reading items
+        runs = []
+        for run, partials in log_partials(items).groupby("run"):
+            runs.append(self._update_run(str(run), partials))
+        scores = partial_scores(pd.concat(runs, ignore_index=True), weights)
+        _write_table(scores, self.root / "segments" / f"{seq:06d}-scores")
+
+        versions = versions or {}
+        with open(self._log_list, "a") as f:
+            f.writelines(f"{log}\t{versions.get(log, '')}\n" for log in items["log"].unique())
+
+        if seq >= COMPACT_AFTER:
+            self.compact()
+        return len(items)
+
+    def _update_run(self, run: str, partials: pd.DataFrame) -> pd.DataFrame:
+        """Replace the per-log sums of the given logs of a run; returns all of the run's."""
+        base = self.root / "runs" / f"run={quote(run, safe='')}"
+        existing = _tables(base.parent, f"{base.name}.*")
+        if existing:
+            previous = _read_table(existing[0])
+            partials = pd.concat([previous[~previous["log"].isin(set(partials["log"]))], partials], ignore_index=True)
+        written = _write_table(partials[PARTIAL_COLUMNS], base)
+        for path in existing:
+            if path != written:
+                path.unlink()
+        return partials
+
+    def _load(self, table: str, months: Optional[set[str]] = None) -> pd.DataFrame:
+        columns = ITEM_COLUMNS if table == "items" else SCORE_COLUMNS
+        parts = [
+            _read_table(p)
+            for p in _tables(self.root / table, "month=*")
+            if months is None or p.name.split(".")[0][len("month="):] in months
+        ]
+        parts += [_read_table(p) for p in self.segments() if p.name.split(".")[0].endswith(f"-{table}")]
+        parts = [p for p in parts if not p.empty]
+        if not parts:
+            return pd.DataFrame(columns=columns)
+        frame = pd.concat(parts, ignore_index=True)[columns]
+        # Later rows (newer segments) win over earlier ones for the same key
+        return frame.drop_duplicates(TABLE_KEYS[table], keep="last", ignore_index=True)
+
+    def items(self, runs: Optional[Iterable[str]] = None, since: Optional[str] = None) -> pd.DataFrame:
+        """Item-level results, optionally of some runs or of runs created on or after since."""
+        items = self._load("items", _months_since(self.root / "items", since))
+        if runs is not None:
+            items = items[items["run"].isin(set(runs))]
+        if since is not None:
+            items = items[items["run"].map(items.groupby("run")["created"].min()) >= since]
+        return items.reset_index(drop=True)
+
+    def scores(self, since: Optional[str] = None) -> pd.DataFrame:
+        """Per-run scores (task and overall), oldest run first."""
+        scores = self._load("scores", _months_since(self.root / "scores", since))
+        if since is not None:
+            scores = scores[scores["created"] >= since]
+        return scores.sort_values(["created", "run", "model", "task"], ignore_index=True)
+
+    def compact(self) -> int:
+        """Merge all segments into the monthly partitions; returns the segments merged."""
+        segments = self.segments()
+        if not segments:
+            return 0
+        for table in TABLE_KEYS:
+            new = [_read_table(p) for p in segments if p.name.split(".")[0].endswith(f"-{table}")]
+            new = [n for n in new if not n.empty]
+            if not new:
+                continue
+            batch = pd.concat(new, ignore_index=True)
+            for month, rows in batch.groupby(_month(batch["created"])):
+                existing = _tables(self.root / table, f"month={month}.*")
+                merged = pd.concat([*(_read_table(p) for p in existing), rows], ignore_index=True)
+                merged = merged.drop_duplicates(TABLE_KEYS[table], keep="last", ignore_index=True)
+                written = _write_table(merged, self.root / table / f"month={month}")
+                for path in existing:
+                    if path != written:
+                        path.unlink()
+        for path in segments:
+            path.unlink()
+        return len(segments)
+
+    def trend(self, task: str = OVERALL, models: Optional[List[str]] = None) -> pd.DataFrame:
+        """Scores on one task (default: overall), one row per run in date order, one column per model."""
+        scores = self.scores()
+        scores = scores[scores["task"] == task]
+        if models is not None:
+            scores = scores[scores["model"].isin(models)]
+        order = scores.groupby("run")["created"].min().sort_values().index
+        return scores.pivot_table(index="run", columns="model", values="score").reindex(order)
+
+    def regressions(self, threshold: float = 0.03, days: int = 7, task: Optional[str] = None) -> pd.DataFrame:
+        """Models whose latest score dropped more than ``threshold`` since ``days`` ago.
+
+        Each (model, task)'s latest run is compared to its most recent run
+        created at least ``days`` before it. Returns one row per drop, largest
+        first, with both runs, both scores and the change.
+        """
+        scores = self.scores()
+        if task is not None:
+            scores = scores[scores["task"] == task]
+        columns = ["model", "task", "baseline_run", "baseline_score", "run", "score", "change"]
+        if scores.empty:
+            return pd.DataFrame(columns=columns)
+        scores = scores.assign(when=pd.to_datetime(scores["created"], utc=True, format="ISO8601"))
+        latest = scores.sort_values("when").groupby(["model", "task"]).tail(1)
+        latest = latest.assign(cutoff=latest["when"] - timedelta(days=days)).sort_values("cutoff")
+        baseline = scores.rename(columns={"run": "baseline_run", "score": "baseline_score", "when": "baseline_when"})
+        paired = pd.merge_asof(
+            latest,
+            baseline[["model", "task", "baseline_run", "baseline_score", "baseline_when"]].sort_values("baseline_when"),
+            left_on="cutoff",
+            right_on="baseline_when",
+            by=["model", "task"],
+            direction="backward",
+        ).dropna(subset=["baseline_run"])
+        paired["change"] = (paired["score"] - paired["baseline_score"]).round(4)
+        drops = paired[paired["change"] < -threshold]
+        return drops.sort_values("change", ignore_index=True)[columns]
+
+
+def _months_since(directory: pathlib.Path, since: Optional[str]) -> Optional[set[str]]:
+    """Partitions that can hold runs created on or after since (None: all of them)."""
+    if since is None:
+        return None
+    months = {p.name.split(".")[0][len("month="):] for p in _tables(directory, "month=*")}
+    return {m for m in months if m == "unknown" or m >= since[:7]}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Query the results history")
+    ap.add_argument("--history", default=str(DEFAULT_HISTORY))
+    sub = ap.add_subparsers(dest="command", required=True)
+    trend = sub.add_parser("trend", help="Score per run for each model")
+    trend.add_argument("--task", default=OVERALL)
+    regressions = sub.add_parser("regressions", help="Models whose score dropped since an earlier run")
+    regressions.add_argument("--threshold", type=float, default=0.03, help="Drop in score (0.03 = 3 points)")
+    regressions.add_argument("--days", type=int, default=7, help="Compare with the latest run this many days earlier")
+    regressions.add_argument("--task", default=None)
+    sub.add_parser("compact", help="Merge appended segments into monthly partitions")
+    args = ap.parse_args()
+
+    history = ResultsHistory(args.history)
+    if args.command == "trend":
+        print(history.trend(args.task).to_string())
+    elif args.command == "regressions":
+        drops = history.regressions(args.threshold, args.days, args.task)
+        print(drops.to_string(index=False) if not drops.empty else "No regressions")
+    else:
+        print(f"Compacted {history.compact()} segments into {history.root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+score_cube.py — Pre-aggregated scores by item metadata dimension.
+
+The leaderboard has one number per model and task. The cube holds, for every
+(model, task, dimension value), the sum and count of sample scores. The
+dimensions are the item's difficulty, domains, AWS services (canonical ids),
+skill and subtype. A sample counts once towards each of its values of a list
+dimension (domains, services). Any slice's score is then sum / count, and
+slices can be pooled by adding sums and counts, with no logs or per-sample
+data needed.
+
+The cube is stored as compact JSON: model, task and dimension value names
+are listed once, and each dimension's cells are parallel arrays of indexes,
+sums and counts.
+
+Usage
+-----
+python scripts/score_cube.py results/score_cube.json --dimension difficulty --task cdk_synth
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+from typing import Any, Dict, Optional
+
+import pandas as pd  # type: ignore
+
+# Cube dimension -> sample table column (see score_index.SAMPLE_COLUMNS)
+DIMENSIONS = {
+    "difficulty": "difficulty",
+    "domains": "domains",
+    "aws_services": "services",
+    "skill": "skill",
+    "subtype": "subtype",
+}
+LIST_DIMENSIONS = {"domains", "aws_services"}
+
+
+def build_score_cube(samples: pd.DataFrame) -> Dict[str, Any]:
+    """Sum and count of sample scores per (model, task, value) of every dimension."""
+    models = sorted(samples["model"].unique())
+    tasks = sorted(samples["task"].unique())
+    cube: Dict[str, Any] = {"models": models, "tasks": tasks, "dimensions": {}}
+    for dimension, column in DIMENSIONS.items():
+        cells = samples[["model", "task", column, "value"]]
+        if dimension in LIST_DIMENSIONS:
+            cells = cells.explode(column)
+        cells = cells.dropna(subset=[column])
+        grouped = cells.groupby(["model", "task", column])["value"].agg(["sum", "count"]).reset_index()
+        values = sorted(grouped[column].unique())
+        cube["dimensions"][dimension] = {
+            "values": values,
+            "model": pd.Categorical(grouped["model"], categories=models).codes.tolist(),
+            "task": pd.Categorical(grouped["task"], categories=tasks).codes.tolist(),
+            "value": pd.Categorical(grouped[column], categories=values).codes.tolist(),
+            "sum": grouped["sum"].round(4).tolist(),
+            "count": grouped["count"].tolist(),
+        }
+    return cube
+
+
+def write_score_cube(cube: Dict[str, Any], path: str) -> None:
+    out = pathlib.Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(cube, separators=(",", ":")))
+
+
+def cube_frame(cube: Dict[str, Any], dimension: str) -> pd.DataFrame:
+    """One dimension of a cube as a table: model, task, value, sum, count and score."""
+    cells = cube["dimensions"][dimension]
+    frame = pd.DataFrame({
+        "model": pd.Categorical.from_codes(cells["model"], categories=cube["models"]),
+        "task": pd.Categorical.from_codes(cells["task"], categories=cube["tasks"]),
+        "value": pd.Categorical.from_codes(cells["value"], categories=cells["values"]),
+        "sum": cells["sum"],
+        "count": cells["count"],
+    })
+    frame["score"] = (frame["sum"] / frame["count"]).round(4)
+    return frame
+
+
+def slice_cube(cube: Dict[str, Any], dimension: str, task: Optional[str] = None) -> pd.DataFrame:
+    """Scores of every model (rows) by dimension value (columns), for one task or pooled over all."""
+    frame = cube_frame(cube, dimension)
+    if task is not None:
+        frame = frame[frame["task"] == task]
+    pooled = frame.groupby(["model", "value"], observed=True)[["sum", "count"]].sum()
+    return (pooled["sum"] / pooled["count"]).round(4).unstack("value")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Show one slice of a score cube")
+    ap.add_argument("cube", help="Score cube JSON written by aggregate_multi.py --cube-out")
+    ap.add_argument("--dimension", default="difficulty", choices=list(DIMENSIONS))
+    ap.add_argument("--task", default=None, help="Only this task (default: pooled over all tasks)")
+    args = ap.parse_args()
+
+    cube = json.loads(pathlib.Path(args.cube).read_text())
+    covered = {cube["tasks"][i] for i in cube["dimensions"][args.dimension]["task"]}
+    missing = [t for t in cube["tasks"] if t not in covered and args.task in (None, t)]
+    if missing:
+        print(f"[warn] No {args.dimension} values for {', '.join(missing)}; its samples are left out")
+    print(slice_cube(cube, args.dimension, args.task).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+score_index.py — Persistent per-sample score index for aggregate_multi.py.
+
+Rebuilding the leaderboard used to re-read every log under --log-dir. The index
+is a SQLite file holding, per log, its path, size, mtime and content hash, the
+task, model, run and creation time read from it, and one row per scored sample
+(normalized value and item metadata). On each rebuild every log is stat-ed,
+and only logs the index hasn't seen are parsed:
+
+- same path, size and mtime: skipped without opening the file
+- same path, other size: parsed without hashing (the content changed)
+- same content hash (touched, or moved from a path that no longer exists):
+  relinked without parsing
+- anything else: parsed, replacing earlier rows for that path
+
+So a changed log is read once, by the parser; only new paths and logs whose
+mtime alone changed are hashed first.
+
+A run is the directory its logs were written to (e.g. logs/nightly-20261001-020000),
+ordered by its earliest log's creation time.
+
+ScoreIndex.sample_table returns the selected logs' samples as one table with
+SAMPLE_COLUMNS, the same table aggregate_multi.collect_samples builds from
+the logs directly.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Sized, Tuple
+
+import pandas as pd  # type: ignore
+
+INDEX_VERSION = 3
+DEFAULT_INDEX = pathlib.Path(__file__).parent.parent / ".score_cache" / "scores.sqlite"
+
+# Item fields scores are broken down by; LIST_FIELDS hold lists of values
+ITEM_FIELDS = ["difficulty", "skill", "subtype"]
+LIST_FIELDS = ["domains", "services"]
+SAMPLE_COLUMNS = ["run", "log", "model", "task", "created", "sample_id", "epoch", "value", *ITEM_FIELDS, *LIST_FIELDS]
+_SCHEMA = """
+CREATE TABLE logs (
+    id           INTEGER PRIMARY KEY,
+    path         TEXT NOT NULL UNIQUE,
+    size         INTEGER NOT NULL,
+    mtime_ns     INTEGER NOT NULL,
+    content_hash TEXT,             -- NULL if parsed without hashing
+    run          TEXT NOT NULL,
+    task         TEXT,             -- NULL if the log matched no task
+    model        TEXT,
+    created      TEXT
+);
+CREATE INDEX logs_content_hash ON logs (content_hash);
+CREATE TABLE samples (
+    log_id     INTEGER NOT NULL REFERENCES logs (id) ON DELETE CASCADE,
+    sample_id  TEXT NOT NULL,
+    epoch      INTEGER NOT NULL,
+    value      REAL NOT NULL,      -- Normalized to [0, 1]
+    difficulty TEXT,
+    skill      TEXT,
+    subtype    TEXT,
+    domains    TEXT NOT NULL,      -- JSON list
+    services   TEXT NOT NULL       -- JSON list of canonical AWS service ids
+);
+CREATE INDEX samples_log_id ON samples (log_id);
+"""
+
+
+def content_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def run_name(path: str) -> str:
+    """The run a log belongs to: the name of the directory it was written to."""
+    return pathlib.Path(path).parent.name
+
+
+class ScoreIndex:
+    """SQLite store of per-sample scores, keyed by log path, size, mtime and content hash."""
+
+    def __init__(self, path: str | os.PathLike = DEFAULT_INDEX):
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            self._create()
+
+    def _create(self) -> None:
+        # Rows are derived from the logs, so an index from another version is rebuilt
+        with self.db:
+            self.db.execute("DROP TABLE IF EXISTS samples")
+            self.db.execute("DROP TABLE IF EXISTS logs")
+            self.db.executescript(_SCHEMA)
+            self.db.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self) -> "ScoreIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+
+    def pending(self, paths: Iterable[str]) -> List[Tuple[str, Optional[str], os.stat_result]]:
+        """Return (path, content hash, stat) of each log that needs parsing.
+
+        Logs whose content is already indexed are brought up to date (new size,
+        mtime or path) instead. Indexed logs whose size changed aren't hashed
+        (their hash is None). The stat is taken before hashing; pass it on to
+        add() so a log that grows while it's parsed is seen as changed again.
+        """
+        todo: List[Tuple[str, Optional[str], os.stat_result]] = []
+        with self.db:
+            for path in paths:
+                path = str(pathlib.Path(path).resolve())
+                stat = os.stat(path)
+                row = self.db.execute(
+                    "SELECT id, size, mtime_ns, content_hash FROM logs WHERE path = ?", (path,)
+                ).fetchone()
+                if row and (row[1], row[2]) == (stat.st_size, stat.st_mtime_ns):
+                    continue
+                if row and row[1] != stat.st_size:
+                    todo.append((path, None, stat))
+                    continue
+                digest = content_hash(path)
+                if row and row[3] == digest:
+                    self._relink(row[0], path, stat)
+                    continue
+                if row is None:
+                    moved = [
+                        log_id
+                        for log_id, old_path in self.db.execute(
+                            "SELECT id, path FROM logs WHERE content_hash = ?", (digest,)
+                        )
+                        if not os.path.exists(old_path)
+                    ]
+                    if moved:
+                        self._relink(moved[0], path, stat)
+                        continue
+                todo.append((path, digest, stat))
+        return todo
+
+    def _relink(self, log_id: int, path: str, stat: os.stat_result) -> None:
+        self.db.execute(
+            "UPDATE logs SET path = ?, size = ?, mtime_ns = ?, run = ? WHERE id = ?",
+            (path, stat.st_size, stat.st_mtime_ns, run_name(path), log_id),
+        )
+
+    def add(self, path: str, digest: Optional[str], stat: os.stat_result, log: Optional[Dict[str, Any]]) -> None:
+        """Store one parsed log, replacing any earlier rows for its path.
+
+        ``digest`` and ``stat`` are as returned by pending(), from before the
+        log was parsed. ``log`` has the log's task, model, created time and
+        samples (each with id, epoch, value and the item fields), or is None for
+        a log matching no task, which is recorded so it isn't parsed again.
+        """
+        path = str(pathlib.Path(path).resolve())
+        log = log or {}
+        with self.db:
+            self.db.execute("DELETE FROM logs WHERE path = ?", (path,))
+            cursor = self.db.execute(
+                "INSERT INTO logs (path, size, mtime_ns, content_hash, run, task, model, created)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, digest, run_name(path),
+                 log.get("task"), log.get("model"), log.get("created")),
+            )
+            self.db.executemany(
+                f"INSERT INTO samples (log_id, sample_id, epoch, value, {', '.join(ITEM_FIELDS + LIST_FIELDS)})"
+                f" VALUES ({_placeholders(range(4 + len(ITEM_FIELDS) + len(LIST_FIELDS)))})",
+                [
+                    (
+                        cursor.lastrowid, str(s["id"]), s["epoch"], s["value"],
+                        *(s.get(f) for f in ITEM_FIELDS),
+                        *(json.dumps(s.get(f) or []) for f in LIST_FIELDS),
+                    )
+                    for s in log.get("samples", [])
+                ],
+            )
+
+    def prune(self, root: str, present: Iterable[str]) -> int:
+        """Drop indexed logs under root that aren't in ``present`` (deleted files)."""
+        keep = {str(pathlib.Path(p).resolve()) for p in present}
+        stale = [(log_id,) for log_id, path in self._under(root) if path not in keep]
+        with self.db:
+            self.db.executemany("DELETE FROM logs WHERE id = ?", stale)
+        return len(stale)
+
+    def _under(self, root: str) -> List[Tuple[int, str]]:
+        prefix = str(pathlib.Path(root).resolve()) + os.sep
+        return self.db.execute(
+            "SELECT id, path FROM logs WHERE substr(path, 1, ?) = ?", (len(prefix), prefix)
+        ).fetchall()
+
+    def runs(self, root: Optional[str] = None) -> List[str]:
+        """Runs with scored logs (under root, if given), oldest first."""
+        return self._ordered_runs(self.select(root))
+
+    def _ordered_runs(self, ids: Sequence[int]) -> List[str]:
+        return [
+            run for run, in self.db.execute(
+                f"SELECT run FROM logs WHERE id IN {self._selected('ids', ids)} AND task IS NOT NULL"
+                " GROUP BY run ORDER BY MIN(created), run"
+            ).fetchall()
+        ]
+
+    def _selected(self, table: str, values: Iterable[Any]) -> str:
+        """Fill a temporary table with values; returns a subquery over them for ``IN``.
+
+        Selections can hold more logs than SQLite allows query parameters.
+        """
+        with self.db:
+            self.db.execute(f"CREATE TEMP TABLE IF NOT EXISTS selected_{table} (value PRIMARY KEY)")
+            self.db.execute(f"DELETE FROM selected_{table}")
+            self.db.executemany(f"INSERT OR IGNORE INTO selected_{table} VALUES (?)", ((v,) for v in values))
+        return f"(SELECT value FROM selected_{table})"
+
+    def select(
+        self,
+        root: Optional[str] = None,
+        since: Optional[str] = None,
+        runs: Optional[Sequence[str] | int] = None,
+    ) -> List[int]:
+        """Ids of the indexed logs to aggregate.
+
+        Args:
+            root: Only logs under this directory
+            since: Only logs created on or after this ISO date or timestamp
+            runs: Only these runs, or the latest N runs if an int
+        """
+        if root is not None:
+            ids = [log_id for log_id, _ in self._under(root)]
+        else:
+            ids = [log_id for log_id, in self.db.execute("SELECT id FROM logs")]
+        if since is not None:
+            ids = [
+                log_id for log_id, in self.db.execute(
+                    f"SELECT id FROM logs WHERE id IN {self._selected('ids', ids)} AND created >= ?", (since,)
+                ).fetchall()
+            ]
+        if runs is not None:
+            if isinstance(runs, int):
+                ordered = self._ordered_runs(ids)
+                runs = ordered[-runs:] if runs > 0 else []
+            ids = [
+                log_id for log_id, in self.db.execute(
+                    f"SELECT id FROM logs WHERE id IN {self._selected('ids', ids)}"
+                    f" AND run IN {self._selected('runs', runs)}"
+                ).fetchall()
+            ]
+        return sorted(ids)
+
+    def log_paths(self, log_ids: Sequence[int]) -> Dict[int, str]:
+        """Path of each of the given logs."""
+        return dict(self.db.execute(
+            f"SELECT id, path FROM logs WHERE id IN {self._selected('ids', log_ids)}"
+        ).fetchall())
+
+    def log_versions(self, log_ids: Sequence[int]) -> Dict[int, str]:
+        """Version ("size:mtime_ns") of each of the given logs, which changes whenever it is written."""
+        return {
+            log_id: f"{size}:{mtime_ns}"
+            for log_id, size, mtime_ns in self.db.execute(
+                f"SELECT id, size, mtime_ns FROM logs WHERE id IN {self._selected('ids', log_ids)}"
+            ).fetchall()
+        }
+
+    def sample_table(self, log_ids: Sequence[int]) -> pd.DataFrame:
+        """The scored samples of the given logs, one row each, in path order."""
+        samples = pd.read_sql_query(
+            "SELECT run, path AS log, model, task, created, sample_id, epoch, value,"
+            f" {', '.join(ITEM_FIELDS + LIST_FIELDS)}"
+            " FROM samples JOIN logs ON logs.id = samples.log_id"
+            f" WHERE logs.id IN {self._selected('ids', log_ids)} AND task IS NOT NULL"
+            " ORDER BY path, samples.rowid",
+            self.db,
+        )
+        for field in LIST_FIELDS:
+            # Decode each distinct list once; items repeat across models and runs
+            decoded = {text: json.loads(text) for text in samples[field].unique()}
+            samples[field] = samples[field].map(decoded)
+        return samples[SAMPLE_COLUMNS]
+
+
+def _placeholders(values: Sized) -> str:
+    return ", ".join("?" * len(values))
@@ -0,0 +1,254 @@
+"""
+score_stats.py — Bootstrap confidence intervals and paired significance tests
+for leaderboard scores.
+
+For each task, the sample table (see aggregate_multi.collect_samples) is
+pivoted into a (models × items) score matrix: a model's score on an item,
+averaged over epochs and duplicate logs, or NaN if it didn't answer it.
+Items are resampled with replacement thousands of times. Each resample is a
+row of item counts, so every model's resampled mean is a single matrix
+product, and all models share the same resamples. A model's weighted overall
+score is resampled by combining its task resamples with the registry weights.
+Missing tasks count as 0, as on the leaderboard. Intervals are percentile
+intervals and are reproducible for a given seed.
+
+Paired tests compare every pair of models on the items both answered. All
+pairs are computed at once as arrays over the pair dimension:
+
+- binary tasks: exact McNemar test on the discordant (sample, epoch) pairs.
+  The pass/fail counts of every pair come from two matrix products.
+- rubric tasks: paired bootstrap of the mean score difference, with one
+  shared set of item resamples for every pair.
+"""
+
+from __future__ import annotations
+
+import math
+import warnings
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd  # type: ignore
+
+BOOTSTRAP_RESAMPLES = 5000
+BOOTSTRAP_SEED = 20260107
+CI_LEVEL = 0.95
+
+# Category confidence from the typical CI half-width, in percentage points
+CONFIDENCE_MARGINS = [("high", 5), ("medium", 10)]
+
+
+@dataclass
+class ScoreMatrix:
+    """Per-item scores of every model on one task; NaN where a model has no score."""
+
+    models: List[str]
+    items: List[str]
+    values: np.ndarray  # (models, items)
+
+
+def score_matrix(
+    samples: pd.DataFrame, models: Optional[List[str]] = None, by_epoch: bool = False
+) -> ScoreMatrix:
+    """Pivot one task's samples to a (models × items) matrix of mean scores.
+
+    ``models`` fixes the row order; models without samples get a row of NaN.
+    Epochs of an item are averaged, unless ``by_epoch``, which makes each
+    (sample, epoch) its own item.
+    """
+    columns = ["sample_id", "epoch"] if by_epoch else "sample_id"
+    table = samples.pivot_table(index="model", columns=columns, values="value", aggfunc="mean")
+    if models is not None:
+        table = table.reindex(models)
+    return ScoreMatrix(
+        models=[str(m) for m in table.index],
+        items=[":".join(map(str, i)) if by_epoch else str(i) for i in table.columns],
+        values=table.to_numpy(dtype=np.float64),
+    )
+
+
+def bootstrap_means(matrix: ScoreMatrix, resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """Each model's mean score over ``resamples`` bootstrap resamples of the items.
+
+    Returns a (resamples, models) array. It is NaN where a model answered none
+    of the resampled items.
+    """
+    items = len(matrix.items)
+    counts = rng.multinomial(items, np.full(items, 1 / items), size=resamples).astype(np.float64)
+    answered = ~np.isnan(matrix.values)
+    sums = counts @ np.where(answered, matrix.values, 0.0).T
+    totals = counts @ answered.T.astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(totals > 0, sums / totals, np.nan)
+
+
+def _interval(means: np.ndarray, level: float) -> np.ndarray:
+    """Percentile interval of each column of means: a (2, columns) array."""
+    tail = (1 - level) / 2 * 100
+    with warnings.catch_warnings():
+        # Models without samples for a task have all-NaN columns
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanpercentile(means, [tail, 100 - tail], axis=0)
+
+
+def bootstrap_cis(
+    samples: pd.DataFrame,
+    weights: Dict[str, float],
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = BOOTSTRAP_SEED,
+    level: float = CI_LEVEL,
+) -> Dict[str, Dict[str, List[float]]]:
+    """Bootstrap CIs of every model's task scores and weighted overall.
+
+    Returns {model: {task: [low, high], ..., "overall": [low, high]}}. A task
+    appears only for models with samples for it.
+    """
+    models = sorted(samples["model"].unique())
+    rng = np.random.default_rng(seed)
+    overall = np.zeros((resamples, len(models)))
+    cis: Dict[str, Dict[str, List[float]]] = {model: {} for model in models}
+
+    for task, weight in weights.items():
+        task_samples = samples[samples["task"] == task]
+        if task_samples.empty:
+            continue
+        means = bootstrap_means(score_matrix(task_samples, models), resamples, rng)
+        low, high = _interval(means, level)
+        for model, lo, hi in zip(models, low, high):
+            if not math.isnan(lo):
+                cis[model][task] = [round(float(lo), 4), round(float(hi), 4)]
+        overall += weight * np.nan_to_num(means)
+
+    low, high = _interval(overall, level)
+    for model, lo, hi in zip(models, low, high):
+        cis[model]["overall"] = [round(float(lo), 4), round(float(hi), 4)]
+    return cis
+
+
+def category_margins(cis: Dict[str, Dict[str, List[float]]]) -> Dict[str, int]:
+    """Typical CI half-width of each task across models, in whole percentage points (at least 1)."""
+    widths: Dict[str, List[float]] = {}
+    for model_cis in cis.values():
+        for task, (low, high) in model_cis.items():
+            widths.setdefault(task, []).append((high - low) / 2)
+    return {task: max(1, math.ceil(float(np.median(w)) * 100 - 1e-9)) for task, w in widths.items()}
+
+
+def confidence_label(margin: int) -> str:
+    """'high', 'medium' or 'low' confidence for a margin in percentage points."""
+    for label, limit in CONFIDENCE_MARGINS:
+        if margin <= limit:
+            return label
+    return "low"
+
+
+def _binomial_two_sided(k: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Exact two-sided binomial test p-values of k <= n / 2 successes in n fair trials."""
+    top = int(n.max()) if n.size else 0
+    log_factorial = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, top + 1)))])
+    x = np.arange(top + 1)
+    rest = np.clip(n[:, None] - x, 0, None)
+    log_pmf = log_factorial[n][:, None] - log_factorial[x] - log_factorial[rest] - n[:, None] * math.log(2)
+    tail = np.where(x <= k[:, None], np.exp(log_pmf), 0.0).sum(axis=1)
+    return np.minimum(1.0, 2 * tail)
+
+
+def mcnemar(matrix: ScoreMatrix) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Exact McNemar tests of every model pair on a binary score matrix.
+
+    Scores of 0.5 or more count as passes. Returns (models × models) arrays of
+    the pass-rate difference (row minus column) and the p-value on shared
+    items, both NaN where a pair shares no items, and the shared item counts.
+    """
+    answered = ~np.isnan(matrix.values)
+    passed = (answered & (np.nan_to_num(matrix.values) >= 0.5)).astype(np.float64)
+    failed = answered.astype(np.float64) - passed
+    only_row = passed @ failed.T  # Row model passes, column model fails
+    shared = answered.astype(np.float64) @ answered.T.astype(np.float64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        delta = (only_row - only_row.T) / shared
+    i, j = np.triu_indices(len(matrix.models), k=1)
+    discordant = (only_row[i, j] + only_row[j, i]).astype(np.int64)
+    smaller = np.minimum(only_row[i, j], only_row[j, i]).astype(np.int64)
+    p_value = np.full(delta.shape, np.nan)
+    p_value[i, j] = p_value[j, i] = _binomial_two_sided(smaller, discordant)
+    p_value[shared == 0] = np.nan
+    np.fill_diagonal(p_value, np.nan)
+    return delta, p_value, shared
+
+
+def paired_bootstrap(
+    matrix: ScoreMatrix, resamples: int, rng: np.random.Generator
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Paired bootstrap tests of every model pair's mean score difference.
+
+    Every pair is resampled over the same item resamples. The two-sided
+    p-value is the share of resampled differences, shifted to mean zero,
+    at least as far from zero as the observed one. Returns the same arrays
+    as mcnemar.
+    """
+    models = len(matrix.models)
+    answered = ~np.isnan(matrix.values)
+    values = np.nan_to_num(matrix.values)
+    i, j = np.triu_indices(models, k=1)
+    both = (answered[i] & answered[j]).astype(np.float64)  # (pairs, items)
+    differences = (values[i] - values[j]) * both
+
+    items = len(matrix.items)
+    counts = rng.multinomial(items, np.full(items, 1 / items), size=resamples).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        observed = differences.sum(axis=1) / both.sum(axis=1)
+        resampled = (counts @ differences.T) / (counts @ both.T)  # (resamples, pairs)
+    extreme = np.abs(resampled - observed) >= np.abs(observed) - 1e-12
+    valid = ~np.isnan(resampled)
+    pair_p = (1 + (extreme & valid).sum(axis=0)) / (1 + valid.sum(axis=0))
+
+    delta = np.full((models, models), np.nan)
+    p_value = np.full((models, models), np.nan)
+    delta[i, j], delta[j, i] = observed, -observed
+    p_value[i, j] = p_value[j, i] = np.where(np.isnan(observed), np.nan, pair_p)
+    np.fill_diagonal(delta, 0.0)
+    shared = answered.astype(np.float64) @ answered.T.astype(np.float64)
+    return delta, p_value, shared
+
+
+def _matrix_list(values: np.ndarray) -> List[List[Optional[float]]]:
+    return [[None if math.isnan(v) else round(float(v), 4) for v in row] for row in values]
+
+
+def paired_significance(
+    samples: pd.DataFrame,
+    scoring: Dict[str, str],
+    resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = BOOTSTRAP_SEED,
+) -> Dict[str, Any]:
+    """Paired significance of the score difference of every model pair, per task.
+
+    ``scoring`` maps each task to "binary" (McNemar) or "rubric" (paired
+    bootstrap). Returns {"models": [...], "tasks": {task: {"test", "delta",
+    "p_value", "shared_items"}}}. The matrices are indexed [row][column] in
+    model order. delta is the row model's score minus the column model's, on
+    shared items; delta and p_value are None where a pair shares no items.
+    """
+    models = sorted(samples["model"].unique())
+    rng = np.random.default_rng(seed)
+    tasks: Dict[str, Any] = {}
+    for task, method in scoring.items():
+        task_samples = samples[samples["task"] == task]
+        if task_samples.empty:
+            continue
+        if method == "binary":
+            test = "mcnemar"
+            delta, p_value, shared = mcnemar(score_matrix(task_samples, models, by_epoch=True))
+        else:
+            test = "paired_bootstrap"
+            delta, p_value, shared = paired_bootstrap(score_matrix(task_samples, models), resamples, rng)
+        tasks[task] = {
+            "test": test,
+            "delta": _matrix_list(np.where(shared > 0, delta, np.nan)),
+            "p_value": _matrix_list(p_value),
+            "shared_items": shared.astype(np.int64).tolist(),
+        }
+    return {"models": models, "tasks": tasks}
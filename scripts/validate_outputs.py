@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+validate_outputs.py — Batch-validate structured diagram outputs and leaderboard files.
+
+Re-runs the structural validators used by llm_judge_scorer on logged model
+responses, without calling any model. JSON architectures are checked against
+schemas/architecture.schema.json through the schema registry, which compiles
+each schema once, and every schema error is reported rather than only the
+first.
+
+Inputs
+------
+- --log-dir: Inspect eval logs. Samples are streamed one at a time; by default
+  only diagram creation samples with an output_format are checked (--all
+  auto-detects the format of every response).
+- --jsonl: files of {"id", "response", "output_format"} records.
+- --leaderboard: leaderboard JSON files, checked against
+  schemas/leaderboard.schema.json.
+
+Usage
+-----
+uv run python scripts/validate_outputs.py --log-dir logs/ --json-out results/validation.json
+uv run python scripts/validate_outputs.py --leaderboard results/leaderboard.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from evals.architecture_design.diagram_validators import validate_structured_output
+from evals.schema_registry import format_error, schema_errors
+
+
+def iter_log_responses(log_dir: Path, include_all: bool = False) -> Iterator[Dict[str, Any]]:
+    """Yield {"id", "response", "output_format"} for each logged response to validate."""
+    from inspect_ai.log import list_eval_logs, read_eval_log_samples
+
+    for log in list_eval_logs(str(log_dir)):
+        for sample in read_eval_log_samples(log.name, all_samples_required=False):
+            metadata = sample.metadata or {}
+            output_format = metadata.get("output_format")
+            if not include_all and (metadata.get("type") != "diagram_creation" or not output_format):
+                continue
+            yield {
+                "id": f"{Path(log.name).name}:{sample.id}:{sample.epoch}",
+                "response": sample.output.completion if sample.output else "",
+                "output_format": output_format,
+            }
+
+
+def iter_jsonl_responses(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield the response records of a JSONL file."""
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                record = json.loads(line)
+                record.setdefault("id", f"{path.name}:{line_number}")
+                yield record
+
+
+def validate_response(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate one response record, collecting every schema error for JSON outputs."""
+    result = validate_structured_output(record.get("response") or "", record.get("output_format"))
+    errors = [result.error_message] if result.error_message else []
+
+    if result.format_detected == "json" and not result.is_valid and result.extracted_content:
+        try:
+            data = json.loads(result.extracted_content)
+        except json.JSONDecodeError:
+            pass
+        else:
+            all_errors = schema_errors("architecture", data)
+            if all_errors:
+                errors = [f"Schema validation failed {format_error(e)}" for e in all_errors]
+
+    return {
+        "id": record.get("id"),
+        "format": result.format_detected,
+        "required_format": record.get("output_format"),
+        "valid": result.is_valid,
+        "errors": errors,
+    }
+
+
+def validate_leaderboard_file(path: Path) -> Dict[str, Any]:
+    """Validate one leaderboard JSON file, collecting every schema error."""
+    with open(path) as f:
+        data = json.load(f)
+    errors = [format_error(e) for e in schema_errors("leaderboard", data)]
+    return {"id": str(path), "format": "leaderboard", "valid": not errors, "errors": errors}
+
+
+def summarise(results: List[Dict[str, Any]], top_errors: int = 10) -> Dict[str, Any]:
+    """Counts per format and the most common error messages."""
+    by_format: Dict[str, Dict[str, int]] = {}
+    error_counts: Counter = Counter()
+    for result in results:
+        counts = by_format.setdefault(result["format"] or "undetected", {"total": 0, "valid": 0})
+        counts["total"] += 1
+        counts["valid"] += int(result["valid"])
+        error_counts.update(result["errors"])
+    return {
+        "total": len(results),
+        "valid": sum(1 for r in results if r["valid"]),
+        "by_format": by_format,
+        "top_errors": error_counts.most_common(top_errors),
+    }
+
+
+def print_summary(summary: Dict[str, Any], elapsed: float) -> None:
+    total = summary["total"]
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"Validated {total:,} outputs in {elapsed:.2f}s ({rate:,.0f}/s)")
+    if not total:
+        return
+    print(f"Valid: {summary['valid']:,}/{total:,} ({summary['valid'] / total * 100:.1f}%)")
+    for fmt, counts in sorted(summary["by_format"].items()):
+        print(f"  {fmt:<12} {counts['valid']:>6,}/{counts['total']:<6,} valid")
+    if summary["top_errors"]:
+        print("\nMost common errors:")
+        for message, count in summary["top_errors"]:
+            print(f"  {count:>6,}  {message}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Batch-validate structured outputs and leaderboard files.")
+    ap.add_argument("--log-dir", default=None, help="Eval logs whose responses to validate")
+    ap.add_argument("--jsonl", nargs="+", default=[], help="JSONL files of {id, response, output_format}")
+    ap.add_argument("--leaderboard", nargs="+", default=[], help="Leaderboard JSON files to validate")
+    ap.add_argument("--all", action="store_true",
+                    help="Validate every logged response (auto-detecting its format), not only "
+                         "diagram creation samples with an output_format")
+    ap.add_argument("--top-errors", type=int, default=10, help="Number of most common errors to print")
+    ap.add_argument("--json-out", default=None, help="Write per-output results and the summary as JSON")
+    args = ap.parse_args()
+
+    if not (args.log_dir or args.jsonl or args.leaderboard):
+        ap.error("nothing to validate: pass --log-dir, --jsonl and/or --leaderboard")
+
+    started = time.perf_counter()
+    results = []
+    if args.log_dir:
+        results += [validate_response(r) for r in iter_log_responses(Path(args.log_dir), args.all)]
+    for path in args.jsonl:
+        results += [validate_response(r) for r in iter_jsonl_responses(Path(path))]
+    for path in args.leaderboard:
+        results.append(validate_leaderboard_file(Path(path)))
+    elapsed = time.perf_counter() - started
+
+    summary = summarise(results, args.top_errors)
+    print_summary(summary, elapsed)
+
+    if args.json_out:
+        out_path = Path(args.json_out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(out_path, "w") as f:
+            json.dump({"summary": summary, "results": results}, f, indent=2)
+        print(f"\nWrote {out_path}")
+
+    # Invalid model outputs are expected findings; an invalid leaderboard is an error
+    if any(r["format"] == "leaderboard" and not r["valid"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,3 +8,40 @@ import pytest
 # Add scripts directory to path for imports
 SCRIPTS_DIR = Path(__file__).parent.parent / "scripts"
 sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+@pytest.fixture
+def make_eval_log(tmp_path):
+    """Write a minimal Inspect .eval log and return its path.
+
+    ``scores`` holds one score value per sample, recorded under ``metric``;
+    ``metadata`` (optional) holds each sample's metadata.
+    """
+    from inspect_ai.log import EvalConfig, EvalDataset, EvalLog, EvalSample, EvalSpec, write_eval_log
+    from inspect_ai.scorer import Score
+
+    def make(name, task, model, metric, scores, metadata=None, created="2026-10-01T00:00:00+00:00"):
+        spec = EvalSpec(
+            created=created,
+            task=task,
+            dataset=EvalDataset(name=task),
+            model=model,
+            config=EvalConfig(),
+        )
+        samples = [
+            EvalSample(
+                id=i + 1,
+                epoch=1,
+                input="question",
+                target="A",
+                scores={metric: Score(value=value)},
+                metadata=(metadata[i] if metadata else {}),
+            )
+            for i, value in enumerate(scores)
+        ]
+        path = tmp_path / "logs" / f"{name}.eval"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_eval_log(EvalLog(eval=spec, samples=samples, status="success"), str(path))
+        return path
+
+    return make
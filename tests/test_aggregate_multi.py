@@ -9,7 +9,25 @@ from unittest.mock import MagicMock, patch
 import pandas as pd
 import pytest
 
-from aggregate_multi import collect, metric_value, scores_to_dict, validate_leaderboard_json, SCHEMA_PATH
+from aggregate_multi import (
+    SCHEMA_PATH,
+    LiveLeaderboard,
+    LogWatcher,
+    build_leaderboard,
+    collect,
+    collect_samples,
+    item_metadata,
+    metric_value,
+    metric_values,
+    sample_services,
+    scores_to_dict,
+    service_breakdown,
+    task_weights,
+    validate_leaderboard_json,
+    write_sample_table,
+)
+from evals.architecture_design.tasks import _sample_metadata, item_record
+from score_index import ScoreIndex
 from task_registry import TASKS
 
 
@@ -78,6 +96,20 @@ class TestScoresToDict:
 # ---------------------------------------------------------------------------
 
 
+class TestMetricValues:
+    """Test converting a whole log's scores at once."""
+
+    def test_bulk_matches_per_sample(self):
+        """Bulk conversion agrees with metric_value for pass values, numbers and mixed layouts."""
+        cases = [
+            ([make_sample("m", "choice", v) for v in ["C", "I", "C"]], TASKS["practice_exam"]),
+            ([make_sample("m", "architecture_scorer", v) for v in [0.25, 1, True]], TASKS["architecture_design"]),
+            ([make_sample("m", "cdk_verify", "C"), make_sample("m", "cdk_verify_local", "I")], TASKS["cdk_synth"]),
+        ]
+        for samples, cfg in cases:
+            assert metric_values(samples, cfg) == [metric_value(s, cfg) for s in samples]
+
+
 class TestMetricValue:
     """Test metric value extraction from samples."""
 
@@ -237,6 +269,197 @@ class TestDuplicateHandling:
         assert df_agg["accuracy"].iloc[0] == 0.7  # Average of 0.8 and 0.6
 
 
+class TestServiceBreakdown:
+    """Test per-service aggregation."""
+
+    def test_sample_services_from_each_track(self):
+        """Service names are canonicalized from every track's metadata layout."""
+        assert sample_services({"metadata": {"aws_services": ["ALB", "Amazon S3"]}}) == ["elb", "s3"]
+        assert sample_services(
+            {"expected_services": [{"service": "Elastic Load Balancer"}], "expected_components": ["S3", "RDS"]}
+        ) == ["elb", "s3", "rds"]
+        assert sample_services(None) == []
+
+    def test_item_metadata_from_each_track(self):
+        """Practice exam's single domain is listed like the other tracks' domains."""
+        practice = item_metadata({"metadata": {"difficulty": "medium", "domain": "Security", "aws_services": ["IAM"]}})
+        assert practice == {"difficulty": "medium", "skill": None, "subtype": None,
+                            "domains": ["Security"], "services": ["iam"]}
+        arch = item_metadata({"subtype": "data_flow", "difficulty": "hard", "domains": ["Networking"]})
+        assert (arch["subtype"], arch["domains"], arch["services"]) == ("data_flow", ["Networking"], [])
+
+    def test_architecture_sample_metadata_has_breakdown_fields(self):
+        """An architecture item's logged metadata carries its difficulty, domains and services."""
+        arch = item_metadata(_sample_metadata(item_record("arch_001")))
+        assert arch["difficulty"] == "beginner"
+        assert arch["subtype"] == "service_identification"
+        assert arch["domains"] == ["compute", "database", "networking"]
+        assert set(arch["services"]) == {"ec2", "rds", "elb", "vpc", "auto_scaling"}
+
+    def test_breakdown_pools_logs(self):
+        """Samples from several logs are pooled per model, task and service."""
+        samples = pd.DataFrame({
+            "model": "m",
+            "task": "cdk_synth",
+            "log": ["a", "a", "b", "b"],
+            "value": [1.0, 0.0, 1.0, 1.0],
+            "services": [["elb", "s3"], ["elb"], ["elb"], ["elb"]],
+        })
+        breakdown = service_breakdown(samples)
+        elb = breakdown[breakdown["service"] == "elb"].iloc[0]
+        assert elb["score"] == 0.75
+        assert elb["samples"] == 4
+        assert elb["service_name"] == "Elastic Load Balancing"
+
+
+class TestLogIngestion:
+    """Test reading real logs serially and in a process pool."""
+
+    def _logs(self, make_eval_log):
+        return [
+            make_eval_log("2026-10-01_practice_exam_a", "practice_exam", "openai/model-a", "choice",
+                          ["C", "C", "I", "C"], [{"metadata": {"aws_services": ["ALB"]}}] * 4),
+            make_eval_log("2026-10-01_aws_cdk_synth_a", "cdk_synth", "openai/model-a", "cdk_verify", ["C", "I"]),
+            make_eval_log("2026-10-01_practice_exam_b", "practice_exam", "openai/model-b", "choice", ["I", "C"]),
+            make_eval_log("2026-10-01_unrelated", "other", "openai/model-b", "choice", ["C"]),
+        ]
+
+    def test_samples_read_header_once(self, make_eval_log):
+        """Each log's header is read once, for both task detection and the model name."""
+        paths = [str(p) for p in self._logs(make_eval_log)]
+        with patch("aggregate_multi.read_eval_log", wraps=__import__("aggregate_multi").read_eval_log) as read:
+            samples = collect_samples(paths, workers=1)
+        assert read.call_count == len(paths)
+        accuracy = samples.groupby(["task", "model"])["value"].mean()
+        assert accuracy.to_dict() == {
+            ("cdk_synth", "openai/model-a"): 0.5,
+            ("practice_exam", "openai/model-a"): 0.75,
+            ("practice_exam", "openai/model-b"): 0.5,
+        }
+        assert samples["run"].unique().tolist() == ["logs"]
+        assert samples[samples["model"] == "openai/model-a"]["services"].str.len().tolist() == [0, 0, 1, 1, 1, 1]
+
+    def test_parallel_matches_serial(self, make_eval_log):
+        """The process pool produces the same leaderboard as serial reading, in any input order."""
+        paths = [str(p) for p in self._logs(make_eval_log)]
+        serial = collect(paths, workers=1)
+        parallel = collect(paths[::-1], workers=2)
+        pd.testing.assert_frame_equal(serial, parallel)
+
+    def test_duplicate_logs_average_accuracies(self):
+        """A model's task score averages its logs' accuracies; absent tasks score 0."""
+        samples = pd.DataFrame({
+            "model": "m",
+            "task": "practice_exam",
+            "log": ["a", "a", "a", "a", "b"],
+            "value": [1.0, 1.0, 1.0, 0.0, 0.0],
+        })
+        board = build_leaderboard(samples).iloc[0]
+        assert board["practice_exam"] == 0.375
+        assert board["cdk_synth"] == 0
+        assert board["overall"] == round(0.375 * TASKS["practice_exam"]["weight"], 4)
+
+    def test_sample_table_written_as_csv_without_pyarrow(self, make_eval_log, tmp_path):
+        """The sample table falls back to CSV, with list columns joined by "|"."""
+        samples = collect_samples([str(p) for p in self._logs(make_eval_log)], workers=1)
+        written = write_sample_table(samples, str(tmp_path / "out" / "samples.parquet"))
+        if written.suffix == ".csv":
+            table = pd.read_csv(written)
+            assert table["services"].fillna("").tolist() == ["", ""] + ["elb"] * 4 + ["", ""]
+        else:
+            table = pd.read_parquet(written)
+        assert len(table) == len(samples)
+
+    def test_remote_log_dir_read_without_index(self, make_eval_log, tmp_path):
+        """Remote log dirs fall back to reading every log directly instead of failing."""
+        samples = collect_samples([str(p) for p in self._logs(make_eval_log)], workers=1)
+        remote = [MagicMock() for _ in range(2)]
+        for i, log in enumerate(remote):
+            log.name = f"s3://bucket/logs/{i}.eval"
+        argv = ["aggregate_multi.py", "--log-dir", "s3://bucket/logs", "--outfile", str(tmp_path / "board.csv"),
+                "--index", str(tmp_path / "index.sqlite")]
+        with patch("sys.argv", argv), patch("aggregate_multi.list_eval_logs", return_value=remote), \
+                patch("aggregate_multi.collect_samples", return_value=samples) as read:
+            __import__("aggregate_multi").main()
+        read.assert_called_once_with([log.name for log in remote], None)
+        assert pd.read_csv(tmp_path / "board.csv")["model"].tolist() == ["openai/model-a", "openai/model-b"]
+        assert not (tmp_path / "index.sqlite").exists()
+
+
+class TestWatch:
+    """Test the live leaderboard of --watch mode."""
+
+    def test_live_updates_match_full_aggregation(self):
+        """Updating logs one at a time gives build_leaderboard's scores and reports changed cells."""
+        samples = pd.DataFrame({
+            "log": ["a1", "a1", "a2", "b1", "b1", "c1"],
+            "model": ["a", "a", "a", "b", "b", "a"],
+            "task": ["practice_exam", "practice_exam", "practice_exam", "practice_exam", "practice_exam",
+                     "cdk_synth"],
+            "value": [1.0, 0.0, 1.0, 1.0, 1.0, 1.0],
+        })
+        board = LiveLeaderboard(task_weights())
+        board.update(["a1", "a2", "b1"], samples[samples["log"] != "c1"])
+        assert board.update(["c1"], samples[samples["log"] == "c1"]) == {("a", "cdk_synth")}
+        pd.testing.assert_frame_equal(board.frame(), build_leaderboard(samples))
+
+        # b1 grows by a failed sample; a's cells are untouched
+        grown = pd.concat([samples, pd.DataFrame([{"log": "b1", "model": "b", "task": "practice_exam", "value": 0.0}])])
+        assert board.update(["b1"], grown[grown["log"] == "b1"]) == {("b", "practice_exam")}
+        pd.testing.assert_frame_equal(board.frame(), build_leaderboard(grown))
+        assert board.update(["c1"], grown.iloc[:0]) == {("a", "cdk_synth")}
+        assert board.frame()["cdk_synth"].tolist() == [0.0, 0.0]
+
+    def test_watcher_ingests_growing_logs(self, make_eval_log, tmp_path):
+        """Only changed logs are read; unreadable partial logs are retried; outputs are rewritten whole."""
+        root = tmp_path / "logs"
+        make_eval_log("run/practice_exam_a", "practice_exam", "openai/model-a", "choice", ["C", "I"])
+        make_eval_log("run/practice_exam_b", "practice_exam", "openai/model-b", "choice", ["C"])
+        partial = root / "run" / "practice_exam_c.eval"
+        partial.write_bytes(b"PK")  # Not a complete zip yet
+        out, json_out = tmp_path / "results" / "board.csv", tmp_path / "results" / "board.json"
+
+        with ScoreIndex(tmp_path / "index.sqlite") as index:
+            watcher = LogWatcher(index, str(root), workers=1)
+            assert watcher.poll() == {("openai/model-a", "practice_exam"), ("openai/model-b", "practice_exam")}
+            assert watcher.poll() == set()
+
+            make_eval_log("run/practice_exam_a", "practice_exam", "openai/model-a", "choice", ["C", "I", "C", "C"])
+            make_eval_log("run/practice_exam_c", "practice_exam", "openai/model-c", "choice", ["I"])
+            with patch("aggregate_multi.extract_log", wraps=__import__("aggregate_multi").extract_log) as read:
+                changed = watcher.poll()
+            assert sorted(call.args[0] for call in read.call_args_list) == [
+                str(root / "run" / "practice_exam_a.eval"), str(partial),
+            ]
+            assert changed == {("openai/model-a", "practice_exam"), ("openai/model-c", "practice_exam")}
+
+            leaderboard = watcher.write(str(out), str(json_out))
+        assert pd.read_csv(out)["practice_exam"].tolist() == [0.75, 1.0, 0.0]
+        assert leaderboard["model"].tolist() == ["openai/model-a", "openai/model-b", "openai/model-c"]
+        data = json.loads(json_out.read_text())
+        assert data["_metadata"]["in_progress"] == {"logs": 3, "samples": 6}
+        assert not list(out.parent.glob("*.tmp"))
+
+
+    def test_watcher_rereads_log_grown_while_parsed(self, make_eval_log, tmp_path):
+        """Samples written between pending() and add() show up on the next poll."""
+        make_eval_log("run/practice_exam_a", "practice_exam", "openai/model-a", "choice", ["C"])
+        extract_log = __import__("aggregate_multi").extract_log
+
+        def read_then_grow(path):
+            log = extract_log(path)
+            make_eval_log("run/practice_exam_a", "practice_exam", "openai/model-a", "choice", ["C", "I"])
+            return log
+
+        with ScoreIndex(tmp_path / "index.sqlite") as index:
+            watcher = LogWatcher(index, str(tmp_path / "logs"), workers=1)
+            with patch("aggregate_multi.extract_log", side_effect=read_then_grow):
+                assert watcher.poll() == {("openai/model-a", "practice_exam")}
+            assert watcher.board.frame()["practice_exam"].tolist() == [1.0]
+            assert watcher.poll() == {("openai/model-a", "practice_exam")}
+            assert watcher.board.frame()["practice_exam"].tolist() == [0.5]
+            assert watcher.poll() == set()
+
 # ---------------------------------------------------------------------------
 # Test: JSON schema validation
 # ---------------------------------------------------------------------------
@@ -0,0 +1,73 @@
+"""Tests for the canonical AWS service index."""
+
+import pytest
+
+from evals.aws_services import SERVICES, ServiceIndex, canonical_service, canonical_services, service_counts
+from evals.architecture_design.diagram_validators import check_required_components, validate_structured_output
+from evals.architecture_design.tasks import _apply_deterministic_checks
+
+
+class TestCanonicalService:
+    """Test whole-name lookup."""
+
+    def test_aliases_share_one_id(self):
+        """Load balancer spellings, with or without a vendor prefix, are one service."""
+        names = ["ALB", "Application Load Balancer", "Elastic Load Balancing", "AWS Elastic Load Balancing", "elb"]
+        assert {canonical_service(name) for name in names} == {"elb"}
+        assert canonical_service("Route53") == canonical_service("Amazon Route 53") == "route53"
+
+    def test_unknown_and_parenthetical_names(self):
+        """Unknown names return None; a name mentioning exactly one service resolves to it."""
+        assert canonical_service("MySQL") is None
+        assert canonical_service("Amazon Elastic File System (Amazon EFS)") == "efs"
+        assert canonical_services(["S3", "Amazon S3", "Glue", "Nope"]) == ["s3", "glue"]
+
+    def test_feature_names_not_matched_by_their_service(self):
+        """Only generic words or a usage clause may surround the one service a name mentions."""
+        assert canonical_service("Lambda Authorizer") is None
+        assert canonical_service("Lambda") == canonical_service("Lambda service") == "lambda"
+        assert canonical_service("S3 for static assets") == "s3"
+        assert canonical_service("RDS database with Multi-AZ") == "rds"
+        assert canonical_service("S3 and CloudFront") is None
+
+    def test_conflicting_alias_rejected(self):
+        """An alias mapping to two services is a table error."""
+        with pytest.raises(ValueError):
+            ServiceIndex({**SERVICES, "dup": ("Duplicate", ("ALB",))})
+
+
+class TestServiceCounts:
+    """Test single-pass service extraction from text."""
+
+    def test_longest_match_and_counts(self):
+        """Longer aliases win and repeated mentions are counted."""
+        counts = service_counts(
+            "Lambda@Edge rewrites headers; AWS Lambda writes to S3 via the Amazon S3 API "
+            "and Kinesis Data Firehose delivers logs."
+        )
+        assert counts == {"lambda_edge": 1, "lambda": 1, "s3": 2, "kinesis_firehose": 1}
+
+    def test_ambiguous_words_need_prefix(self):
+        """Common words only count as services with an AWS/Amazon prefix."""
+        assert "glue" not in service_counts("Glue code and a config file")
+        assert service_counts("Catalog data with AWS Glue and record it in AWS Config") == {"glue": 1, "config": 1}
+
+
+class TestAliasMatchingInScorers:
+    """Test that the architecture scorers match services by alias."""
+
+    def test_service_identification_matches_alias(self):
+        """An expected "Elastic Load Balancer" is found when the response says "ALB"."""
+        eval_data = {
+            "id": "alias-test",
+            "type": "diagram_interpretation",
+            "expected_services": [{"service": "Elastic Load Balancer", "role": "distributes traffic"}],
+        }
+        accuracy, _, _ = _apply_deterministic_checks("Requests hit an ALB first.", eval_data, "service_identification")
+        assert accuracy == 1.0
+
+    def test_required_component_matches_alias(self):
+        """Diagram components are matched by any alias of the same service."""
+        result = validate_structured_output("```mermaid\nflowchart LR\n    A[ALB] --> B[EC2]\n```", "mermaid")
+        assert check_required_components(result, ["Elastic Load Balancer", "Amazon EC2"]) == (True, [])
+        assert check_required_components(result, ["Amazon RDS"]) == (False, ["Amazon RDS"])
@@ -0,0 +1,66 @@
+"""Tests for the static site's sharded leaderboard data."""
+
+import gzip
+import hashlib
+import json
+
+from build_site_data import SUMMARY, build_site_data, write_site_data
+
+LEADERBOARD = {
+    "_metadata": {"generated_at": "2026-10-19T00:00:00Z", "model_count": 2, "categories": {}},
+    "models": [
+        {"model": "openrouter/vendor/model-a", "practice_exam": 0.8, "overall": 0.27,
+         "ci": {"practice_exam": [0.7, 0.9], "overall": [0.24, 0.3]}},
+        {"model": "vendor/model-b", "practice_exam": 0.6, "overall": 0.2},
+    ],
+}
+MANIFEST = {"models": {"vendor/model-a": {"logs": [
+    {"file": "run-1/old.eval", "task": "practice_exam", "completed_at": "2026-10-01T00:00:00Z"},
+    {"file": "run-2/new log.eval", "task": "practice_exam", "completed_at": "2026-10-02T00:00:00Z"},
+]}}}
+SIGNIFICANCE = {
+    "models": ["openrouter/vendor/model-a", "vendor/model-b"],
+    "tasks": {"practice_exam": {"test": "mcnemar", "delta": [[0.0, 0.2], [-0.2, 0.0]],
+                                "p_value": [[None, 0.01], [0.01, None]], "shared_items": [[50, 50], [50, 50]]}},
+}
+
+
+class TestSiteData:
+    """Test the summary, shards and their compressed siblings."""
+
+    def test_summary_links_shards(self):
+        """The summary has scores, CIs and log links; details live in content-hashed shards."""
+        files = build_site_data(LEADERBOARD, MANIFEST, SIGNIFICANCE, cube={"models": []})
+        summary = json.loads(files[SUMMARY])
+        a, b = summary["models"]
+        assert a["ci"]["overall"] == [0.24, 0.3]
+        assert a["log"] == "logs/index.html?log_file=run-2%2Fnew%20log.eval"
+        assert b["log"] is None
+        assert a["detail"].startswith("models/openrouter-vendor-model-a.")
+        assert set(files) == {SUMMARY, a["detail"], b["detail"], summary["files"]["score_cube"]}
+
+        detail = json.loads(files[a["detail"]])
+        assert [log["file"] for log in detail["logs"]] == ["run-2/new log.eval", "run-1/old.eval"]
+        assert detail["significance"]["practice_exam"]["versus"] == [
+            {"model": "vendor/model-b", "delta": 0.2, "p_value": 0.01, "shared_items": 50},
+        ]
+        for name, content in files.items():
+            if name != SUMMARY:
+                assert hashlib.sha256(content).hexdigest()[:10] in name
+
+    def test_rebuild_keeps_unchanged_shards(self, tmp_path):
+        """Unchanged models keep their shard names; stale shards are removed; .gz siblings match."""
+        out = tmp_path / "data"
+        first = build_site_data(LEADERBOARD, MANIFEST, SIGNIFICANCE)
+        write_site_data(first, str(out))
+        # A new log for model-b only changes model-b's shard
+        manifest = {"models": {**MANIFEST["models"], "vendor/model-b": {"logs": [{"file": "run-2/b.eval"}]}}}
+        second = build_site_data(LEADERBOARD, manifest, SIGNIFICANCE)
+        write_site_data(second, str(out))
+
+        a, b = json.loads(second[SUMMARY])["models"]
+        assert a["detail"] in first and b["detail"] not in first
+        on_disk = {str(p.relative_to(out)) for p in out.rglob("*.json")}
+        assert on_disk == set(second)
+        for name, content in second.items():
+            assert gzip.decompress((out / (name + ".gz")).read_bytes()) == content
@@ -0,0 +1,94 @@
+"""Tests for the architecture dataset offset index and lazy loading."""
+
+import json
+
+from inspect_ai.dataset import Sample
+
+from evals.architecture_design.dataset_index import LazyArchitectureDataset, get_index
+from evals.architecture_design.judge_prompts import format_rubric_prompt
+from evals.architecture_design.tasks import item_record, load_architecture_dataset
+
+
+def _write_dataset(tmp_path, count=6):
+    (tmp_path / "diagrams").mkdir()
+    (tmp_path / "diagrams" / "item_1.png").write_bytes(b"png")
+    lines = []
+    for i in range(count):
+        record = {"id": f"item_{i}", "input": f"question {i}", "target": f"answer {i}"}
+        if i in (1, 2):
+            record["diagram_path"] = f"diagrams/item_{i}.png"
+        lines.append(json.dumps(record))
+    path = tmp_path / "items.jsonl"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def _to_sample(data):
+    return Sample(id=data["id"], input=data["input"], target=data["target"], metadata=data)
+
+
+class TestDatasetIndex:
+    """Test index building, caching and invalidation."""
+
+    def test_offsets_and_missing_diagrams(self, tmp_path):
+        """The index records ids, usable items and missing diagrams."""
+        path = _write_dataset(tmp_path)
+        index = get_index(path, tmp_path, cache_dir=tmp_path / "cache")
+        assert index.ids == [f"item_{i}" for i in range(6)]
+        assert [index.is_usable(i) for i in range(6)] == [True, True, False, True, True, True]
+        assert index.missing_diagrams == {"item_2": "diagrams/item_2.png"}
+        assert [data["id"] for _, data in index.read_records([4, 0])] == ["item_0", "item_4"]
+
+    def test_cache_reused_until_diagrams_change(self, tmp_path):
+        """The on-disk index is reused, and rebuilt when a diagram is added."""
+        path = _write_dataset(tmp_path)
+        cache_dir = tmp_path / "cache"
+        first = get_index(path, tmp_path, cache_dir=cache_dir)
+        assert len(list(cache_dir.iterdir())) == 1
+        assert get_index(path, tmp_path, cache_dir=cache_dir) is first
+
+        (tmp_path / "diagrams" / "item_2.png").write_bytes(b"png")
+        rebuilt = get_index(path, tmp_path, cache_dir=cache_dir)
+        assert rebuilt is not first
+        assert rebuilt.is_usable(2)
+
+    def test_samples_materialize_lazily(self, tmp_path):
+        """Slicing and indexing parse only the records they touch."""
+        path = _write_dataset(tmp_path)
+        index = get_index(path, tmp_path, cache_dir=None)
+        dataset = LazyArchitectureDataset(index, list(range(6)), _to_sample, name="items")
+        head = dataset[0:2]
+        assert dataset.materialized == 0
+        assert [sample.id for sample in head] == ["item_0", "item_1"]
+        assert dataset[4].target == "answer 4"
+        assert dataset.materialized == 3
+
+        filtered = dataset.filter(lambda sample: sample.id.endswith(("3", "5")))
+        assert [sample.id for sample in filtered] == ["item_3", "item_5"]
+
+
+class TestLoadArchitectureDataset:
+    """Test the task dataset loader."""
+
+    def test_limit_and_sample_ids(self):
+        """limit and sample_ids select items without reading the rest."""
+        dataset = load_architecture_dataset("architecture_interpretation.jsonl", limit=2)
+        assert [sample.id for sample in dataset] == ["arch_001", "arch_002"]
+        assert dataset.materialized == 2
+
+        dataset = load_architecture_dataset("architecture_interpretation.jsonl", sample_ids="arch_005,arch_002")
+        samples = list(dataset)
+        assert [sample.id for sample in samples] == ["arch_002", "arch_005"]
+        assert samples[0].metadata["id"] == "arch_002"
+
+    def test_metadata_is_projected(self):
+        """Samples carry only scoring fields; the full record is looked up by id."""
+        sample = next(iter(load_architecture_dataset("architecture_interpretation.jsonl", sample_ids="arch_002")))
+        record = item_record("arch_002")
+        assert "scoring_criteria" in record and "scoring_criteria" not in sample.metadata
+        assert "input" not in sample.metadata
+        assert sample.metadata["expected_flow"] == record["expected_flow"]
+        assert format_rubric_prompt(record["type"], record["subtype"], "r", sample.metadata) == (
+            format_rubric_prompt(record["type"], record["subtype"], "r", record)
+        )
+        assert item_record("missing") is None
@@ -9,8 +9,18 @@ from evals.architecture_design.diagram_validators import (
     extract_code_block,
     detect_format,
     check_required_components,
+    parse_mermaid_flowchart,
+    parse_plantuml,
+    DiagramParseError,
     ValidationResult,
 )
+from evals.architecture_design.json_extraction import (
+    balanced_spans,
+    extract_architecture_json,
+    find_json_array,
+    iter_json_objects,
+)
+from evals.architecture_design.response_analysis import ResponseAnalysis
 
 
 class TestCodeBlockExtraction:
@@ -189,6 +199,67 @@ sequenceDiagram
         assert result.format_detected == "mermaid"
 
 
+class TestMermaidGraph:
+    """Tests for the Mermaid flowchart graph parser."""
+
+    FLOWCHART = """flowchart LR
+    %% entry point
+    U((User)) -->|HTTPS| ALB[Application Load Balancer]
+    subgraph VPC[Production VPC]
+        ALB --> ASG[Auto Scaling Group] & Cache[(ElastiCache)]
+        ASG -- reads from --> DB[("Amazon RDS<br/>Multi-AZ")]
+    end
+    ASG -.-> Q>SQS Queue]; Q --> W
+    classDef db fill:#f96"""
+
+    def test_nodes_edges_and_subgraphs(self):
+        """Nodes, labeled edges, & groups and subgraphs are parsed once."""
+        graph = parse_mermaid_flowchart(self.FLOWCHART)
+        assert graph.direction == "LR"
+        assert set(graph.nodes) == {"U", "ALB", "ASG", "Cache", "DB", "Q", "W"}
+        assert graph.nodes["DB"].label == "Amazon RDS Multi-AZ"
+        assert graph.nodes["ASG"].group == "VPC"
+        assert graph.groups == {"VPC": "Production VPC"}
+        edges = {(e.source, e.target, e.label) for e in graph.edges}
+        assert ("U", "ALB", "HTTPS") in edges
+        assert ("ALB", "Cache", None) in edges
+        assert ("ASG", "DB", "reads from") in edges
+        assert ("Q", "W", None) in edges
+
+    def test_hyphenated_node_ids(self):
+        """Hyphens are part of an id, up to the link that follows it."""
+        graph = parse_mermaid_flowchart(
+            "flowchart LR\n web-server --> db-server\n web-server-->cache-1[Redis]\n api-gw-.->web-server"
+        )
+        assert set(graph.nodes) == {"web-server", "db-server", "cache-1", "api-gw"}
+        assert graph.nodes["cache-1"].label == "Redis"
+        edges = {(e.source, e.target) for e in graph.edges}
+        assert edges == {("web-server", "db-server"), ("web-server", "cache-1"), ("api-gw", "web-server")}
+
+    def test_unbalanced_brackets_raise(self):
+        """Brackets outside quoted labels must balance."""
+        with pytest.raises(DiagramParseError):
+            parse_mermaid_flowchart("flowchart TD\n    A[Web --> B")
+        graph = parse_mermaid_flowchart('flowchart TD\n    A["Web ]["] --> B')
+        assert graph.nodes["A"].label == "Web ]["
+
+    def test_graph_cached_on_result(self):
+        """A valid flowchart carries its parsed graph."""
+        result = validate_mermaid(f"```mermaid\n{self.FLOWCHART}\n```")
+        assert result.is_valid
+        assert result.graph is not None
+        assert len(result.graph.edges) == 6
+
+    def test_component_lookup_uses_nodes(self):
+        """Components match node ids/labels, not edge labels or comments."""
+        result = validate_mermaid(f"```mermaid\n{self.FLOWCHART}\n```")
+        all_present, missing = check_required_components(
+            result, ["Auto Scaling", "RDS", "elasticache", "Production VPC", "HTTPS", "entry point"]
+        )
+        assert not all_present
+        assert missing == ["HTTPS", "entry point"]
+
+
 class TestPlantUMLValidation:
     """Test PlantUML diagram validation."""
 
@@ -268,6 +339,83 @@ User --> [Web App]
         assert result.is_valid
 
 
+class TestPlantUMLGraph:
+    """Tests for the PlantUML graph parser."""
+
+    BODY = """left to right direction
+' User --> Ignored
+actor User
+cloud "AWS" as aws {
+    component "Web App" as web <<EC2>>
+    database "Aurora DB" as db
+    [API Gateway] as apigw
+}
+note right of web
+    Comment -- not an edge
+end note
+ELB(elb, "Load Balancer", "")
+Rel(elb, web, "HTTP")
+User --> apigw : HTTPS
+apigw -down-> web
+web ..> db : "SQL"
+[Cache] <-- web"""
+
+    def test_declarations_and_relationships(self):
+        """Declarations, containers, macros and arrows parse into one graph."""
+        graph = parse_plantuml(self.BODY)
+        assert graph.direction == "LR"
+        assert graph.groups == {"aws": "AWS"}
+        assert graph.nodes["db"].label == "Aurora DB"
+        assert graph.nodes["db"].kind == "database"
+        assert graph.nodes["web"].group == "aws"
+        assert graph.nodes["elb"].label == "Load Balancer"
+        edges = {(e.source, e.target, e.label) for e in graph.edges}
+        assert edges == {
+            ("elb", "web", "HTTP"),
+            ("User", "apigw", "HTTPS"),
+            ("apigw", "web", None),
+            ("web", "db", "SQL"),
+            ("web", "Cache", None),
+        }
+
+    def test_graph_metrics(self):
+        """Metrics report fan-out, orphans and tiers."""
+        graph = parse_plantuml(self.BODY + "\nqueue Orders")
+        metrics = graph.metrics()
+        assert metrics["max_fan_out"] == 2
+        assert metrics["max_fan_in"] == 2
+        assert metrics["orphans"] == ["Orders"]
+        assert metrics["tiers"] == 4
+
+    def test_component_lookup_uses_nodes(self):
+        """Components match PlantUML ids, labels and element kinds."""
+        text = f"```plantuml\n@startuml\n{self.BODY}\n@enduml\n```"
+        result = validate_plantuml(text)
+        assert result.is_valid
+        all_present, missing = check_required_components(
+            result, ["Load Balancer", "Aurora", "Database", "API Gateway", "SQL"]
+        )
+        assert missing == ["SQL"]
+
+    def test_json_graph(self):
+        """JSON architectures produce the same graph IR."""
+        text = """```json
+{"architecture": {
+  "components": [
+    {"id": "alb", "type": "load_balancer", "aws_service": "Elastic Load Balancing"},
+    {"id": "app", "type": "compute", "name": "App Servers"}
+  ],
+  "relationships": [{"from": "alb", "to": "app", "type": "http"}]
+}}
+```"""
+        result = validate_architecture_json(text)
+        assert result.is_valid
+        assert result.graph.format == "json"
+        assert [(e.source, e.target) for e in result.graph.edges] == [("alb", "app")]
+        all_present, missing = check_required_components(result, ["Load Balancing", "App Servers", "RDS"])
+        assert missing == ["RDS"]
+
+
 class TestJSONValidation:
     """Test JSON architecture validation."""
 
@@ -359,6 +507,52 @@ class TestJSONValidation:
         assert "2 component" in result.error_message.lower()
 
 
+class TestJSONExtraction:
+    """Test linear-time JSON extraction from free text."""
+
+    def test_balanced_spans_ignore_braces_in_strings(self):
+        """Braces inside JSON strings are not paired."""
+        text = 'x {"a": "}{", "b": {"c": 1}} {unclosed'
+        starts, ends = balanced_spans(text)
+        assert [text[s:ends[s]] for s in starts if s in ends] == ['{"a": "}{", "b": {"c": 1}}', '{"c": 1}']
+
+    def test_objects_inside_undecodable_prose(self):
+        """Objects nested in a brace span that isn't JSON are still found."""
+        text = 'Design {see below: {"architecture": {"components": []}}} and {"other": 1}'
+        values = [value for value, _, _ in iter_json_objects(text)]
+        assert values == [{"architecture": {"components": []}}, {"other": 1}]
+
+    def test_arrays_after_bracketed_prose(self):
+        """Brackets in prose and arrays the predicate rejects are skipped."""
+        text = 'Notes [a, b] and [1, 2] then [[{"x": 1}], oops [{"x": 2}] end [{"x": 3}]'
+        assert find_json_array(text, lambda items: items and isinstance(items[0], dict)) == [{"x": 2}]
+        assert find_json_array(text, lambda items: items == [1, 2]) == [1, 2]
+        assert find_json_array("[" * 50_000, bool) is None
+
+    def test_unfenced_architecture(self):
+        """Architecture JSON without a fence is validated."""
+        text = (
+            'Example {"note": "not it"}. Design: {"architecture": {"components": ['
+            '{"id": "a", "type": "compute"}, {"id": "b", "type": "storage"}]}} Done {x}.'
+        )
+        assert extract_architecture_json(text).startswith('{"architecture"')
+        result = validate_architecture_json(text)
+        assert result.is_valid
+
+    def test_unfenced_invalid_architecture_reports_syntax(self):
+        """An undecodable architecture object is returned for error reporting."""
+        text = 'Design: {"architecture": {"components": [}}'
+        result = validate_architecture_json(text)
+        assert not result.is_valid
+        assert "Invalid JSON syntax" in result.error_message
+
+    def test_adversarial_input_is_fast(self):
+        """Brace-heavy input that backtracks the old regex is scanned quickly."""
+        text = '{"architecture": {' * 20_000
+        assert extract_architecture_json(text) is None
+        assert [value for value, _, _ in iter_json_objects("{" * 50_000 + "}" * 50_000)] == [{}]
+
+
 class TestUnifiedValidation:
     """Test unified validation interface."""
 
@@ -403,6 +597,45 @@ flowchart TD
         assert "no structured format" in result.error_message.lower()
 
 
+class TestResponseAnalysis:
+    """Test the shared per-response analysis."""
+
+    TEXT = """The design uses three tiers. First requests reach the ALB.
+
+```mermaid
+flowchart TD
+    ALB[Load Balancer] --> EC2[Web Servers]
+```"""
+
+    def test_views_match_direct_computation(self):
+        """Each view equals the value the validators and scorers used to compute."""
+        analysis = ResponseAnalysis(self.TEXT)
+        assert analysis.lower == self.TEXT.lower()
+        assert analysis.word_count == len(self.TEXT.split())
+        assert analysis.sentences == self.TEXT.split(".")
+        assert analysis.detected_format == detect_format(self.TEXT)
+        assert analysis.code_block("mermaid") == extract_code_block(self.TEXT, "mermaid")
+
+    def test_code_blocks_are_memoized(self):
+        """A code block is extracted once per language."""
+        analysis = ResponseAnalysis(self.TEXT)
+        assert analysis.code_block("mermaid") is analysis.code_block("mermaid")
+        assert analysis.code_block("json") is None
+
+    def test_of_reuses_existing_analysis(self):
+        """Wrapping an analysis returns the same object."""
+        analysis = ResponseAnalysis(self.TEXT)
+        assert ResponseAnalysis.of(analysis) is analysis
+        assert ResponseAnalysis.of(self.TEXT).text == self.TEXT
+
+    def test_validation_accepts_analysis(self):
+        """Validating an analysis gives the same result as validating the text."""
+        assert validate_structured_output(ResponseAnalysis(self.TEXT), "mermaid") == (
+            validate_structured_output(self.TEXT, "mermaid")
+        )
+        assert not validate_structured_output(ResponseAnalysis("   ")).is_valid
+
+
 class TestComponentChecking:
     """Test required component checking."""
 
@@ -0,0 +1,80 @@
+"""Tests for item statistics across models."""
+
+import numpy as np
+import pandas as pd
+
+from aggregate_multi import sync_index
+from evals.architecture_design.tasks import _sample_metadata, item_record
+from item_analysis import item_stats, matrix_item_stats, summarize
+from score_index import ScoreIndex
+
+
+class TestItemStats:
+    """Test difficulty, discrimination and saturation."""
+
+    def test_matches_per_item_correlation(self):
+        """Discrimination is the correlation of the item with each model's score on the other items."""
+        rng = np.random.default_rng(0)
+        values = (rng.uniform(size=(6, 10)) < np.linspace(0.2, 0.9, 6)[:, None]).astype(float)
+        values[0, 3] = np.nan
+        stats = matrix_item_stats(values)
+        for item in range(10):
+            rows = ~np.isnan(values[:, item])
+            others = np.delete(values, item, axis=1)[rows]
+            expected = np.corrcoef(values[rows, item], np.nanmean(others, axis=1))[0, 1]
+            if np.isfinite(expected):
+                assert abs(stats["discrimination"][item] - expected) < 1e-9
+        assert stats["models"][3] == 5
+        assert abs(stats["p_value"][3] - np.nanmean(values[:, 3])) < 1e-12
+
+    def test_saturated_and_sparse_items(self):
+        """Items every model passes or fails are saturated; sparse items get no statistics."""
+        values = np.array([
+            [1.0, 0.0, 1.0, 1.0, 0.9],
+            [1.0, 0.0, 0.0, np.nan, 0.6],
+            [1.0, 0.0, 1.0, np.nan, 0.5],
+        ])
+        stats = matrix_item_stats(values, min_models=3)
+        assert stats["saturated"].tolist() == ["all_pass", "all_fail", None, None, "all_pass"]
+        assert np.isnan(stats["discrimination"][0])  # No variance
+        assert np.isnan(stats["p_value"][3])
+        assert stats["pass_rate"][2] == 2 / 3
+
+    def test_from_the_score_index(self, tmp_path, make_eval_log):
+        """Statistics come from the index's sample table, with the item metadata."""
+        metadata = [{"metadata": {"difficulty": d}} for d in ("easy", "medium", "hard")]
+        answers = {"a": ["C", "C", "C"], "b": ["C", "C", "I"], "c": ["C", "I", "I"]}
+        paths = [
+            str(make_eval_log(f"nightly-1/practice_exam_{m}", "practice_exam", f"openai/model-{m}", "choice",
+                              scores, metadata))
+            for m, scores in answers.items()
+        ]
+        with ScoreIndex(tmp_path / "index.sqlite") as index:
+            sync_index(index, str(tmp_path / "logs"), paths, workers=1)
+            stats = item_stats(index.sample_table(index.select()))
+        assert stats["sample_id"].tolist() == ["1", "2", "3"]
+        assert stats["difficulty"].tolist() == ["easy", "medium", "hard"]
+        assert stats["p_value"].tolist() == [1.0, 0.6667, 0.3333]
+        assert stats["saturated"].fillna("").tolist() == ["all_pass", "", ""]
+        assert stats["discrimination"].iloc[1:].tolist() == [0.5, 0.5]
+        assert summarize(stats).loc["practice_exam"].to_dict() == {
+            "items": 3, "all_pass": 1, "all_fail": 0, "negative_discrimination": 0, "median_discrimination": 0.5,
+        }
+        assert item_stats(pd.DataFrame(columns=["task", "sample_id", "model", "value"])).empty
+
+    def test_architecture_item_metadata(self, tmp_path, make_eval_log):
+        """Architecture items carry their dataset difficulty and domains."""
+        metadata = [_sample_metadata(item_record(item)) for item in ("arch_001", "arch_005")]
+        paths = [
+            str(make_eval_log(f"nightly-1/architecture-design_{m}", "architecture-design", f"openai/model-{m}",
+                              "architecture_scorer", scores, metadata))
+            for m, scores in {"a": [0.9, 0.6], "b": [0.7, 0.2], "c": [0.4, 0.1]}.items()
+        ]
+        with ScoreIndex(tmp_path / "index.sqlite") as index:
+            sync_index(index, str(tmp_path / "logs"), paths, workers=1)
+            stats = item_stats(index.sample_table(index.select()))
+        assert stats["sample_id"].tolist() == ["1", "2"]
+        assert stats["difficulty"].tolist() == ["beginner", "advanced"]
+        assert stats["subtype"].tolist() == [item_record("arch_001")["subtype"], item_record("arch_005")["subtype"]]
+        assert stats["domains"].tolist() == ["compute|database|networking", "compute|database"]
+        assert stats["p_value"].tolist() == [0.6667, 0.3]
@@ -0,0 +1,90 @@
+"""Tests for the lexical similarity index and scorer."""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from evals.architecture_design.lexical_similarity import COMBINED, LexicalIndex, tokenize
+from evals.architecture_design.tasks import item_record, lexical_index, lexical_similarity_scorer
+
+
+RECORDS = [
+    {
+        "id": "web",
+        "target": "An Application Load Balancer spreads traffic across EC2 instances backed by RDS.",
+        "expected_flow": ["Users reach the load balancer", "EC2 instances query RDS"],
+    },
+    {
+        "id": "stream",
+        "target": "Kinesis ingests events that Lambda processes into DynamoDB.",
+        "potential_improvements": ["Add a dead letter queue"],
+    },
+    {"id": "empty", "target": ""},
+]
+
+
+def _dense_cosine(index, item_id, field, response):
+    row = index.item_rows[item_id][field]
+    start, end = index.rows.indptr[row], index.rows.indptr[row + 1]
+    reference = np.zeros(len(index.vocabulary))
+    reference[index.rows.indices[start:end]] = index.rows.data[start:end]
+    query = index._vectorize([tokenize(response)], length_normalize=False)
+    dense = np.zeros(len(index.vocabulary))
+    dense[query.indices] = query.data
+    return float(reference @ dense)
+
+
+class TestLexicalIndex:
+    """Test indexing and batched cosine scoring."""
+
+    def test_rows_per_field_and_item(self):
+        """Each item has a row per non-empty reference field plus a combined row."""
+        index = LexicalIndex(RECORDS)
+        assert len(index) == 2
+        assert set(index.item_rows["web"]) == {"target", "expected_flow", COMBINED}
+        assert set(index.item_rows["stream"]) == {"target", "potential_improvements", COMBINED}
+
+    def test_batch_matches_dense_cosine(self):
+        """Vectorized batch scores equal a dense dot product of the normalized rows."""
+        index = LexicalIndex(RECORDS)
+        responses = [
+            "Traffic goes through a load balancer to EC2 and then RDS.",
+            "Use Kinesis with Lambda, writing to DynamoDB.",
+            "Kinesis and Lambda with DynamoDB, plus unrelated words about gardening.",
+        ]
+        results = index.score_batch(["web", "stream", "stream"], responses)
+        for item_id, response, result in zip(["web", "stream", "stream"], responses, results):
+            for field, value in result.items():
+                assert value == pytest.approx(_dense_cosine(index, item_id, field, response), abs=1e-6)
+        assert results[1][COMBINED] > results[2][COMBINED] > 0
+        assert results[0][COMBINED] > index.score_batch(["web"], responses[1:2])[0][COMBINED]
+
+    def test_unknown_item_and_unrelated_response(self):
+        """Unknown items return None; responses sharing no terms score zero."""
+        index = LexicalIndex(RECORDS)
+        assert index.score_batch(["missing", "web"], ["anything", "zzz qqq"]) == [
+            None,
+            {"target": 0.0, "expected_flow": 0.0, COMBINED: 0.0},
+        ]
+
+    def test_scorer_on_dataset(self):
+        """The scorer rates an item's own reference above another item's."""
+        scorer = lexical_similarity_scorer()
+        own = lexical_index().item_rows["arch_001"]
+        assert own
+
+        def state(item_id, text):
+            return SimpleNamespace(
+                sample=None,
+                sample_id=item_id,
+                metadata={"id": item_id, "type": "diagram_interpretation"},
+                output=SimpleNamespace(completion=text),
+            )
+
+        target = item_record("arch_001")["target"]
+        matching = asyncio.run(scorer(state("arch_001", target), None))
+        other = asyncio.run(scorer(state("arch_002", target), None))
+        assert matching.value > 0.9 > other.value
+        assert matching.metadata["similarity"]["target"] > 0.9
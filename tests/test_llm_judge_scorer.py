@@ -1,14 +1,25 @@
 """Tests for the LLM-as-judge architecture scorer."""
 
+import asyncio
+import json
+from types import SimpleNamespace
+
 import pytest
 from evals.architecture_design.tasks import (
+    JudgeBatcher,
+    JudgeDraw,
+    JudgeEnsemble,
+    _call_judge,
+    _parse_batch_judge_response,
     _parse_judge_response,
     _check_anti_gaming,
     _apply_deterministic_checks,
+    _item_keywords,
 )
 from evals.architecture_design.judge_prompts import (
     get_rubric_prompt,
     format_rubric_prompt,
+    format_rubric_prompt_parts,
     get_hidden_criteria,
     get_all_subtypes,
 )
@@ -33,6 +44,16 @@ class TestJudgeResponseParsing:
         assert result["accuracy"] == 0.6
         assert result["completeness"] == 0.8
 
+    def test_parse_json_with_braces_in_reasoning(self):
+        """Braces inside strings and surrounding prose don't break extraction."""
+        response = (
+            'Scores follow {see rubric}:\n'
+            '{"accuracy": 0.9, "completeness": 0.4, "quality": 0.6, "reasoning": "uses {placeholders}"}'
+        )
+        result = _parse_judge_response(response)
+        assert result["completeness"] == 0.4
+        assert result["reasoning"] == "uses {placeholders}"
+
     def test_parse_malformed_json_extracts_scores(self):
         """Extract scores from malformed JSON-like text."""
         response = '"accuracy": 0.5, "completeness": 0.6, "quality": 0.7 blah blah'
@@ -143,6 +164,76 @@ class TestRubricPrompts:
         assert rubric is None
 
 
+class TestCachedRubricLayout:
+    """Test the cache-friendly rubric prompt layout."""
+
+    eval_data = {
+        "expected_security_components": ["Security Groups", "AWS WAF"],
+        "potential_improvements": ["Enable GuardDuty"],
+    }
+
+    def test_prefix_is_independent_of_response(self):
+        """Two responses to the same item share the whole prefix."""
+        a = format_rubric_prompt_parts(
+            "diagram_interpretation", "security_assessment", "First answer", self.eval_data
+        )
+        b = format_rubric_prompt_parts(
+            "diagram_interpretation", "security_assessment", "Second answer", self.eval_data
+        )
+        assert a.prefix == b.prefix
+        assert "First answer" not in a.prefix
+        assert "First answer" in a.response
+
+    def test_rubric_is_static_per_subtype(self):
+        """The rubric part doesn't depend on item reference data."""
+        a = format_rubric_prompt_parts("diagram_interpretation", "security_assessment", "x", self.eval_data)
+        b = format_rubric_prompt_parts("diagram_interpretation", "security_assessment", "x", {})
+        assert a.rubric == b.rubric
+        assert "Scoring Guidance" in a.rubric
+        assert "AWS WAF" in a.reference
+        assert "AWS WAF" not in a.rubric
+
+    def test_render_keeps_all_content(self):
+        """The cached layout carries the same content as the inline prompt."""
+        parts = format_rubric_prompt_parts(
+            "diagram_interpretation", "security_assessment", "My response", self.eval_data
+        )
+        inline = format_rubric_prompt(
+            "diagram_interpretation", "security_assessment", "My response", self.eval_data
+        )
+        rendered = parts.render()
+        assert rendered.endswith("My response\n")
+        assert sorted(rendered.split()) == sorted(inline.split())
+
+    def test_unknown_subtype_returns_none(self):
+        """Unknown subtypes have no parts."""
+        assert format_rubric_prompt_parts("unknown_type", "unknown_subtype", "x", {}) is None
+
+    def test_call_judge_puts_prefix_in_system_message(self):
+        """Cached layout sends the stable prefix as system prompt and records cached tokens."""
+        captured = {}
+
+        class CachingModel:
+            async def generate(self, input, config):
+                captured["messages"] = input
+                captured["config"] = config
+                usage = SimpleNamespace(input_tokens_cache_read=1200)
+                return SimpleNamespace(
+                    completion='{"accuracy": 0.9, "completeness": 0.8, "quality": 0.7}', usage=usage
+                )
+
+        parts = format_rubric_prompt_parts(
+            "diagram_interpretation", "security_assessment", "My response", self.eval_data
+        )
+        result = asyncio.run(_call_judge(CachingModel(), parts, cache_prompt=True))
+
+        system, user = captured["messages"]
+        assert "AWS WAF" in system.content
+        assert user.content == parts.response
+        assert captured["config"].cache_prompt is True
+        assert result["cached_tokens"] == 1200
+
+
 class TestHiddenCriteria:
     """Test hidden criteria functionality."""
 
@@ -209,6 +300,36 @@ class TestDeterministicChecks:
         assert accuracy > 0, "Should match flow steps"
         assert completeness > 0, "Should have flow indicators"
 
+    def test_compiled_keywords_match_phrase_and_word_rules(self):
+        """Compiled groups keep whole-phrase and first-N-word matching per field."""
+        keywords = _item_keywords({
+            "expected_flow": ["User sends request to Load Balancer"],
+            "expected_security_components": ["AWS WAF"],
+            "architectural_principles": ["Loose coupling between tiers"],
+        })
+
+        assert keywords["expected_flow"] == (("user", "sends", "request"),)
+        assert keywords["expected_security_components"] == (("aws waf",),)
+        assert keywords["architectural_principles"] == (("loose", "coupling", "between", "tiers"),)
+        assert keywords["cost_factors"] == ()
+
+    def test_compiled_keywords_recompile_when_item_changes(self):
+        """A reused item id with different phrases must not score from stale groups."""
+        eval_data = {
+            "id": "test_keyword_cache",
+            "type": "diagram_creation",
+            "subtype": "requirements_to_architecture",
+            "expected_components": ["Amazon SQS"],
+        }
+        response = "Orders are queued in Amazon SQS before processing."
+
+        first = _apply_deterministic_checks(response, eval_data, "requirements_to_architecture")
+        assert first[0] == 1.0
+
+        changed = dict(eval_data, expected_components=["Amazon Kinesis"])
+        second = _apply_deterministic_checks(response, changed, "requirements_to_architecture")
+        assert second[0] == 0.0
+
     def test_unknown_type_returns_moderate_scores(self):
         """Unknown types should return moderate default scores."""
         eval_data = {"type": "unknown_type"}
@@ -221,3 +342,196 @@ class TestDeterministicChecks:
         assert accuracy == 0.5
         assert completeness == 0.5
         assert quality == 0.5
+
+
+class FakeJudgeModel:
+    """Judge model stub that records requests and replies with canned completions."""
+
+    def __init__(self, batch_reply=None):
+        self.batch_reply = batch_reply
+        self.requests = []
+
+    async def generate(self, input, config):
+        prompt = input[-1].content
+        self.requests.append(prompt)
+        if prompt.startswith("Evaluate the following"):
+            count = prompt.count("# Item ")
+            reply = self.batch_reply(count) if self.batch_reply else "not json"
+        else:
+            reply = '{"accuracy": 0.4, "completeness": 0.4, "quality": 0.4, "reasoning": "single"}'
+        return SimpleNamespace(completion=reply)
+
+
+def _batch_reply(count):
+    return json.dumps(
+        [
+            {"item": i, "accuracy": i / 10, "completeness": 0.5, "quality": 0.5, "reasoning": "batched"}
+            for i in range(1, count + 1)
+        ]
+    )
+
+
+class TestJudgeBatching:
+    """Test batched judge requests and their fallback."""
+
+    def test_parse_batch_response(self):
+        """Parse a JSON array with one score object per item."""
+        result = _parse_batch_judge_response("Scores:\n" + _batch_reply(3), 3)
+        assert [item["accuracy"] for item in result] == [0.1, 0.2, 0.3]
+
+    def test_parse_batch_reorders_by_item_number(self):
+        """Items returned out of order are matched back by their item number."""
+        items = json.loads(_batch_reply(2))[::-1]
+        result = _parse_batch_judge_response(json.dumps(items), 2)
+        assert [item["item"] for item in result] == [1, 2]
+
+    def test_parse_batch_skips_brackets_in_prose(self):
+        """Brackets and short lists before the score array don't stop parsing."""
+        reply = "Per the rubric [see above], items [1, 2] were scored:\n" + _batch_reply(2) + "\n[done]"
+        result = _parse_batch_judge_response(reply, 2)
+        assert [item["accuracy"] for item in result] == [0.1, 0.2]
+
+    def test_parse_batch_wrong_count_returns_none(self):
+        """A batch reply that doesn't cover every item can't be split back."""
+        assert _parse_batch_judge_response(_batch_reply(2), 3) is None
+        assert _parse_batch_judge_response("no scores here", 1) is None
+
+    def test_batcher_groups_same_subtype(self):
+        """Prompts of the same type/subtype share one judge request."""
+        model = FakeJudgeModel(batch_reply=_batch_reply)
+        batcher = JudgeBatcher(model, max_batch_size=3, max_wait=0.01)
+        key = ("diagram_interpretation", "service_identification")
+
+        async def run():
+            return await asyncio.gather(*(batcher.judge(key, f"prompt {i}") for i in range(3)))
+
+        results = asyncio.run(run())
+        assert len(model.requests) == 1
+        assert [r["accuracy"] for r in results] == [0.1, 0.2, 0.3]
+        assert all(r["batch_size"] == 3 for r in results)
+
+    def test_batch_cached_tokens_split_across_items(self):
+        """A batched request's cached tokens are counted once in total, not once per item."""
+        model = FakeJudgeModel(batch_reply=_batch_reply)
+        generate = model.generate
+
+        async def caching_generate(input, config):
+            result = await generate(input, config)
+            return SimpleNamespace(completion=result.completion,
+                                   usage=SimpleNamespace(input_tokens_cache_read=1000))
+
+        model.generate = caching_generate
+        batcher = JudgeBatcher(model, max_batch_size=3, max_wait=0.01)
+        key = ("diagram_interpretation", "service_identification")
+
+        async def run():
+            return await asyncio.gather(*(batcher.judge(key, f"prompt {i}") for i in range(3)))
+
+        results = asyncio.run(run())
+        assert [r["cached_tokens"] for r in results] == [334, 333, 333]
+
+    def test_batcher_separates_subtypes(self):
+        """Prompts of different subtypes are never mixed in one batch."""
+        model = FakeJudgeModel(batch_reply=_batch_reply)
+        batcher = JudgeBatcher(model, max_batch_size=4, max_wait=0.01)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.judge(("diagram_interpretation", "service_identification"), "a"),
+                batcher.judge(("diagram_interpretation", "security_assessment"), "b"),
+            )
+
+        asyncio.run(run())
+        assert model.requests == ["a", "b"]
+
+    def test_batcher_falls_back_to_single_calls(self):
+        """An unparseable batch reply is re-judged one prompt at a time."""
+        model = FakeJudgeModel(batch_reply=None)
+        batcher = JudgeBatcher(model, max_batch_size=2, max_wait=0.01)
+        key = ("diagram_creation", "problem_solving")
+
+        async def run():
+            return await asyncio.gather(batcher.judge(key, "x"), batcher.judge(key, "y"))
+
+        results = asyncio.run(run())
+        assert len(model.requests) == 3  # one failed batch + two single calls
+        assert all(r["reasoning"] == "single" for r in results)
+        assert all("batch_size" not in r for r in results)
+
+
+class ScriptedJudge:
+    """Judge model stub replying with a fixed score (or raising) after a delay."""
+
+    def __init__(self, score, delay=0.0):
+        self.score = score
+        self.delay = delay
+        self.calls = 0
+        self.answered = 0
+
+    async def generate(self, input, config):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        self.answered += 1
+        if self.score is None:
+            raise RuntimeError("judge unavailable")
+        return SimpleNamespace(
+            completion=json.dumps(
+                {"accuracy": self.score, "completeness": self.score, "quality": self.score,
+                 "reasoning": f"scored {self.score}"}
+            )
+        )
+
+
+def _ensemble(*judges, **kwargs):
+    draws = [JudgeDraw(f"judge-{i}", judge) for i, judge in enumerate(judges)]
+    return JudgeEnsemble(draws, **kwargs)
+
+
+class TestJudgeEnsemble:
+    """Test concurrent ensemble judging and its early exit."""
+
+    def test_agreeing_pair_cancels_remaining_judges(self):
+        """When the first two judges agree, the other calls are cancelled and left out."""
+        third = ScriptedJudge(0.1, delay=0.2)
+        ensemble = _ensemble(ScriptedJudge(0.8), ScriptedJudge(0.85), third, agreement=0.1)
+        result = asyncio.run(ensemble.judge("prompt"))
+        assert third.calls == 1 and third.answered == 0
+        assert result["ensemble"]["early_exit"]
+        assert result["accuracy"] == pytest.approx(0.825)
+        assert len(result["ensemble"]["judges"]) == 2
+
+    def test_disagreement_calls_all_and_takes_median(self):
+        """Disagreeing judges bring in the rest; the median resists the outlier."""
+        ensemble = _ensemble(ScriptedJudge(0.9), ScriptedJudge(0.2), ScriptedJudge(0.8), agreement=0.1)
+        result = asyncio.run(ensemble.judge("prompt"))
+        assert not result["ensemble"]["early_exit"]
+        assert result["quality"] == pytest.approx(0.8)
+        assert result["ensemble"]["spread"]["quality"] == pytest.approx(0.7)
+        assert result["reasoning"] == "scored 0.8"
+
+    def test_trimmed_mean_and_failed_judges(self):
+        """Failed calls are left out of the aggregate but recorded."""
+        judges = [ScriptedJudge(None), ScriptedJudge(0.6), ScriptedJudge(0.2), ScriptedJudge(0.4), ScriptedJudge(1.0)]
+        result = asyncio.run(_ensemble(*judges, aggregate="trimmed_mean").judge("prompt"))
+        assert result["accuracy"] == pytest.approx(0.5)
+        assert [j["failed"] for j in result["ensemble"]["judges"]] == [True, False, False, False, False]
+
+    def test_judges_run_concurrently(self):
+        """All judges are called at once, so agreeing or not costs one judge's latency."""
+
+        async def timed(*scores):
+            ensemble = _ensemble(*(ScriptedJudge(score, delay=0.2) for score in scores), agreement=0.1)
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            result = await ensemble.judge("prompt")
+            return result["ensemble"]["early_exit"], loop.time() - started
+
+        early_exit, elapsed = asyncio.run(timed(0.7, 0.7, 0.7))
+        assert early_exit and elapsed < 0.35
+        early_exit, elapsed = asyncio.run(timed(0.9, 0.2, 0.7))
+        assert not early_exit and elapsed < 0.35
+
+    def test_unknown_aggregate(self):
+        """Unknown aggregate methods are rejected."""
+        with pytest.raises(ValueError):
+            _ensemble(ScriptedJudge(0.5), aggregate="mode")
@@ -0,0 +1,92 @@
+"""Tests for the judge agreement measurement script."""
+
+import asyncio
+import csv
+import json
+
+import measure_judge_agreement as mja
+
+
+def _ground_truth_judge(calls):
+    """Fake judge call that returns each sample's ground truth."""
+
+    async def run_judge_on_sample(judge_model, sample, batcher=None):
+        calls.append(sample["id"])
+        return {**sample["ground_truth"], "reasoning": "matches"}
+
+    return run_judge_on_sample
+
+
+class TestJudgeCache:
+    """Test the JSONL judge result cache."""
+
+    def test_round_trip(self, tmp_path):
+        """Results written by one cache are read back by the next."""
+        path = tmp_path / "cache.jsonl"
+        key = mja.JudgeCache.key("judge/a", "prompt", 0, "single,inline")
+        mja.JudgeCache(path).put(key, {"accuracy": 0.9}, model="judge/a", run=0)
+
+        cache = mja.JudgeCache(path)
+        assert cache.get(key) == {"accuracy": 0.9}
+        assert cache.hits == 1
+
+    def test_key_depends_on_model_prompt_run_and_mode(self):
+        """Different models, prompts, runs or judging modes never share a cache entry."""
+        keys = {
+            mja.JudgeCache.key("judge/a", "prompt", 0, "single,inline"),
+            mja.JudgeCache.key("judge/b", "prompt", 0, "single,inline"),
+            mja.JudgeCache.key("judge/a", "other", 0, "single,inline"),
+            mja.JudgeCache.key("judge/a", "prompt", 1, "single,inline"),
+            mja.JudgeCache.key("judge/a", "prompt", 0, "single,cached"),
+            mja.JudgeCache.key("judge/a", "prompt", 0, "batch=4"),
+        }
+        assert len(keys) == 6
+        assert mja.judge_mode(batch_size=4, layout="cached") == "batch=4"
+        assert mja.judge_mode(batch_size=1, layout="cached") == "single,cached"
+
+    def test_failed_calls_not_cached(self, tmp_path):
+        """Neutral scores from a failed judge call are retried next time."""
+        path = tmp_path / "cache.jsonl"
+        cache = mja.JudgeCache(path)
+        cache.put("k", {"accuracy": 0.5, "reasoning": "Error: timeout"})
+        assert cache.get("k") is None
+        assert not path.exists()
+
+
+class TestMeasureAgreement:
+    """Test the concurrent, cached agreement run."""
+
+    def test_multiple_models_and_reports(self, tmp_path, monkeypatch):
+        """Each model gets a report; reruns are served from the cache."""
+        calls = []
+        monkeypatch.setattr(mja, "run_judge_on_sample", _ground_truth_judge(calls))
+        samples = mja.load_calibration_data()
+        cache_path = tmp_path / "cache.jsonl"
+        models = ["mockllm/model", "mockllm/other"]
+
+        reports = asyncio.run(
+            mja.measure_agreement(models, num_runs=2, cache_path=cache_path, verbose=False)
+        )
+        assert len(calls) == 2 * 2 * len(samples)
+        assert [r["model"] for r in reports] == models
+        for report in reports:
+            assert report["agreement_rate"] == 100.0
+            assert report["passed"]
+            assert report["mae"] == {"accuracy": 0, "completeness": 0, "quality": 0}
+
+        calls.clear()
+        asyncio.run(mja.measure_agreement(models, num_runs=2, cache_path=cache_path, verbose=False))
+        assert calls == []
+
+        # A batched run doesn't reuse the unbatched results
+        monkeypatch.setattr(mja, "BATCH_SIZE", 4)
+        asyncio.run(mja.measure_agreement(models, num_runs=2, cache_path=cache_path, verbose=False))
+        assert len(calls) == 2 * 2 * len(samples)
+
+        mja.write_json_report(reports, tmp_path / "report.json")
+        mja.write_csv_report(reports, tmp_path / "report.csv")
+        assert len(json.loads((tmp_path / "report.json").read_text())["models"]) == 2
+        with open(tmp_path / "report.csv") as f:
+            rows = list(csv.DictReader(f))
+        assert [row["model"] for row in rows] == models
+        assert float(rows[0]["agreement_rate"]) == 100.0
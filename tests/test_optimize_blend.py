@@ -0,0 +1,90 @@
+"""Tests for the blend weight / score modifier optimizer."""
+
+import numpy as np
+
+import optimize_blend as ob
+from evals.architecture_design.diagram_validators import ValidationResult
+from evals.architecture_design.tasks import (
+    DEFAULT_SCORE_MODIFIERS,
+    ScoreModifiers,
+    _anti_gaming_factor,
+    _apply_validation_modifier,
+)
+
+DIMS = ("accuracy", "completeness", "quality")
+
+
+def _rows():
+    """Samples covering each anti-gaming and validation branch."""
+    return [
+        {"id": "plain", "judge": [0.8, 0.7, 0.9], "deterministic": [0.5, 0.4, 0.6],
+         "signals": {"criteria_ratio": 0.5, "short": False, "repetitive": False},
+         "validated": False, "valid": False, "missing_ratio": 0.0, "ground_truth": [0.8, 0.7, 0.9]},
+        {"id": "short", "judge": [0.6, 0.5, 0.4], "deterministic": [0.2, 0.3, 0.1],
+         "signals": {"criteria_ratio": 0.0, "short": True, "repetitive": False},
+         "validated": True, "valid": False, "missing_ratio": 0.0, "ground_truth": [0.3, 0.3, 0.3]},
+        {"id": "valid", "judge": [0.9, 0.9, 0.98], "deterministic": [0.7, 0.8, 0.9],
+         "signals": {"criteria_ratio": 1.0, "short": False, "repetitive": True},
+         "validated": True, "valid": True, "missing_ratio": 0.25, "ground_truth": [0.9, 0.9, 0.9]},
+    ]
+
+
+def _scalar_pipeline(row, blend, modifiers):
+    """Reference: the llm_judge_scorer steps applied one sample at a time."""
+    scores = {
+        dim: (1.0 - blend) * j + blend * d
+        for dim, j, d in zip(DIMS, row["judge"], row["deterministic"])
+    }
+    factor = _anti_gaming_factor(row["signals"], modifiers)
+    scores = {dim: v * factor for dim, v in scores.items()}
+    if row["validated"]:
+        expected = ["a", "b", "c", "d"]
+        missing = expected[: int(row["missing_ratio"] * len(expected))]
+        result = ValidationResult(is_valid=row["valid"], format_detected="mermaid",
+                                  extracted_content=" ".join(set(expected) - set(missing)))
+        scores, _ = _apply_validation_modifier(scores, result, True, expected, modifiers)
+    return [max(0.0, min(1.0, scores[dim])) for dim in DIMS]
+
+
+class TestApplySettings:
+    """Test the vectorized blend/modifier pipeline."""
+
+    def test_matches_scorer_for_several_settings(self):
+        """Broadcast scores equal the scorer's per-sample computation."""
+        inputs = ob._build_inputs(_rows(), with_ground_truth=True)
+        settings = [
+            (0.3, DEFAULT_SCORE_MODIFIERS),
+            (0.0, ScoreModifiers(0.2, 0.6, 0.7, 0.1, 0.3, 0.2)),
+            (1.0, ScoreModifiers(0.0, 1.0, 1.0, 0.0, 0.0, 0.0)),
+        ]
+        grid = {
+            name: np.array([
+                blend if name == "blend_deterministic" else getattr(modifiers, name)
+                for blend, modifiers in settings
+            ])
+            for name in ob.GRID
+        }
+        scores = ob.apply_settings(inputs, grid)
+        for p, (blend, modifiers) in enumerate(settings):
+            for n, row in enumerate(_rows()):
+                np.testing.assert_allclose(scores[p, n], _scalar_pipeline(row, blend, modifiers))
+
+    def test_criteria_bonus_capped(self):
+        """A large hidden-criteria bonus lifts the factor to at most 1.1 before other penalties."""
+        modifiers = ScoreModifiers(hidden_criteria_bonus=0.3)
+        signals = {"criteria_ratio": 1.0, "short": True, "repetitive": False}
+        assert _anti_gaming_factor(signals, modifiers) == 1.1 * modifiers.short_response_factor
+        row = {**_rows()[0], "signals": signals}
+        inputs = ob._build_inputs([row], with_ground_truth=True)
+        scores = ob.apply_settings(inputs, ob.settings_grid(0.3, modifiers))
+        np.testing.assert_allclose(scores[0, 0], _scalar_pipeline(row, 0.3, modifiers))
+
+    def test_search_ranks_by_agreement_then_mae(self):
+        """The best configuration has the highest agreement and reports its MAE."""
+        inputs = ob._build_inputs(_rows(), with_ground_truth=True)
+        count, best = ob.search(inputs, top=3)
+        assert count == np.prod([len(v) for v in ob.GRID.values()])
+        assert best[0]["agreement_rate"] >= best[-1]["agreement_rate"]
+        top = best[0]
+        grid = {name: np.array([value]) for name, value in top["settings"].items()}
+        assert ob.describe(inputs, grid)["mae"] == top["mae"]
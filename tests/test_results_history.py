@@ -0,0 +1,116 @@
+"""Tests for the longitudinal results history."""
+
+import pandas as pd
+
+import results_history
+from results_history import ResultsHistory, run_scores
+
+WEIGHTS = {"practice_exam": 0.5, "cdk_synth": 0.5}
+
+
+def _night(day, scores, month=10):
+    """Sample table rows of one nightly run: {(model, task): [values]}."""
+    created = f"2026-{month:02d}-{day:02d}T02:00:00+00:00"
+    rows = [
+        {"run": f"nightly-{month}-{day}", "created": created, "log": f"/logs/nightly-{month}-{day}/{model}-{task}.eval",
+         "model": model, "task": task, "sample_id": str(i), "epoch": 1, "value": value}
+        for (model, task), values in scores.items()
+        for i, value in enumerate(values)
+    ]
+    return pd.DataFrame(rows)
+
+
+class TestRunScores:
+    """Test per-run scoring."""
+
+    def test_task_and_overall_scores(self):
+        """Task scores average duplicate logs; the overall weights tasks, missing ones as 0."""
+        items = _night(1, {("a", "practice_exam"): [1, 1, 0, 0], ("a", "cdk_synth"): [1, 0]})
+        extra = items[items["task"] == "cdk_synth"].assign(log="/logs/other.eval", value=1.0)
+        scores = run_scores(pd.concat([items, extra]), WEIGHTS).set_index(["model", "task"])["score"]
+        assert scores[("a", "cdk_synth")] == 0.75
+        assert scores[("a", "overall")] == 0.625
+
+
+class TestResultsHistory:
+    """Test appending, compaction and queries."""
+
+    def test_append_is_incremental_and_compaction_preserves_results(self, tmp_path, monkeypatch):
+        """Appends add segments; compaction merges them into monthly partitions with identical results."""
+        monkeypatch.setattr(results_history, "COMPACT_AFTER", 100)
+        history = ResultsHistory(tmp_path / "history")
+        history.append(_night(30, {("a", "cdk_synth"): [1, 1]}, month=9), WEIGHTS)
+        history.append(_night(1, {("a", "cdk_synth"): [1, 0]}), WEIGHTS)
+        # A late log of the same run rescores it
+        history.append(_night(1, {("b", "cdk_synth"): [0, 0]}).assign(log="/logs/late.eval"), WEIGHTS)
+        assert len(history.segments()) == 6
+        assert history.new_logs({"/logs/late.eval": "", "/logs/new.eval": ""}) == ["/logs/new.eval"]
+
+        before_scores, before_items = history.scores(), history.items()
+        assert history.compact() == 6
+        assert history.segments() == []
+        assert sorted(p.name.split(".")[0] for p in (tmp_path / "history" / "items").iterdir()) == [
+            "month=2026-09", "month=2026-10",
+        ]
+        pd.testing.assert_frame_equal(history.scores(), before_scores, check_dtype=False)
+        pd.testing.assert_frame_equal(history.items(), before_items, check_dtype=False)
+        assert set(history.scores(since="2026-10-01")["model"]) == {"a", "b"}
+        assert len(history.items(since="2026-10-01")) == 4
+
+    def test_append_rescores_from_log_sums(self, tmp_path, monkeypatch):
+        """Appends rescore runs without reading items; a log appended again replaces its results."""
+        history = ResultsHistory(tmp_path / "history")
+        night = _night(1, {("a", "cdk_synth"): [1, 0], ("a", "practice_exam"): [1]})
+        cdk = night[night["task"] == "cdk_synth"]
+        log = cdk["log"].iloc[0]
+        history.append(night, WEIGHTS, {path: "v1" for path in night["log"]})
+        assert history.new_logs({log: "v1"}) == []
+        assert history.new_logs({log: "v2"}) == [log]
+
+        def no_items(table, months=None):
+            raise AssertionError(f"read {table}")
+
+        monkeypatch.setattr(history, "_load", no_items)
+        grown = pd.concat([cdk, cdk.iloc[:1].assign(sample_id="2")])  # The log grew by a passing sample
+        history.append(grown, WEIGHTS, {log: "v2"})
+        monkeypatch.undo()
+
+        assert history.new_logs({log: "v2"}) == []
+        scores = history.scores()
+        assert scores.set_index("task")["score"].to_dict() == {
+            "cdk_synth": 0.6667, "overall": 0.8334, "practice_exam": 1.0,
+        }
+        expected = run_scores(pd.concat([night[night["task"] != "cdk_synth"], grown]), WEIGHTS)
+        pd.testing.assert_frame_equal(scores.reset_index(drop=True), expected, check_dtype=False)
+
+    def test_automatic_compaction(self, tmp_path, monkeypatch):
+        """History compacts itself once enough segments pile up."""
+        monkeypatch.setattr(results_history, "COMPACT_AFTER", 2)
+        history = ResultsHistory(tmp_path / "history")
+        for day in (1, 2):
+            history.append(_night(day, {("a", "cdk_synth"): [1]}), WEIGHTS)
+        assert history.segments() == []
+        assert len(history.scores()) == 4
+
+    def test_trend_and_regressions(self, tmp_path):
+        """Trends are per run in date order; regressions compare against a week earlier."""
+        history = ResultsHistory(tmp_path / "history")
+        nights = {
+            1: {("a", "cdk_synth"): [1, 1, 1, 1], ("b", "cdk_synth"): [1, 1, 0, 0]},
+            5: {("a", "cdk_synth"): [1, 1, 1, 0], ("b", "cdk_synth"): [1, 1, 0, 0]},
+            9: {("a", "cdk_synth"): [1, 1, 0, 0], ("b", "cdk_synth"): [1, 1, 1, 0]},
+        }
+        for day, scores in nights.items():
+            history.append(_night(day, scores), WEIGHTS)
+
+        trend = history.trend("cdk_synth")
+        assert trend.index.tolist() == ["nightly-10-1", "nightly-10-5", "nightly-10-9"]
+        assert trend["a"].tolist() == [1.0, 0.75, 0.5]
+
+        drops = history.regressions(threshold=0.03, days=7, task="cdk_synth")
+        assert drops[["model", "baseline_run", "run", "change"]].values.tolist() == [
+            ["a", "nightly-10-1", "nightly-10-9", -0.5],
+        ]
+        # Against the run 4 days earlier, the drop is smaller
+        assert history.regressions(threshold=0.03, days=4, task="cdk_synth")["change"].tolist() == [-0.25]
+        assert history.regressions(threshold=0.3, days=4).empty
@@ -0,0 +1,81 @@
+"""Tests for the schema registry and the batch output validator."""
+
+import json
+
+import jsonschema
+import pytest
+
+from evals.schema_registry import format_error, get_validator, load_schema, schema_errors, validate
+from validate_outputs import summarise, validate_leaderboard_file, validate_response
+
+
+ARCHITECTURE = {
+    "architecture": {
+        "components": [
+            {"id": "alb", "type": "load_balancer"},
+            {"id": "app", "type": "compute"},
+        ],
+    },
+}
+
+
+class TestSchemaRegistry:
+    """Test loading, caching and error collection."""
+
+    def test_validator_is_built_once(self):
+        """The same compiled validator is reused across calls."""
+        assert get_validator("architecture") is get_validator("architecture")
+        assert load_schema("architecture")["required"] == ["architecture"]
+
+    def test_validate_raises_like_jsonschema(self):
+        """validate raises the same best-match error as jsonschema.validate."""
+        invalid = {"architecture": {"components": [{"id": 1}]}}
+        with pytest.raises(jsonschema.ValidationError) as registry_error:
+            validate("architecture", invalid)
+        with pytest.raises(jsonschema.ValidationError) as direct_error:
+            jsonschema.validate(invalid, load_schema("architecture"))
+        assert registry_error.value.message == direct_error.value.message
+        validate("architecture", ARCHITECTURE)
+
+    def test_schema_errors_collects_all(self):
+        """Every error is reported in one pass, ordered by location."""
+        invalid = {"architecture": {"components": [{"id": 1}, {"type": "db"}]}}
+        messages = [format_error(e) for e in schema_errors("architecture", invalid)]
+        assert messages == [
+            "at 'architecture -> components -> 0': 'type' is a required property",
+            "at 'architecture -> components -> 0 -> id': 1 is not of type 'string'",
+            "at 'architecture -> components -> 1': 'id' is a required property",
+        ]
+
+    def test_missing_schema(self):
+        """Unknown schema names raise FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            load_schema("does-not-exist")
+
+
+class TestValidateOutputs:
+    """Test the batch validator."""
+
+    def test_validate_responses_and_summary(self):
+        """JSON outputs report all schema errors; the summary counts per format."""
+        records = [
+            {"id": "ok", "response": f"```json\n{json.dumps(ARCHITECTURE)}\n```", "output_format": "json"},
+            {"id": "bad", "response": '```json\n{"architecture": {"components": [{"id": 1}, {}]}}\n```'},
+            {"id": "diagram", "response": "```mermaid\nflowchart LR\n    A[ALB] --> B[EC2]\n```"},
+        ]
+        results = [validate_response(r) for r in records]
+        assert [r["valid"] for r in results] == [True, False, True]
+        assert len(results[1]["errors"]) == 4
+
+        summary = summarise(results)
+        assert summary["total"] == 3
+        assert summary["by_format"]["json"] == {"total": 2, "valid": 1}
+        assert summary["by_format"]["mermaid"] == {"total": 1, "valid": 1}
+
+    def test_validate_leaderboard_file(self, tmp_path):
+        """Leaderboard files are checked against the leaderboard schema."""
+        path = tmp_path / "leaderboard.json"
+        path.write_text(json.dumps({"_metadata": {}, "models": []}))
+        result = validate_leaderboard_file(path)
+        assert not result["valid"]
+        assert result["errors"]
@@ -0,0 +1,76 @@
+"""Tests for the score cube by item metadata dimension."""
+
+import json
+
+import pandas as pd
+
+from aggregate_multi import collect_samples
+from evals.architecture_design.tasks import _sample_metadata, item_record
+from score_cube import build_score_cube, cube_frame, slice_cube, write_score_cube
+
+
+def _samples():
+    return pd.DataFrame({
+        "model": ["a", "a", "a", "b", "b"],
+        "task": ["cdk_synth", "cdk_synth", "practice_exam", "cdk_synth", "cdk_synth"],
+        "value": [1.0, 0.0, 1.0, 1.0, 1.0],
+        "difficulty": ["easy", "hard", "easy", "easy", None],
+        "skill": ["networking", "networking", None, "networking", "storage"],
+        "subtype": [None] * 5,
+        "domains": [["Security"], ["Security", "Networking"], [], ["Security"], []],
+        "services": [["s3"], ["vpc", "s3"], ["iam"], ["s3"], ["s3"]],
+    })
+
+
+class TestScoreCube:
+    """Test building, storing and slicing the cube."""
+
+    def test_sums_and_counts_per_cell(self):
+        """Every (model, task, value) cell holds the sum and count of its samples."""
+        cube = build_score_cube(_samples())
+        assert cube["models"] == ["a", "b"] and cube["tasks"] == ["cdk_synth", "practice_exam"]
+        difficulty = cube_frame(cube, "difficulty")
+        cells = {(r.model, r.task, r.value): (r.sum, r.count) for r in difficulty.itertuples()}
+        assert cells == {
+            ("a", "cdk_synth", "easy"): (1.0, 1),
+            ("a", "cdk_synth", "hard"): (0.0, 1),
+            ("a", "practice_exam", "easy"): (1.0, 1),
+            ("b", "cdk_synth", "easy"): (1.0, 1),
+        }
+        assert cube["dimensions"]["subtype"]["values"] == []
+
+    def test_list_dimensions_count_each_value(self):
+        """A sample counts once towards each of its services and domains."""
+        cube = build_score_cube(_samples())
+        services = slice_cube(cube, "aws_services", "cdk_synth")
+        assert services.loc["a", "s3"] == 0.5 and services.loc["a", "vpc"] == 0.0
+        assert services.loc["b", "s3"] == 1.0
+        pooled = slice_cube(cube, "difficulty")
+        assert pooled.loc["a", "easy"] == 1.0 and pooled.loc["a", "hard"] == 0.0
+
+    def test_round_trip_from_logs(self, make_eval_log, tmp_path):
+        """A cube written from real logs reads back to the same slices."""
+        path = make_eval_log("practice_exam_a", "practice_exam", "openai/model-a", "choice", ["C", "I", "C"], [
+            {"metadata": {"difficulty": "easy", "domain": "Security", "aws_services": ["IAM"]}},
+            {"metadata": {"difficulty": "hard", "domain": "Security", "aws_services": ["Amazon S3"]}},
+            {"metadata": {"difficulty": "hard", "domain": "Cost", "aws_services": ["S3"]}},
+        ])
+        cube = build_score_cube(collect_samples([str(path)], workers=1))
+        write_score_cube(cube, str(tmp_path / "results" / "cube.json"))
+        loaded = json.loads((tmp_path / "results" / "cube.json").read_text())
+        assert loaded == cube
+        row = slice_cube(loaded, "domains").loc["openai/model-a"]
+        assert row.to_dict() == {"Cost": 1.0, "Security": 0.5}
+        assert slice_cube(loaded, "aws_services").loc["openai/model-a"].to_dict() == {"iam": 1.0, "s3": 0.5}
+
+    def test_architecture_items_in_metadata_slices(self, make_eval_log):
+        """Architecture samples, with their metadata as logged, fill the difficulty and domain cells."""
+        records = [item_record("arch_001"), item_record("arch_005")]  # beginner; advanced
+        path = make_eval_log("architecture-design_a", "architecture-design", "openai/model-a", "architecture_scorer",
+                             [0.75, 0.25], [_sample_metadata(record) for record in records])
+        cube = build_score_cube(collect_samples([str(path)], workers=1))
+        assert cube["tasks"] == ["architecture_design"]
+        difficulty = slice_cube(cube, "difficulty", "architecture_design").loc["openai/model-a"]
+        assert difficulty.to_dict() == {"advanced": 0.25, "beginner": 0.75}
+        domains = slice_cube(cube, "domains", "architecture_design").loc["openai/model-a"]
+        assert domains.to_dict() == {"compute": 0.5, "database": 0.5, "networking": 0.75}
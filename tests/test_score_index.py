@@ -0,0 +1,109 @@
+"""Tests for the incremental per-sample score index."""
+
+import os
+import sqlite3
+from unittest.mock import patch
+
+import pandas as pd
+
+import aggregate_multi
+import score_index
+from aggregate_multi import collect_samples, extract_log, sync_index
+from score_index import ScoreIndex
+
+
+def _nightly(make_eval_log, run, created, a_scores, b_scores=("C", "I")):
+    return [
+        make_eval_log(f"{run}/practice_exam_a", "practice_exam", "openai/model-a", "choice", list(a_scores),
+                      [{"metadata": {"aws_services": ["Amazon S3"]}}] * len(a_scores), created=created),
+        make_eval_log(f"{run}/practice_exam_b", "practice_exam", "openai/model-b", "choice", list(b_scores),
+                      created=created),
+    ]
+
+
+class TestScoreIndex:
+    """Test incremental ingestion and run selection."""
+
+    def test_only_new_or_changed_logs_are_read(self, tmp_path, make_eval_log):
+        """Unchanged and merely touched logs aren't parsed again; edited and deleted ones are updated."""
+        root = tmp_path / "logs"
+        paths = [str(p) for p in _nightly(make_eval_log, "nightly-1", "2026-10-01T02:00:00+00:00", ["C", "C"])]
+        with ScoreIndex(tmp_path / "index.sqlite") as index:
+            assert sync_index(index, str(root), paths, workers=1) == 2
+            with patch.object(aggregate_multi, "read_eval_log_sample_summaries") as read:
+                assert sync_index(index, str(root), paths, workers=1) == 0
+                os.utime(paths[0], ns=(1, 1))
+                assert sync_index(index, str(root), paths, workers=1) == 0
+            read.assert_not_called()
+
+            make_eval_log("nightly-1/practice_exam_a", "practice_exam", "openai/model-a", "choice", ["I", "I"],
+                          created="2026-10-01T02:00:00+00:00")
+            os.remove(paths[1])
+            assert sync_index(index, str(root), paths[:1], workers=1) == 1
+            samples = index.sample_table(index.select(str(root)))
+        assert samples[["model", "value"]].values.tolist() == [["openai/model-a", 0.0]] * 2
+
+    def test_log_growing_while_parsed_is_read_again(self, tmp_path, make_eval_log):
+        """A log written to between pending() and add() is stored with its old stat and parsed again."""
+        path = str(make_eval_log("nightly-1/practice_exam_a", "practice_exam", "openai/model-a", "choice", ["C"]))
+
+        def grow_then_read(log_path):
+            make_eval_log("nightly-1/practice_exam_a", "practice_exam", "openai/model-a", "choice", ["C", "I"])
+            return extract_log(log_path)
+
+        with ScoreIndex(tmp_path / "index.sqlite") as index:
+            with patch.object(aggregate_multi, "extract_log", side_effect=grow_then_read):
+                assert sync_index(index, str(tmp_path / "logs"), [path], workers=1) == 1
+            assert sync_index(index, str(tmp_path / "logs"), [path], workers=1) == 1
+            assert sync_index(index, str(tmp_path / "logs"), [path], workers=1) == 0
+            assert index.sample_table(index.select())["value"].tolist() == [1.0, 0.0]
+
+    def test_changed_size_is_parsed_without_hashing(self, tmp_path, make_eval_log):
+        """A known log that changed size is read once, by the parser; new logs are hashed."""
+        path = str(make_eval_log("nightly-1/practice_exam_a", "practice_exam", "openai/model-a", "choice", ["C"]))
+        with ScoreIndex(tmp_path / "index.sqlite") as index:
+            with patch("score_index.content_hash", wraps=score_index.content_hash) as hashed:
+                sync_index(index, str(tmp_path / "logs"), [path], workers=1)
+                assert hashed.call_count == 1
+                make_eval_log("nightly-1/practice_exam_a", "practice_exam", "openai/model-a", "choice", ["C", "I"])
+                assert sync_index(index, str(tmp_path / "logs"), [path], workers=1) == 1
+                assert hashed.call_count == 1
+            assert index.sample_table(index.select())["value"].tolist() == [1.0, 0.0]
+
+    def test_sample_table_matches_direct_reading(self, tmp_path, make_eval_log):
+        """The index yields the same sample table as reading the logs."""
+        paths = [str(p) for p in _nightly(make_eval_log, "nightly-1", "2026-10-01T02:00:00+00:00", ["C", "I", "C"])]
+        paths.append(str(make_eval_log("nightly-1/unrelated", "other", "openai/model-b", "choice", ["C"])))
+        with ScoreIndex(tmp_path / "index.sqlite") as index:
+            sync_index(index, str(tmp_path / "logs"), paths, workers=1)
+            pd.testing.assert_frame_equal(index.sample_table(index.select()), collect_samples(paths, workers=1))
+            assert len(index) == 3
+
+    def test_since_and_runs_select_logs(self, tmp_path, make_eval_log):
+        """--since filters by creation time; --runs by run name or the latest N runs."""
+        paths = []
+        for day in (1, 2, 3):
+            paths += _nightly(make_eval_log, f"nightly-{day}", f"2026-10-0{day}T02:00:00+00:00", ["C"] * day)
+        root = str(tmp_path / "logs")
+        with ScoreIndex(tmp_path / "index.sqlite") as index:
+            sync_index(index, root, [str(p) for p in paths], workers=1)
+            assert index.runs(root) == ["nightly-1", "nightly-2", "nightly-3"]
+            assert len(index.select(root, since="2026-10-02")) == 4
+            assert len(index.select(root, runs=1)) == 2
+            assert len(index.select(root, since="2026-10-02", runs=["nightly-1", "nightly-3"])) == 2
+            assert index.select(str(tmp_path / "logs" / "nightly-2")) == index.select(root, runs=["nightly-2"])
+
+    def test_selections_beyond_the_variable_limit(self, tmp_path, make_eval_log):
+        """Selecting more logs than SQLite allows query parameters still works."""
+        paths = []
+        for day in (1, 2, 3):
+            paths += _nightly(make_eval_log, f"nightly-{day}", f"2026-10-0{day}T02:00:00+00:00", ["C"])
+        root = str(tmp_path / "logs")
+        with ScoreIndex(tmp_path / "index.sqlite") as index:
+            sync_index(index, root, [str(p) for p in paths], workers=1)
+            index.db.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 2)
+            ids = index.select(root, since="2026-10-01", runs=2)
+            assert len(ids) == 4
+            assert index.runs(root) == ["nightly-1", "nightly-2", "nightly-3"]
+            assert len(index.log_paths(index.select(root))) == len(index.log_versions(ids)) + 2 == 6
+            assert len(index.sample_table(ids)) == 6
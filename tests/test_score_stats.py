@@ -0,0 +1,151 @@
+"""Tests for bootstrap confidence intervals of leaderboard scores."""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from aggregate_multi import build_category_metadata, validate_leaderboard_json
+from score_stats import (
+    bootstrap_cis,
+    bootstrap_means,
+    category_margins,
+    confidence_label,
+    mcnemar,
+    paired_bootstrap,
+    paired_significance,
+    score_matrix,
+)
+
+WEIGHTS = {"practice_exam": 0.5, "cdk_synth": 0.5}
+
+
+def _samples(rows):
+    """Sample table rows from (model, task, sample_id, value) tuples."""
+    return pd.DataFrame(rows, columns=["model", "task", "sample_id", "value"])
+
+
+def _binary(model, task, passed, items):
+    return [(model, task, str(i), float(i < passed)) for i in range(items)]
+
+
+class TestScoreMatrix:
+    """Test pivoting samples to a models × items matrix."""
+
+    def test_epochs_averaged_and_missing_items_nan(self):
+        """Repeated items are averaged; items a model didn't answer are NaN."""
+        samples = _samples([("a", "t", "1", 1.0), ("a", "t", "1", 0.0), ("a", "t", "2", 1.0), ("b", "t", "2", 0.0)])
+        matrix = score_matrix(samples, ["a", "b", "c"])
+        assert matrix.items == ["1", "2"]
+        np.testing.assert_array_equal(matrix.values, [[0.5, 1.0], [np.nan, 0.0], [np.nan, np.nan]])
+
+    def test_bootstrap_means_center_on_the_mean(self):
+        """Resampled means average to the model's mean score."""
+        matrix = score_matrix(_samples(_binary("a", "t", 30, 40)))
+        means = bootstrap_means(matrix, 4000, np.random.default_rng(0))
+        assert means.shape == (4000, 1)
+        assert abs(means.mean() - 0.75) < 0.01
+
+
+class TestBootstrapCis:
+    """Test intervals for task scores and the weighted overall."""
+
+    def test_intervals_contain_estimates_and_are_reproducible(self):
+        """Each interval contains its point estimate and the same seed gives the same intervals."""
+        samples = _samples(
+            _binary("a", "practice_exam", 35, 50) + _binary("a", "cdk_synth", 20, 40)
+            + _binary("b", "practice_exam", 45, 50)
+        )
+        cis = bootstrap_cis(samples, WEIGHTS, resamples=2000, seed=1)
+        assert cis["a"]["practice_exam"][0] < 0.7 < cis["a"]["practice_exam"][1]
+        assert cis["a"]["overall"][0] < 0.5 * 0.7 + 0.5 * 0.5 < cis["a"]["overall"][1]
+        # No cdk_synth samples: no interval, and the overall counts it as 0
+        assert "cdk_synth" not in cis["b"]
+        assert cis["b"]["overall"][1] <= 0.5
+        assert bootstrap_cis(samples, WEIGHTS, resamples=2000, seed=1) == cis
+
+    def test_more_items_narrow_the_interval(self):
+        """Quadrupling the items roughly halves the interval."""
+        few = bootstrap_cis(_samples(_binary("a", "practice_exam", 25, 50)), WEIGHTS, resamples=2000)
+        many = bootstrap_cis(_samples(_binary("a", "practice_exam", 100, 200)), WEIGHTS, resamples=2000)
+        width = {name: cis["a"]["practice_exam"][1] - cis["a"]["practice_exam"][0]
+                 for name, cis in (("few", few), ("many", many))}
+        assert 1.6 < width["few"] / width["many"] < 2.4
+
+    def test_margins_drive_category_metadata(self):
+        """Category margins and confidence labels come from the intervals."""
+        cis = {
+            "a": {"practice_exam": [0.6, 0.8], "overall": [0.3, 0.4]},
+            "b": {"practice_exam": [0.85, 0.95], "cdk_synth": [0.9, 1.0], "overall": [0.5, 0.55]},
+        }
+        margins = category_margins(cis)
+        assert margins == {"practice_exam": 8, "cdk_synth": 5, "overall": 4}
+        assert [confidence_label(m) for m in (5, 8, 11)] == ["high", "medium", "low"]
+
+        categories = build_category_metadata(margins)
+        assert categories["practice_exam"]["margin"] == "±8%"
+        assert categories["practice_exam"]["confidence"] == "medium"
+        assert "margin" not in categories["architecture_design"]
+
+    def test_leaderboard_with_intervals_validates(self):
+        """Records with ci and the interval metadata match the schema."""
+        validate_leaderboard_json({
+            "_metadata": {
+                "generated_at": "2026-10-01T00:00:00Z",
+                "model_count": 1,
+                "categories": build_category_metadata({"practice_exam": 4}),
+                "confidence_intervals": {"method": "percentile bootstrap over items", "level": 0.95,
+                                         "resamples": 5000, "seed": 1},
+            },
+            "models": [{"model": "m", "practice_exam": 0.7, "overall": 0.24,
+                        "ci": {"practice_exam": [0.62, 0.78], "overall": [0.21, 0.27]}}],
+        })
+
+
+class TestPairedSignificance:
+    """Test paired tests across every model pair."""
+
+    def test_mcnemar_exact_p_values(self):
+        """Discordant counts give exact binomial p-values; deltas are antisymmetric."""
+        # a passes items 0-9; b passes items 0-2 and 10; c answered only items 20-21
+        rows = [("a", "t", str(i), float(i < 10)) for i in range(12)]
+        rows += [("b", "t", str(i), float(i < 3 or i == 10)) for i in range(12)]
+        rows += [("c", "t", str(i), 1.0) for i in (20, 21)]
+        samples = _samples(rows).assign(epoch=1)
+        delta, p_value, shared = mcnemar(score_matrix(samples, ["a", "b", "c"], by_epoch=True))
+        # a-only passes: 7, b-only passes: 1 -> 2 * P(X <= 1 | n=8)
+        expected = 2 * (math.comb(8, 0) + math.comb(8, 1)) / 2**8
+        assert p_value[0, 1] == p_value[1, 0]
+        assert abs(p_value[0, 1] - expected) < 1e-12
+        assert delta[0, 1] == -delta[1, 0] == 6 / 12
+        assert shared[0, 2] == 0 and np.isnan(p_value[0, 2])
+
+    def test_paired_bootstrap_separates_real_gaps(self):
+        """Identical models get p = 1; a consistent gap gets a small p-value."""
+        rng = np.random.default_rng(0)
+        base = rng.uniform(0.2, 0.8, 40)
+        rows = [(m, "t", str(i), v) for i, v in enumerate(base) for m in ("a", "b")]
+        rows += [("c", "t", str(i), v + 0.15) for i, v in enumerate(base)]
+        delta, p_value, _ = paired_bootstrap(score_matrix(_samples(rows)), 2000, np.random.default_rng(1))
+        assert delta[0, 1] == 0 and p_value[0, 1] == 1
+        assert abs(delta[2, 0] - 0.15) < 1e-9
+        assert p_value[0, 2] < 0.01
+
+    def test_significance_report(self):
+        """Binary tasks use McNemar on (sample, epoch) pairs; rubric tasks the paired bootstrap."""
+        samples = _samples(
+            _binary("a", "practice_exam", 40, 50) + _binary("b", "practice_exam", 30, 50)
+            + [(m, "architecture_design", str(i), 0.5) for m in ("a", "b") for i in range(5)]
+        ).assign(epoch=1)
+        report = paired_significance(
+            samples, {"practice_exam": "binary", "architecture_design": "rubric", "cdk_synth": "binary"}, 500
+        )
+        assert report["models"] == ["a", "b"]
+        assert set(report["tasks"]) == {"practice_exam", "architecture_design"}
+        practice = report["tasks"]["practice_exam"]
+        assert practice["test"] == "mcnemar"
+        assert practice["delta"] == [[0.0, 0.2], [-0.2, 0.0]]
+        assert practice["p_value"][0][0] is None
+        assert practice["p_value"][0][1] == round(2 / 2**10, 4)
+        assert practice["shared_items"] == [[50, 50], [50, 50]]
+        assert report["tasks"]["architecture_design"]["p_value"][1][0] == 1.0